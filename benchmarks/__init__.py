@@ -0,0 +1,7 @@
+"""
+Benchmarks for kakuyomu-cli
+
+`python -m benchmarks` をリポジトリのルートで実行する.
+スクレイパー, work.tomlの読み書き, エピソードの差分, モックサーバーに対するfetchを
+エピソード数を変えて計測し, スループットとピークメモリを表示する.
+"""
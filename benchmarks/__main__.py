@@ -0,0 +1,48 @@
+"""Run benchmarks: python -m benchmarks"""
+
+import json
+import logging
+
+import click
+
+from kakuyomu.logger import get_logger
+
+from .cases import CASES
+from .runner import Result, format_table, iter_results
+
+DEFAULT_SIZES = (10, 1000, 10000)
+
+
+@click.command()
+@click.option(
+    "--size",
+    "-n",
+    "sizes",
+    type=int,
+    multiple=True,
+    default=DEFAULT_SIZES,
+    show_default=True,
+    help="エピソード数 (複数指定可)",
+)
+@click.option("--repeat", "-r", type=int, default=5, show_default=True, help="計測回数 (中央値を表示する)")
+@click.option(
+    "--case", "-k", "names", type=click.Choice(list(CASES)), multiple=True, help="実行するケース (省略時は全て)"
+)
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="結果をJSONで保存するファイル")
+def main(sizes: tuple[int, ...], repeat: int, names: tuple[str, ...], json_path: str | None) -> None:
+    """スクレイパー, work.tomlの読み書き, 差分, fetchのベンチマークを実行する"""
+    # ログ出力の時間を計測に含めない
+    get_logger().setLevel(logging.WARNING)
+    cases = {name: case for name, case in CASES.items() if not names or name in names}
+    results: list[Result] = []
+    for result in iter_results(cases, list(sizes), repeat):
+        click.echo(f"{result.name} n={result.size}: {result.seconds * 1000:.2f} ms", err=True)
+        results.append(result)
+    click.echo(format_table(results))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark cases
+
+Each case is a context manager which prepares synthetic data for the given number of episodes
+and yields the Bench to measure.
+"""
+
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from kakuyomu.client import Client
+from kakuyomu.client.work_store import WorkStore
+from kakuyomu.scrapers.episode_page import EpisodePageScraper
+from kakuyomu.scrapers.work_page import WorkPageScraper
+from kakuyomu.testing import MockKakuyomuServer, create_mock_client
+from kakuyomu.types import LocalEpisode, Work
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import Query
+
+from .runner import Bench, Case
+
+WORK_ID = "16816927860000000001"
+BODY_LINE = "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+
+
+def _mock_server(size: int, body_lines: int = 1, etag: bool = True) -> MockKakuyomuServer:
+    """Create mock server with a work of size episodes (not started)"""
+    server = MockKakuyomuServer(etag=etag)
+    server.add_work("ベンチマーク作品", work_id=WORK_ID)
+    body = "\n".join([BODY_LINE] * body_lines)
+    for i in range(size):
+        server.add_episode(WORK_ID, f"第{i + 1}話", body, episode_id=str(i + 1))
+    return server
+
+
+def _local_work(size: int) -> Work:
+    """Create work of size linked episodes"""
+    work = Work(id=WORK_ID, title="ベンチマーク作品")
+    work.episodes = {
+        str(i + 1): LocalEpisode(id=str(i + 1), title=f"第{i + 1}話", rel_path=f"publish/{i + 1:05}.txt")
+        for i in range(size)
+    }
+    return work
+
+
+@contextmanager
+def _work_root() -> Iterator[Path]:
+    """Create temporary work root"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        root.joinpath(".kakuyomu").mkdir()
+        yield root
+
+
+@contextmanager
+def scrape_episodes(size: int) -> Iterator[Bench]:
+    """WorkPageScraper.scrape_episodes on a toc of size episodes"""
+    server = _mock_server(size)
+    html = server.render_work_page(server.works[WORK_ID])
+    yield Bench(lambda: WorkPageScraper(html).scrape_episodes())
+
+
+@contextmanager
+def scrape_body(size: int) -> Iterator[Bench]:
+    """EpisodePageScraper.scrape_body on an episode of size lines"""
+    server = _mock_server(1, body_lines=size)
+    work = server.works[WORK_ID]
+    html = server.render_episode_page(work, work.episodes["1"])
+    yield Bench(lambda: EpisodePageScraper(html).scrape_body())
+
+
+@contextmanager
+def work_load(size: int) -> Iterator[Bench]:
+    """Work.load of a work.toml with size episodes"""
+    with _work_root() as root:
+        client = Client(cwd=root)
+        client._dump_work_toml(_local_work(size))
+        toml_path = client.config_dir.work_toml
+        yield Bench(lambda: Work.load(toml_path))
+
+
+@contextmanager
+def work_load_cached(size: int) -> Iterator[Bench]:
+    """WorkStore.load of a work with size episodes from the pickle sidecar in a new process"""
+    with _work_root() as root:
+        client = Client(cwd=root)
+        client._dump_work_toml(_local_work(size))
+        config_dir = client.config_dir
+        yield Bench(lambda: WorkStore(config_dir.work_toml, cache_path=config_dir.work_cache).load())
+
+
+@contextmanager
+def work_dump(size: int) -> Iterator[Bench]:
+    """Client._dump_work_toml of a work with size episodes"""
+    with _work_root() as root:
+        client = Client(cwd=root)
+        work = _local_work(size)
+        yield Bench(lambda: client._dump_work_toml(work))
+
+
+@contextmanager
+def query_diff(size: int) -> Iterator[Bench]:
+    """Query.diff between works of size episodes with 10% appended, removed, renamed and moved"""
+    older = _local_work(size).episodes
+    newer = {episode_id: episode.model_copy() for episode_id, episode in older.items()}
+    changes = max(size // 10, 1)
+    moved = []
+    for i in range(changes):
+        newer.pop(str(i + 1), None)
+        newer[str(size + i + 1)] = LocalEpisode(id=str(size + i + 1), title="追加", rel_path=None)
+        if (episode := newer.get(str(size - i))) is not None:
+            newer[episode.id] = episode.model_copy(update={"title": "更新"})
+        if (episode := newer.pop(str(size // 2 + i), None)) is not None:
+            moved.append(episode)
+    # 末尾に移動する
+    newer.update((episode.id, episode) for episode in moved)
+    # 列の作成も含めて測るため, 毎回Queryを作る
+    yield Bench(lambda: Query(older).diff(Query(newer)))
+
+
+@contextmanager
+def fetch_remote_episodes(size: int) -> Iterator[Bench]:
+    """Client.fetch_remote_episodes against the mock server with size episodes"""
+    # ETagがあると2回目以降は304になりスクレイピングを測れないので, 毎回ページ全体を返させる
+    with _mock_server(size, etag=False) as server, _work_root() as root:
+        client = create_mock_client(server, root)
+        empty_work = Work(id=WORK_ID, title="ベンチマーク作品")
+        # 毎回全エピソードを追加する差分になるようにwork.tomlを空に戻す
+        yield Bench(
+            client.fetch_remote_episodes,
+            reset=lambda: client._dump_work_toml(empty_work),
+        )
+
+
+CASES: dict[str, Case] = {
+    "scrape_episodes": scrape_episodes,
+    "scrape_body": scrape_body,
+    "work_load": work_load,
+    "work_load_cached": work_load_cached,
+    "work_dump": work_dump,
+    "query_diff": query_diff,
+    "fetch_remote_episodes": fetch_remote_episodes,
+}
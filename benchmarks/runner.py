@@ -0,0 +1,105 @@
+"""Measure benchmark cases"""
+
+import gc
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class Bench:
+    """Function to measure and a reset run before each measurement"""
+
+    func: Callable[[], object]
+    reset: Callable[[], object] | None = None
+
+
+type Case = Callable[[int], AbstractContextManager[Bench]]  # type: ignore[valid-type]
+
+
+@dataclass
+class Result:
+    """Result of a benchmark case"""
+
+    name: str
+    size: int
+    repeat: int
+    seconds: float
+    peak_bytes: int
+
+    @property
+    def throughput(self) -> float:
+        """Episodes per second"""
+        return self.size / self.seconds if self.seconds else float("inf")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to json serializable dict"""
+        return asdict(self) | {"throughput": self.throughput}
+
+
+def _run(bench: Bench) -> float:
+    """Run once and return elapsed seconds"""
+    if bench.reset:
+        bench.reset()
+    gc.collect()
+    start = time.perf_counter()
+    bench.func()
+    return time.perf_counter() - start
+
+
+def _peak_memory(bench: Bench) -> int:
+    """Run once under tracemalloc and return the peak allocated bytes"""
+    if bench.reset:
+        bench.reset()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bench.func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def measure(name: str, case: Case, size: int, repeat: int) -> Result:
+    """
+    Measure a benchmark case
+
+    Args:
+    ----
+        name: name of the case
+        case: context manager factory which prepares the data for size episodes
+        size: number of episodes
+        repeat: number of timed runs, the median is reported
+
+    """
+    with case(size) as bench:
+        # ログイン状態の確認などの初回だけのコストを除く
+        _run(bench)
+        # tracemallocは計測を遅くするので, 時間とメモリは別々に計測する
+        seconds = statistics.median(_run(bench) for _ in range(repeat))
+        peak_bytes = _peak_memory(bench)
+    return Result(name=name, size=size, repeat=repeat, seconds=seconds, peak_bytes=peak_bytes)
+
+
+def format_table(results: list[Result]) -> str:
+    """Format results as a text table"""
+    header = f"{'case':<24} {'episodes':>8} {'median [ms]':>12} {'episodes/s':>12} {'peak [KiB]':>11}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.name:<24} {result.size:>8} {result.seconds * 1000:>12.2f} "
+            f"{result.throughput:>12.0f} {result.peak_bytes / 1024:>11.0f}"
+        )
+    return "\n".join(lines)
+
+
+def iter_results(cases: dict[str, Case], sizes: list[int], repeat: int) -> Iterator[Result]:
+    """Measure all cases for all sizes"""
+    for name, case in cases.items():
+        for size in sizes:
+            yield measure(name, case, size, repeat)
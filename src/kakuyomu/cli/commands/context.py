@@ -0,0 +1,55 @@
+"""Shared state of CLI commands"""
+
+from typing import TYPE_CHECKING
+
+import click
+
+if TYPE_CHECKING:
+    from kakuyomu.client import Client
+    from kakuyomu.client.trace import JsonlTraceWriter
+
+
+class CliContext:
+    """
+    Object stored in the click context
+
+    The client is created on first use, so `--help` and shell completion
+    neither import requests/bs4/pydantic nor load the cookie.
+    """
+
+    _client: "Client | None"
+    # 設定されていればリクエストごとのイベントをJSON Linesで書き出す
+    trace_path: str | None
+    _trace_writer: "JsonlTraceWriter | None"
+
+    def __init__(self, trace_path: str | None = None) -> None:
+        """Initialize context"""
+        self._client = None
+        self.trace_path = trace_path
+        self._trace_writer = None
+
+    @property
+    def client(self) -> "Client":
+        """Client shared by the command and its subcommands"""
+        if self._client is None:
+            from kakuyomu.client import Client
+            from kakuyomu.types.path import Path
+
+            self._client = Client(Path.cwd())
+            if self.trace_path:
+                from kakuyomu.client.trace import JsonlTraceWriter
+
+                self._trace_writer = JsonlTraceWriter(Path(self.trace_path))
+                self._client.session.add_request_hook(self._trace_writer)
+        return self._client
+
+    def close(self) -> None:
+        """Close the trace file"""
+        if self._trace_writer is not None:
+            self._trace_writer.close()
+            self._trace_writer = None
+
+
+def get_client() -> "Client":
+    """Get the client of the current command invocation"""
+    return click.get_current_context().ensure_object(CliContext).client
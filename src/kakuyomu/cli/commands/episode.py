@@ -1,14 +1,11 @@
 """Episode commands"""
 
 import datetime
+import os
 
 import click
 
-from kakuyomu.client import Client
-from kakuyomu.types.errors import EpisodeReservePublishError
-from kakuyomu.types.path import Path
-
-client = Client(Path.cwd())
+from .context import get_client
 
 
 @click.group()
@@ -20,6 +17,7 @@ def episode() -> None:
 @episode.command("list")
 def ls() -> None:
     """エピソードをリスト表示する"""
+    client = get_client()
     for i, episode in enumerate(client.get_remote_episodes()):
         print(i, episode)
 
@@ -27,6 +25,7 @@ def ls() -> None:
 @episode.command
 def fetch() -> None:
     """リモートのエピソードをwork.tomlに同期する"""
+    client = get_client()
     diff = client.fetch_remote_episodes()
     print(diff)
 
@@ -34,15 +33,19 @@ def fetch() -> None:
 @episode.command()
 @click.argument("filepath")
 @click.option("--filter", "-F", type=str, default="")
-def link(file: str, filter: str) -> None:
+@click.option("--refresh", is_flag=True, help="保存された目次を使わずにリモートから取得する")
+def link(file: str, filter: str, refresh: bool) -> None:
     """work.tomlのエピソードにファイルパスを設定する"""
+    from kakuyomu.types.path import Path
+
+    client = get_client()
     cwd = Path.cwd()
     path = Path(file)
     filepath = Path.joinpath(cwd, path)
     config_dir = client.config_dir
     relative_path = config_dir.relative_to(filepath)
     try:
-        episode = client.link_file(relative_path, filter_text=filter)
+        episode = client.link_file(relative_path, filter_text=filter, refresh=refresh)
         print("linked", episode)
     except Exception as e:
         print(f"リンクに失敗しました: {e}")
@@ -52,6 +55,7 @@ def link(file: str, filter: str) -> None:
 @click.option("--filter", "-F", type=str, default="")
 def unlink(filter: str) -> None:
     """エピソードからファイルパス設定を削除する"""
+    client = get_client()
     try:
         client.unlink(filter_text=filter)
     except Exception as e:
@@ -60,9 +64,22 @@ def unlink(filter: str) -> None:
 
 
 @episode.command()
-@click.argument("title")
-@click.argument("file")
-def create(title: str, file: str) -> None:
+@click.argument("title", required=False)
+@click.argument("file", required=False)
+@click.option(
+    "--from-dir",
+    "from_dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="ディレクトリ内のファイルからまとめて作成する",
+)
+@click.option("--glob", "pattern", type=str, default="*.txt", help="--from-dirで対象にするファイルのパターン")
+@click.option(
+    "--title-from",
+    type=click.Choice(["first-line", "filename"]),
+    default="first-line",
+    help="--from-dirで作成するエピソードのタイトル",
+)
+def create(title: str | None, file: str | None, from_dir: str | None, pattern: str, title_from: str) -> None:
     """
     リモートにエピソードを作成する
 
@@ -70,17 +87,55 @@ def create(title: str, file: str) -> None:
     ----
         title: エピソードのタイトル
         file: エピソードのファイルパス
+        from_dir: このディレクトリ内のファイル名順にエピソードを作成する. リンク済みのファイルはスキップする
+        pattern: from_dirで対象にするファイルのglobパターン
+        title_from: from_dirで作成するときのタイトル. first-line: ファイルの最初の行, filename: ファイル名
 
     """
-    filepath = Path(file).absolute()
-    client.create_remote_episode(title=title, filepath=filepath)
-    print(f"エピソードを作成しました: {title}")
+    from kakuyomu.types.path import Path
+
+    client = get_client()
+    if not from_dir:
+        if not title or not file:
+            raise click.UsageError("TITLE と FILE を指定するか --from-dir を指定してください")
+        filepath = Path(file).absolute()
+        client.create_remote_episode(title=title, filepath=filepath)
+        print(f"エピソードを作成しました: {title}")
+        return
+
+    work = client.work
+    work_root = client.config_dir.work_root
+    episodes: list[tuple[str, Path]] = []
+    for filepath in sorted(Path(from_dir).absolute().glob(pattern)):
+        if not filepath.is_file():
+            continue
+        if linked_episode := work.get_episode_by_path(work_root, filepath):
+            print(f"リンク済みのためスキップしました: {filepath} {linked_episode}")
+            continue
+        episode_title = _first_line_title(filepath) if title_from == "first-line" else filepath.stem
+        episodes.append((episode_title or filepath.stem, filepath))
+
+    if not episodes:
+        print("作成するエピソードがありません")
+        return
+    for created in client.create_remote_episodes(episodes):
+        print(f"エピソードを作成しました: {created}")
+
+
+def _first_line_title(filepath: os.PathLike[str]) -> str:
+    """Return the first non-empty line without markdown heading marks"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            if title := line.strip().lstrip("#").strip():
+                return title
+    return ""
 
 
 @episode.command()
 @click.option("--line", "-l", type=int, default=3)
 @click.option("--filter", "-F", type=str, default="")
-def show(line: int, filter: str) -> None:
+@click.option("--refresh", is_flag=True, help="保存された目次を使わずにリモートから取得する")
+def show(line: int, filter: str, refresh: bool) -> None:
     """
     エピソードの内容を表示する
 
@@ -88,9 +143,11 @@ def show(line: int, filter: str) -> None:
     ----
         line: 表示する行数
         filter: エピソードフィルタ文字列. これをIDかタイトルに含むエピソードを表示する
+        refresh: 保存された目次を使わずにリモートから取得する
 
     """
-    body = client.get_remote_episode_body(filter_text=filter)
+    client = get_client()
+    body = client.get_remote_episode_body(filter_text=filter, refresh=refresh)
     count = 0
     for row in body:
         if count >= line:
@@ -109,27 +166,203 @@ def show(line: int, filter: str) -> None:
 
 @episode.command()
 @click.option("--filter", "-F", type=str, default="")
-def update(filter: str = "") -> None:
+@click.option("--all", "-a", "update_all", is_flag=True, help="リンクされている全てのエピソードを更新する")
+@click.option("--jobs", "-j", type=int, default=4, help="同時に更新するエピソード数")
+@click.option("--force", is_flag=True, help="前回の更新からファイルが変更されていなくても更新する")
+@click.option("--refresh", is_flag=True, help="保存された目次を使わずにリモートから取得する")
+def update(
+    filter: str = "", update_all: bool = False, jobs: int = 4, force: bool = False, refresh: bool = False
+) -> None:
     """リモートエピソードの内容をリンクされているファイルの内容に更新する"""
-    episode = client.update_remote_episode(filter_text=filter)
-    print(f"エピソードを更新しました: {episode}")
+    client = get_client()
+    if not update_all:
+        remote_episode, uploaded = client.update_remote_episode(filter_text=filter, force=force, refresh=refresh)
+        if uploaded:
+            print(f"エピソードを更新しました: {remote_episode}")
+        else:
+            print(f"ファイルが変更されていないためスキップしました: {remote_episode}")
+        return
+
+    episodes = [episode for episode in client.work.episodes.values() if episode.rel_path]
+    if filter:
+        episodes = [episode for episode in episodes if filter in episode.id or filter in episode.title]
+    results = client.update_remote_episodes([episode.id for episode in episodes], max_workers=jobs, force=force)
+    for episode in episodes:
+        result = results[episode.id]
+        if isinstance(result, Exception):
+            print(f"エピソードの更新に失敗しました: {episode} {result}")
+        elif result:
+            print(f"エピソードを更新しました: {episode}")
+        else:
+            print(f"ファイルが変更されていないためスキップしました: {episode}")
+
+
+@episode.command()
+@click.option("--all", "-a", "pull_all", is_flag=True, help="全てのエピソードをダウンロードする")
+@click.option("--filter", "-F", type=str, default="")
+@click.option(
+    "--dir",
+    "-d",
+    "directory",
+    type=click.Path(file_okay=False),
+    help="新しいファイルを書き出すディレクトリ [default: publish]",
+)
+@click.option("--jobs", "-j", type=int, default=4, help="同時にダウンロードするエピソード数")
+@click.option("--overwrite", is_flag=True, help="リンク済みのエピソードもダウンロードして既存のファイルを上書きする")
+@click.option("--refresh", is_flag=True, help="保存された目次を使わずにリモートから取得する")
+def pull(
+    pull_all: bool = False,
+    filter: str = "",
+    directory: str | None = None,
+    jobs: int = 4,
+    overwrite: bool = False,
+    refresh: bool = False,
+) -> None:
+    """
+    リモートのエピソード本文をファイルにダウンロードしてリンクする
+
+    リンク済みでファイルが存在するエピソードはスキップするので, 中断しても再実行で続きからダウンロードできる
+    """
+    from kakuyomu.types.path import Path
+
+    client = get_client()
+    directory_path = Path(directory).absolute() if directory else client.config_dir.work_root.joinpath("publish")
+    if not pull_all:
+        remote_episode, downloaded = client.pull_remote_episode(
+            filter_text=filter, directory=directory_path, overwrite=overwrite, refresh=refresh
+        )
+        if downloaded:
+            print(f"エピソードをダウンロードしました: {client.get_episode_by_id(remote_episode.id)}")
+        else:
+            print(f"リンク済みのためスキップしました: {remote_episode}")
+        return
+
+    episode_ids = None
+    if filter:
+        episode_ids = [
+            episode.id for episode in client.get_remote_episodes() if filter in episode.id or filter in episode.title
+        ]
+    results = client.pull_remote_episodes(directory_path, episode_ids, max_workers=jobs, overwrite=overwrite)
+    for episode_id, result in results.items():
+        if isinstance(result, Exception):
+            print(f"エピソードのダウンロードに失敗しました: {episode_id} {result}")
+        elif result:
+            print(f"エピソードをダウンロードしました: {client.get_episode_by_id(episode_id)}")
+        else:
+            print(f"リンク済みのためスキップしました: {client.get_episode_by_id(episode_id)}")
 
 
 @episode.command()
-@click.argument("publish_at_str")
+@click.argument("publish_at_str", required=False)
 @click.option("--filter", "-F", type=str, default="")
-def publish(publish_at_str: str, filter: str) -> None:
-    """エピソードの公開予約を行う"""
+@click.option("--refresh", is_flag=True, help="保存された目次を使わずにリモートから取得する")
+@click.option(
+    "--plan",
+    "plan_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="公開予約の計画ファイル(TOML). 複数のエピソードをまとめて予約する",
+)
+@click.option("--jobs", "-j", type=int, default=4, help="同時に送信する予約の数")
+@click.option("--dry-run", is_flag=True, help="計画ファイルの予約を表示するだけで送信しない")
+@click.option("--skip-unchanged", is_flag=True, help="現在の予約を読み込み, 同じ日時(分単位)で予約済みなら送信しない")
+def publish(
+    publish_at_str: str | None,
+    filter: str,
+    refresh: bool,
+    plan_file: str | None = None,
+    jobs: int = 4,
+    dry_run: bool = False,
+    skip_unchanged: bool = False,
+) -> None:
+    """
+    エピソードの公開予約を行う
+
+    PUBLISH_AT_STRは"%Y/%m/%d %H:%M"の形式, "cancel"で予約を取り消す
+    """
+    from kakuyomu.types.errors import EpisodeReservePublishError
+
+    if plan_file:
+        _publish_plan(plan_file, jobs=jobs, dry_run=dry_run, skip_unchanged=skip_unchanged)
+        return
+    if publish_at_str is None:
+        print("公開日時か--planを指定してください")
+        return
+
+    client = get_client()
     if publish_at_str == "cancel":
-        client.cancel_reservation(filter_text=filter)
+        if not client.cancel_reservation(filter_text=filter, refresh=refresh, skip_unchanged=skip_unchanged):
+            print("予約されていないためスキップしました")
         return
     date_format = "%Y/%m/%d %H:%M"
     try:
         publish_at = datetime.datetime.strptime(publish_at_str, date_format)
-        client.reserve_publishing_episode(publish_at, filter_text=filter)
+        if not client.reserve_publishing_episode(
+            publish_at, filter_text=filter, refresh=refresh, skip_unchanged=skip_unchanged
+        ):
+            print("同じ日時で予約済みのためスキップしました")
     except EpisodeReservePublishError as e:
         print(f"予約公開/キャンセルに失敗しました: {e}")
     except ValueError as e:
         print(f"日時は{date_format}の形式で入力してください: {e}")
     except Exception as e:
         print(f"予期しないエラー: {e}")
+
+
+@episode.command()
+@click.option("--jobs", "-j", type=int, default=4, help="同時に読み込む公開ページの数")
+@click.option("--json", "as_json", is_flag=True, help="JSONで出力する")
+def schedule(jobs: int = 4, as_json: bool = False) -> None:
+    """全エピソードの公開予約を表示する"""
+    import json
+
+    client = get_client()
+    episodes = client.get_remote_episodes()
+    reservations = client.get_publish_schedule([episode.id for episode in episodes], max_workers=jobs)
+    rows = []
+    for i, episode in enumerate(episodes):
+        reservation = reservations[episode.id]
+        row = {"id": episode.id, "title": episode.title, "scheduled_at": None, "error": None}
+        if isinstance(reservation, Exception):
+            row["error"] = str(reservation)
+        elif reservation.scheduled_at:
+            row["scheduled_at"] = reservation.scheduled_at.isoformat()
+        rows.append(row)
+        if not as_json:
+            if isinstance(reservation, Exception):
+                scheduled = "取得失敗"
+            elif reservation.scheduled_at:
+                scheduled = f"{reservation.scheduled_at:%Y/%m/%d %H:%M}"
+            else:
+                scheduled = "-"
+            print(f"{i:>3} {episode.id} {scheduled:<16} {episode.title}")
+    if as_json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+
+
+def _publish_plan(plan_file: str, jobs: int, dry_run: bool, skip_unchanged: bool) -> None:
+    """Reserve publishing the episodes in the plan file"""
+    from kakuyomu.types.path import Path
+    from kakuyomu.types.publish_plan import PublishPlan
+
+    client = get_client()
+    try:
+        plan = PublishPlan.load(Path(plan_file))
+        schedule = plan.resolve(client.work, client.config_dir.work_root)
+    except Exception as e:
+        print(f"計画ファイルを読み込めません: {e}")
+        return
+
+    if dry_run:
+        for episode_id, publish_at in schedule.items():
+            print(f"{publish_at:%Y/%m/%d %H:%M} {client.get_episode_by_id(episode_id)}")
+        return
+
+    results = client.reserve_publishing_episodes(schedule, max_workers=jobs, skip_unchanged=skip_unchanged)
+    for episode_id, result in results.items():
+        episode = client.get_episode_by_id(episode_id)
+        if isinstance(result, Exception):
+            print(f"予約公開に失敗しました: {episode} {result}")
+        elif result:
+            print(f"予約公開しました: {schedule[episode_id]:%Y/%m/%d %H:%M} {episode}")
+        else:
+            print(f"同じ日時で予約済みのためスキップしました: {schedule[episode_id]:%Y/%m/%d %H:%M} {episode}")
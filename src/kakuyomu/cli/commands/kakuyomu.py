@@ -6,25 +6,30 @@ Command line interface for kakuyomu.jp
 
 import click
 
-from kakuyomu.client import Client
-from kakuyomu.settings.login import Login
-from kakuyomu.types.errors import TOMLAlreadyExistsError
-from kakuyomu.types.path import Path
-
+from .context import CliContext, get_client
 from .episode import episode
 from .work import work
 
-client = Client(Path.cwd())
-
 
 @click.group()
-def kakuyomu() -> None:
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="リクエストごとの待ち時間・通信時間・解析時間をJSON Linesで書き出すファイル",
+)
+@click.pass_context
+def kakuyomu(ctx: click.Context, trace: str | None) -> None:
     """
     Kakuyomu CLI
 
     Command line interface for kakuyomu.jp
     カクヨムの小説投稿・編集をコマンドラインから行うためのツール
     """
+    # Clientはサブコマンドで最初に使われるときに生成される
+    context = ctx.ensure_object(CliContext)
+    context.trace_path = trace
+    ctx.call_on_close(context.close)
 
 
 # Add subcommands
@@ -35,12 +40,14 @@ kakuyomu.add_command(work)
 @kakuyomu.command()
 def status() -> None:
     """ログインステータスを表示する"""
+    client = get_client()
     print(client.status())
 
 
 @kakuyomu.command()
 def logout() -> None:
     """ログアウトする"""
+    client = get_client()
     client.logout()
     print("logout")
 
@@ -66,6 +73,9 @@ def login(email: str) -> None:
     `kakuyomu login --email <email_address>`
 
     """
+    from kakuyomu.settings.login import Login
+
+    client = get_client()
     if email:
         password = click.prompt("Password", hide_input=True)
     else:
@@ -81,6 +91,9 @@ def login(email: str) -> None:
 @kakuyomu.command()
 def init() -> None:
     """現在のディレクトリを小説の1タイトルのrootとして初期化する"""
+    from kakuyomu.types.errors import TOMLAlreadyExistsError
+
+    client = get_client()
     try:
         client.initialize_work()
     except TOMLAlreadyExistsError as e:
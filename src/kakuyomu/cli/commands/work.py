@@ -2,10 +2,7 @@
 
 import click
 
-from kakuyomu.client import Client
-from kakuyomu.types.path import Path
-
-client = Client(Path.cwd())
+from .context import get_client
 
 
 @click.group()
@@ -16,5 +13,6 @@ def work() -> None:
 @work.command("list")
 def ls() -> None:
     """小説タイトルの一覧を表示する"""
+    client = get_client()
     for i, work in enumerate(client.get_works().values()):
         print(f"{i}: {work}")
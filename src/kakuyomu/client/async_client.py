@@ -0,0 +1,241 @@
+"""
+Asynchronous client for one work
+
+This module needs httpx: pip install "kakuyomu-cli[async]"
+"""
+
+import asyncio
+import datetime
+import time
+from collections.abc import Sequence
+from typing import Any, Self
+
+from kakuyomu.logger import get_logger
+from kakuyomu.settings import CONFIG_DIRNAME
+from kakuyomu.settings.const import JST
+from kakuyomu.types.errors import EpisodeNotFoundError
+from kakuyomu.types.path import ConfigDir, Path
+from kakuyomu.types.work import EpisodeId, LocalEpisode, LoginStatus, RemoteEpisode, Work
+
+from .async_web import AsyncSession
+from .decorators import require_login_async
+from .request_models import PublishRequest, UpdateEpisodeRequest
+from .session_base import load_cookie
+from .toc_store import TocStore
+from .work_store import WorkStore
+
+logger = get_logger()
+
+
+class AsyncClient:
+    """
+    Asynchronous counterpart of Client for automation
+
+    Clients of several works can share one AsyncSession,
+    so they use the same connection pool, concurrency bound and rate limiters in one event loop.
+    The login cookie is read from the file saved by `kakuyomu login`.
+    """
+
+    session: AsyncSession
+    cwd: Path
+    config_dir: ConfigDir
+    work_store: WorkStore
+    toc_store: TocStore
+    login_cache_ttl: float
+    _login_status: tuple[float, LoginStatus] | None
+    _login_lock: asyncio.Lock
+
+    def __init__(
+        self,
+        cwd: Path,
+        session: AsyncSession | None = None,
+        login_cache_ttl: float = 300,
+        toc_ttl: float = 600,
+    ) -> None:
+        """
+        Initialize async client
+
+        Args:
+        ----
+            cwd: directory in the work
+            session: session shared with other clients, a new one with the saved cookie if None
+            login_cache_ttl: seconds to reuse the login status checked by require_login_async
+            toc_ttl: seconds to keep the saved toc
+
+        """
+        self.cwd = cwd
+        try:
+            self.config_dir = self.cwd.config_dir
+        except FileNotFoundError as e:
+            logger.info(f"{e} {CONFIG_DIRNAME=} not found")
+            self.config_dir = ConfigDir(Path.joinpath(cwd, CONFIG_DIRNAME))
+        self.work_store = WorkStore(self.config_dir.work_toml, cache_path=self.config_dir.work_cache)
+        self.toc_store = TocStore(self.config_dir.toc, ttl=toc_ttl)
+        self.login_cache_ttl = login_cache_ttl
+        self._login_status = None
+        self._login_lock = asyncio.Lock()
+        self.session = session or AsyncSession(cookies=load_cookie(self.config_dir.cookie))
+
+    async def __aenter__(self) -> Self:
+        """Enter async context"""
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        """Close the session"""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the session"""
+        await self.session.aclose()
+
+    @property
+    def work(self) -> Work:
+        """Load work (cached until work.toml is modified)"""
+        return self.work_store.load()
+
+    async def status(self) -> LoginStatus:
+        """Get login status"""
+        self.session.login_expired = False
+        my_scraper = await self.session.my_page()
+        user = my_scraper.scrape_login_user()
+        if user:
+            private_scraper = await self.session.private_page()
+            status = LoginStatus(is_login=True, email=private_scraper.scrape_email(), name=user)
+        else:
+            status = LoginStatus(is_login=False, email="", name="")
+        self._login_status = (time.monotonic(), status)
+        return status
+
+    async def cached_status(self) -> LoginStatus:
+        """Get login status cached for login_cache_ttl seconds"""
+        # 同時に呼ばれても確認のリクエストは1回にする
+        async with self._login_lock:
+            if self._login_status and not self.session.login_expired:
+                checked_at, status = self._login_status
+                if time.monotonic() - checked_at < self.login_cache_ttl:
+                    return status
+            return await self.status()
+
+    def get_episode_by_id(self, episode_id: EpisodeId) -> LocalEpisode:
+        """Get local episode by id"""
+        episode = self.work.episodes.get(episode_id)
+        if episode is None:
+            raise EpisodeNotFoundError(f"エピソードが見つかりません: {episode_id}")
+        return episode
+
+    @require_login_async
+    async def get_remote_episodes(self) -> list[RemoteEpisode]:
+        """Get episodes from work page"""
+        work_id = self.work.id
+        scraper = await self.session.work_page(work_id)
+        records = scraper.scrape_episode_records()
+        self.toc_store.dump(work_id, records)
+        return [record.remote() for record in records]
+
+    @require_login_async
+    async def _get_remote_episode_body(self, episode_id: EpisodeId) -> list[str]:
+        """Get episode body"""
+        scraper = await self.session.episode_page(self.work.id, episode_id)
+        # 最初の改行は削除
+        body = scraper.scrape_body().lstrip("\n")
+        return body.split("\n")
+
+    async def update_remote_episode(self, episode_id: EpisodeId, force: bool = False) -> bool:
+        """Update remote episode with its linked file, return False if the file is unchanged"""
+        result = (await self.update_remote_episodes([episode_id], force=force))[episode_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def update_remote_episodes(
+        self, episode_ids: Sequence[EpisodeId], force: bool = False
+    ) -> dict[EpisodeId, bool | Exception]:
+        """
+        Update remote episodes concurrently
+
+        Episodes whose linked file has the same content hash as the last push are skipped
+        without any request unless force is set.
+
+        Args:
+        ----
+            episode_ids: Episode IDs to update with their linked files
+            force: upload even if the linked file is unchanged
+
+        Returns:
+        -------
+            dict of episode id to True if uploaded, False if skipped, or the raised exception
+
+        """
+        work_root = self.config_dir.work_root
+        results: dict[EpisodeId, bool | Exception] = {}
+        hashes: dict[EpisodeId, str] = {}
+        for episode_id in episode_ids:
+            try:
+                local_episode = self.get_episode_by_id(episode_id)
+                # ファイル全体を読むので, 同じイベントループの他の作品を止めないようにスレッドで計算する
+                content_hash = await asyncio.to_thread(local_episode.compute_hash, work_root)
+            except Exception as e:
+                logger.error(f"failed {episode_id}: {e}")
+                results[episode_id] = e
+                continue
+            if not force and content_hash == local_episode.content_hash:
+                logger.info(f"skip unchanged episode: {local_episode}")
+                results[episode_id] = False
+                continue
+            hashes[episode_id] = content_hash
+
+        if hashes:
+            uploaded = await self._update_remote_episodes(list(hashes))
+            self._mark_pushed({episode_id: hashes[episode_id] for episode_id, e in uploaded.items() if e is None})
+            for episode_id, error in uploaded.items():
+                results[episode_id] = error if error else True
+
+        return {episode_id: results[episode_id] for episode_id in episode_ids}
+
+    @require_login_async
+    async def _update_remote_episodes(self, episode_ids: Sequence[EpisodeId]) -> dict[EpisodeId, Exception | None]:
+        """Upload linked files concurrently, bounded by the session"""
+        uploads = [self._update_remote_episode(episode_id) for episode_id in episode_ids]
+        errors = await asyncio.gather(*uploads, return_exceptions=True)
+        results: dict[EpisodeId, Exception | None] = {}
+        for episode_id, error in zip(episode_ids, errors):
+            if isinstance(error, BaseException) and not isinstance(error, Exception):
+                raise error
+            if error is not None:
+                logger.error(f"failed {episode_id}: {error}")
+            results[episode_id] = error
+        return results
+
+    def _mark_pushed(self, hashes: dict[EpisodeId, str]) -> None:
+        """Save content hashes of uploaded files to work.toml"""
+        if not hashes:
+            return
+        work = self.work
+        pushed_at = datetime.datetime.now(JST)
+        for episode_id, content_hash in hashes.items():
+            work.episodes[episode_id].mark_pushed(content_hash, pushed_at)
+        self.work_store.dump(work)
+
+    async def _update_remote_episode(self, episode_id: EpisodeId) -> None:
+        """Upload the linked file of the episode"""
+        local_episode = self.get_episode_by_id(episode_id)
+        scraper = await self.session.episode_page(self.work.id, episode_id)
+        request_body = UpdateEpisodeRequest.create_from_status(
+            csrf_token=scraper.scrape_csrf_token(),
+            title=local_episode.title,
+            body=local_episode.path(self.config_dir.work_root),
+            status=scraper.scrape_status(),
+        )
+        await self.session.update_episode(self.work.id, episode_id, request=request_body)
+
+    @require_login_async
+    async def reserve_publishing_episode(self, episode_id: EpisodeId, publish_at: datetime.datetime) -> None:
+        """Reserve publishing the episode at publish_at"""
+        request_body = PublishRequest.create(episode_id=episode_id, publish_at=publish_at)
+        await self.session.publish_reserve(self.work.id, episode_id, request_body)
+
+    @require_login_async
+    async def cancel_reservation(self, episode_id: EpisodeId) -> None:
+        """Cancel reservation"""
+        request_body = PublishRequest.create(episode_id=episode_id, publish_at=None)
+        await self.session.publish_reserve(self.work.id, episode_id, request_body)
@@ -0,0 +1,192 @@
+"""
+Asynchronous web client for kakuyomu
+
+This module needs httpx: pip install "kakuyomu-cli[async]"
+"""
+
+import asyncio
+import http
+import time
+from collections.abc import AsyncIterator
+from http.cookiejar import CookieJar
+from typing import Any
+
+try:
+    import httpx
+except ImportError as e:
+    raise ImportError('AsyncSessionにはhttpxが必要です: pip install "kakuyomu-cli[async]"') from e
+
+from kakuyomu.logger import get_logger
+from kakuyomu.scrapers.base import ScraperBase
+from kakuyomu.scrapers.episode_page import EpisodePageScraper
+from kakuyomu.scrapers.my_page import MyPageScraper
+from kakuyomu.scrapers.private_page import PrivatePageScraper
+from kakuyomu.scrapers.work_page import WorkPageScraper
+from kakuyomu.settings import URL
+from kakuyomu.types.errors import EpisodeReservePublishError, EpisodeUpdateFailedError, NotLoginError
+from kakuyomu.types.work import EpisodeId, WorkId
+
+from .form_body import FORM_CONTENT_TYPE, FormBody
+from .rate_limit import EndpointClass, RateLimiter, acquire_async
+from .request_models import PublishRequest, UpdateEpisodeRequest
+from .session_base import SessionBase
+from .trace import RequestEvent
+
+logger = get_logger()
+
+
+async def _stream(body: FormBody) -> AsyncIterator[bytes]:
+    """Async iterator over the form body for httpx, reading the file in a worker thread"""
+    chunks = iter(body)
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        yield chunk
+
+
+class AsyncSession(SessionBase, httpx.AsyncClient):
+    """
+    Asynchronous session for kakuyomu
+
+    Connections are pooled and at most max_concurrency requests are in flight at once.
+    The rate limiters are the same as Session's and can be shared with it.
+    A session can be shared by AsyncClients of several works.
+    """
+
+    _semaphore: asyncio.Semaphore
+
+    def __init__(
+        self,
+        read_limiter: RateLimiter | None = None,
+        write_limiter: RateLimiter | None = None,
+        root_url: str = URL.ROOT,
+        max_concurrency: int = 4,
+        cookies: CookieJar | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        Initialize session
+
+        Args:
+        ----
+            read_limiter: rate limiter for page loads. default: TokenBucket.default(EndpointClass.READ)
+            write_limiter: rate limiter for POST requests. default: TokenBucket.default(EndpointClass.WRITE)
+            root_url: URL used in place of https://kakuyomu.jp
+            max_concurrency: number of requests in flight at the same time
+            cookies: login cookies, e.g. the cookie saved by `kakuyomu login`
+            timeout: seconds to wait for each request
+
+        """
+        super().__init__(
+            cookies=cookies,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            event_hooks={"response": [self._detect_login_expired]},
+        )
+        self._init_base(read_limiter, write_limiter, root_url)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _detect_login_expired(self, res: httpx.Response) -> None:
+        """Mark login as expired on 401 or redirect to the login page"""
+        redirect_to = str(res.url.join(res.headers.get("location", ""))) if res.is_redirect else ""
+        self._check_login_expired(res.status_code, str(res.url), redirect_to)
+
+    async def _send(
+        self,
+        endpoint: str,
+        endpoint_class: EndpointClass,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> tuple[httpx.Response, RequestEvent | None]:
+        """Wait for the rate limiter and a free slot, then send a request"""
+        wait = await acquire_async(self.rate_limiters[endpoint_class])
+        if method == "POST":
+            kwargs["headers"] = kwargs.get("headers", {}) | {"X-requested-With": "XMLHttpRequest"}
+        async with self._semaphore:
+            started_at = time.time()
+            start = time.perf_counter()
+            try:
+                res = await self.request(method, self.url(url), **kwargs)
+            except httpx.HTTPError as e:
+                self._emit_error(endpoint, endpoint_class, method, url, started_at, wait, start, e)
+                raise
+            network = time.perf_counter() - start
+        if not self.request_hooks:
+            return res, None
+        event = RequestEvent(
+            endpoint=endpoint,
+            endpoint_class=endpoint_class,
+            method=method,
+            url=str(res.url),
+            status=res.status_code,
+            bytes=len(res.content),
+            started_at=started_at,
+            wait=wait,
+            network=network,
+        )
+        return res, event
+
+    async def _get_page[S: ScraperBase](self, endpoint: str, url: str, scraper_class: type[S], login: bool = True) -> S:
+        """Get a page and create its scraper, raise NotLoginError if login is True and the login has expired"""
+        res, event = await self._send(endpoint, EndpointClass.READ, "GET", url)
+        if login and self.login_expired:
+            self._emit(event)
+            raise NotLoginError(f"Not Login: {url}")
+        scraper = scraper_class(res.text)
+        if event is not None:
+            start = time.perf_counter()
+            scraper.soup
+            event.parse = time.perf_counter() - start
+        self._emit(event)
+        return scraper
+
+    async def my_page(self) -> MyPageScraper:
+        """Get my page"""
+        return await self._get_page("my_page", URL.MY, MyPageScraper, login=False)
+
+    async def private_page(self) -> PrivatePageScraper:
+        """Get private page"""
+        return await self._get_page("private_page", URL.PRIVATE, PrivatePageScraper, login=False)
+
+    async def work_page(self, work_id: WorkId) -> WorkPageScraper:
+        """Get work page"""
+        return await self._get_page("work_page", URL.MY_WORK.format(work_id=work_id), WorkPageScraper)
+
+    async def episode_page(self, work_id: WorkId, episode_id: EpisodeId) -> EpisodePageScraper:
+        """Get episode page"""
+        url = URL.EPISODE.format(work_id=work_id, episode_id=episode_id)
+        return await self._get_page("episode_page", url, EpisodePageScraper)
+
+    async def update_episode(self, work_id: WorkId, episode_id: EpisodeId, request: UpdateEpisodeRequest) -> None:
+        """Update Episode"""
+        url = URL.EPISODE.format(work_id=work_id, episode_id=episode_id)
+        body = request.form_body()
+        # 長さを数えるのにもファイルを読むので, イベントループを止めないようにスレッドで数える
+        length = await asyncio.to_thread(len, body)
+        headers = {"Content-Type": FORM_CONTENT_TYPE, "Content-Length": str(length)}
+        res, event = await self._send(
+            "update_episode", EndpointClass.WRITE, "POST", url, content=_stream(body), headers=headers
+        )
+        self._emit(event)
+        if res.status_code != http.HTTPStatus.OK:
+            logger.error(f"{res.status_code=} {res.text=}")
+            raise EpisodeUpdateFailedError(f"update failed: {res}")
+        logger.info(f"UPDATE {episode_id}: {res.status_code=} bytes={len(res.content)}")
+
+    async def publish_reserve(self, work_id: WorkId, episode_id: EpisodeId, request: PublishRequest) -> None:
+        """Reserve publish"""
+        url = URL.OPERATION.format(opname=request.operationName)
+        headers = dict(
+            Referer=self.url(URL.PUBLISH.format(work_id=work_id, episode_id=episode_id)),
+        )
+        res, event = await self._send(
+            "publish_reserve", EndpointClass.WRITE, "POST", url, headers=headers, json=request.model_dump()
+        )
+        self._emit(event)
+        if res.status_code != http.HTTPStatus.OK:
+            logger.error(f"{res.status_code=} {res.text=}")
+            raise EpisodeReservePublishError(f"publish failed: {res}")
+        if errors := request.response_errors(res.content):
+            logger.error(f"{errors=}")
+            raise EpisodeReservePublishError(f"publish failed: {errors}")
+        logger.info(f"PUBLISH {episode_id}: {res.status_code=} bytes={len(res.content)}")
@@ -0,0 +1,37 @@
+"""Helpers for running client operations over many episodes"""
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+from kakuyomu.logger import get_logger
+
+logger = get_logger()
+
+
+def run_bulk[T, R](func: Callable[[T], R], items: Sequence[T], max_workers: int) -> dict[T, R | Exception]:
+    """
+    Run func for each item in a bounded thread pool
+
+    Returns results keyed by item in the given order.
+    An exception raised for one item is stored as its result and does not stop the others.
+    On KeyboardInterrupt (or any other BaseException) the queued items are cancelled,
+    the running ones are waited for, and the exception is re-raised.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1: {max_workers=}")
+    results: dict[T, R | Exception] = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {item: executor.submit(func, item) for item in items}
+        for item, future in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                logger.error(f"failed {item}: {e}")
+                results[item] = e
+    except BaseException:
+        # Ctrl-Cでは待機中の項目を実行しない
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+    return results
@@ -2,25 +2,46 @@
 
 import datetime
 import pickle
-from typing import Iterable, Sequence
+import re
+import time
+from contextlib import AbstractContextManager
+from typing import Iterable, Mapping, Sequence
 
-import toml
 from requests.cookies import RequestsCookieJar
 
 from kakuyomu.logger import get_logger
 from kakuyomu.settings import CONFIG_DIRNAME
+from kakuyomu.settings.const import JST
 from kakuyomu.types.errors import (
     EpisodeAlreadyLinkedError,
+    EpisodeCreateFailedError,
+    EpisodeFileExistsError,
     EpisodeHasNoPathError,
     EpisodeNotFoundError,
     TOMLAlreadyExistsError,
 )
 from kakuyomu.types.path import ConfigDir, Path
-from kakuyomu.types.work import Diff, EpisodeId, LocalEpisode, LoginStatus, Query, RemoteEpisode, Work, WorkId
+from kakuyomu.types.work import (
+    Diff,
+    EpisodeId,
+    EpisodeRecord,
+    LocalEpisode,
+    LoginStatus,
+    Query,
+    RemoteEpisode,
+    Work,
+    WorkId,
+)
+from kakuyomu.types.work.episode import PublishReservationStatus
 
+from .bulk import run_bulk
 from .decorators import require_login
+from .http_cache import HttpCache
 from .request_models import CreateEpisodeRequest, DeleteEpisodesRequest, PublishRequest, UpdateEpisodeRequest
+from .session_base import load_cookie
+from .toc_store import TocStore
 from .web import Session
+from .work_store import WorkStore, _replace
 
 logger = get_logger()
 
@@ -31,58 +52,94 @@ class Client:
     session: Session
     cwd: Path
     config_dir: ConfigDir
+    work_store: WorkStore
     email: str
+    login_cache_ttl: float
+    _login_status: tuple[float, LoginStatus] | None = None
+
+    def __init__(
+        self,
+        cwd: Path = Path.cwd(),
+        wait_time: float | None = None,
+        login_cache_ttl: float = 300,
+        toc_ttl: float = 600,
+    ) -> None:
+        """
+        Initialize web client
+
+        Args:
+        ----
+            cwd: directory in the work
+            wait_time: if set, limit all requests to one per wait_time seconds instead of the default rate limits
+            login_cache_ttl: seconds to reuse the login status checked by require_login
+            toc_ttl: seconds to choose episodes from the saved toc without fetching the work page
 
-    def __init__(self, cwd: Path = Path.cwd(), wait_time: float = 0.1) -> None:
-        """Initialize web client"""
+        """
         self.session = Session()
+        if wait_time is not None:
+            self.session.set_wait_time(wait_time)
         self.cwd = cwd
-        self.wait_time = wait_time
+        self.login_cache_ttl = login_cache_ttl
         try:
             self.config_dir = self.cwd.config_dir
         except FileNotFoundError as e:
             logger.info(f"{e} {CONFIG_DIRNAME=} not found")
             self.config_dir = ConfigDir(Path.joinpath(cwd, CONFIG_DIRNAME))
+        self.work_store = WorkStore(self.config_dir.work_toml, cache_path=self.config_dir.work_cache)
+        self.session.http_cache = HttpCache(self.config_dir.http_cache)
+        self.toc_store = TocStore(self.config_dir.toc, ttl=toc_ttl)
         cookies = self._load_cookie(self.config_dir.cookie)
         if cookies:
             self.session.cookies = cookies
 
     def _load_cookie(self, filepath: Path) -> RequestsCookieJar | None:
-        cookie: RequestsCookieJar | None
-        try:
-            with open(filepath, "rb") as f:
-                cookie = pickle.load(f)
-                return cookie
-        except FileNotFoundError:
-            return None
-        except pickle.UnpicklingError:
-            return None
+        return load_cookie(filepath)
 
     @property
     def work(self) -> Work:
-        """Load work"""
-        return Work.load(self.config_dir.work_toml)
+        """Load work (cached until work.toml is modified)"""
+        return self.work_store.load()
 
     def status(self) -> LoginStatus:
         """Get login status"""
+        self.session.login_expired = False
         my_scraper = self.session.my_page()
         user = my_scraper.scrape_login_user()
         if user:
             private_scraper = self.session.private_page()
             email = private_scraper.scrape_email()
-            return LoginStatus(is_login=True, email=email, name=user)
+            status = LoginStatus(is_login=True, email=email, name=user)
         else:
-            return LoginStatus(is_login=False, email="", name="")
+            status = LoginStatus(is_login=False, email="", name="")
+        self._login_status = (time.monotonic(), status)
+        return status
+
+    def cached_status(self) -> LoginStatus:
+        """
+        Get login status cached for login_cache_ttl seconds
+
+        The cache is dropped when the session sees a 401 or a redirect to the login page.
+        """
+        if self._login_status and not self.session.login_expired:
+            checked_at, status = self._login_status
+            if time.monotonic() - checked_at < self.login_cache_ttl:
+                return status
+        return self.status()
 
     def logout(self) -> None:
         """Logout"""
         self.session.cookies.clear()
         self.config_dir.cookie.unlink(missing_ok=True)
+        self._login_status = None
+        if self.session.http_cache is not None:
+            self.session.http_cache.clear()
+        self.toc_store.clear()
 
     def login(self, email: str, password: str) -> None:
         """Login"""
         res = self.session.login(email, password)
         self.email = email
+        self._login_status = None
 
         # save cookie to a file
         if not self.config_dir.exists():
@@ -97,44 +154,57 @@ class Client:
         works: dict[WorkId, Work] = scraper.scrape_works()
         return works
 
-    @require_login
     def get_remote_episodes(self) -> Sequence[RemoteEpisode]:
         """Get episodes and csrf token from work page"""
+        return [record.remote() for record in self._get_remote_episode_records()]
+
+    @require_login
+    def _get_remote_episode_records(self) -> list[EpisodeRecord]:
+        """Get episodes as records and csrf token from work page"""
         work_id = self.work.id
         scraper = self.session.work_page(work_id)
-        episodes: list[RemoteEpisode] = scraper.scrape_episodes()
+        records = scraper.scrape_episode_records()
         csrf_token = scraper.scrape_csrf_token()
         self._toc_token = csrf_token
-        return episodes
+        self.toc_store.dump(work_id, records)
+        return records
 
     @require_login
     def fetch_remote_episodes(self) -> Diff:
         """Fetch remote episodes"""
-        before_episodes = self.work.episodes
-
-        episodes = []
-
-        for remote_episode in self.get_remote_episodes():
-            local_episode = self.get_local_episode_by_remote_episode(remote_episode)
-            episodes.append(local_episode)
-
         work = self.work
-        work.episodes = {episode.id: episode for episode in episodes}
+        diff = self._merge_remote_episodes(work, self._get_remote_episode_records())
+        self._dump_work_toml(work)
+        return diff
 
-        after_episodes = work.episodes
+    def _merge_remote_episodes(self, work: Work, remote_episodes: Sequence[EpisodeRecord]) -> Diff:
+        """
+        Replace episodes of work with remote episodes in toc order
 
-        self._dump_work_toml(work)
+        Local episodes already known keep their links, and their titles are updated to the remote ones.
+        """
+        before_episodes = work.episodes
+        episodes: list[LocalEpisode] = []
+        for remote_episode in remote_episodes:
+            episode = before_episodes.get(remote_episode.id)
+            if episode is None:
+                episode = LocalEpisode(id=remote_episode.id, title=remote_episode.title)
+            elif episode.title != remote_episode.title:
+                # 差分でrenamedになるように, 元のエピソードは変更せずにコピーする
+                episode = episode.model_copy(update={"title": remote_episode.title})
+            episodes.append(episode)
+        work.episodes = {episode.id: episode for episode in episodes}
 
         before = Query(before_episodes)
-        after = Query(after_episodes)
+        after = Query(work.episodes)
 
         return before.diff(after)
 
     @require_login
-    def link_file(self, filepath: Path, filter_text: str) -> LocalEpisode:
+    def link_file(self, filepath: Path, filter_text: str, refresh: bool = False) -> LocalEpisode:
         """Link file"""
         try:
-            remote_episode = self._select_remote_episode(filter_text=filter_text)
+            remote_episode = self._select_remote_episode(filter_text=filter_text, refresh=refresh)
             # set path
             local_episode = self._link_file(filepath, remote_episode.id)
             return local_episode
@@ -147,20 +217,42 @@ class Client:
     def _link_file(self, filepath: Path, episode_id: EpisodeId) -> LocalEpisode:
         """Link file"""
         work = self.work  # copy property to local variable
-        if same_path_episode := self.get_episode_by_path(filepath):
+        if same_path_episode := work.get_episode_by_path(self.config_dir.work_root, filepath):
             logger.error(f"same path{ same_path_episode= }")
             raise EpisodeAlreadyLinkedError(f"同じファイルパスが既にリンクされています: {same_path_episode}")
 
         if episode_id not in work.episodes:
             raise EpisodeNotFoundError(f"エピソードが見つかりません: {episode_id}")
 
-        work_episode = work.episodes[episode_id]
-        work_episode.set_path(self.config_dir.work_root, filepath)
+        work_episode = work.set_episode_path(episode_id, self.config_dir.work_root, filepath)
         logger.info(f"set filepath to episode: {episode_id}")
         result = work_episode
         self._dump_work_toml(work)
         return result
 
+    def link_files(self, links: Sequence[tuple[Path, EpisodeId]]) -> dict[EpisodeId, LocalEpisode | Exception]:
+        """
+        Link files to episodes with a single work.toml write
+
+        Args:
+        ----
+            links: list of (filepath, episode id)
+
+        Returns:
+        -------
+            dict of episode id to the linked episode or the raised exception
+
+        """
+        results: dict[EpisodeId, LocalEpisode | Exception] = {}
+        with self.transaction():
+            for filepath, episode_id in links:
+                try:
+                    results[episode_id] = self._link_file(filepath, episode_id)
+                except (EpisodeAlreadyLinkedError, EpisodeNotFoundError) as e:
+                    logger.error(f"failed to link {filepath} {episode_id}: {e}")
+                    results[episode_id] = e
+        return results
+
     def unlink(self, filter_text: str) -> LocalEpisode:
         """Unlink episode"""
         try:
@@ -184,59 +276,127 @@ class Client:
         episode = work.episodes[episode_id]
         if not episode.rel_path:
             raise EpisodeHasNoPathError(f"エピソードにファイルパスが設定されていません: {episode}")
-        episode.rel_path = None
+        work.unset_episode_path(episode_id)
         self._dump_work_toml(work)
         return episode
 
     def get_episode_by_id(self, episode_id: str) -> LocalEpisode:
         """Get episode by id"""
-        if episode_id not in self.work.episodes:
-            raise EpisodeNotFoundError(f"エピソードが見つかりません: {episode_id} {self.work.episodes}")
-        return self.work.episodes[episode_id]
+        episodes = self.work.episodes
+        if episode_id not in episodes:
+            raise EpisodeNotFoundError(f"エピソードが見つかりません: {episode_id} {episodes}")
+        return episodes[episode_id]
 
     def get_episode_by_path(self, filepath: Path) -> LocalEpisode | None:
         """Get episode by path"""
-        logger.debug(f"local episodes: { self.work.episodes }")
-        for episode in self.work.episodes.values():
-            if episode.rel_path and episode.path(self.config_dir.work_root).absolute() == filepath.absolute():
-                return episode
-        return None
+        return self.work.get_episode_by_path(self.config_dir.work_root, filepath)
 
-    def get_local_episode_by_remote_episode(self, remote_episode: RemoteEpisode) -> LocalEpisode:
-        """Get episode by remote episode"""
-        assert self.work
-        if remote_episode.id in self.work.episodes:
-            return self.work.episodes[remote_episode.id]
-        return LocalEpisode(id=remote_episode.id, title=remote_episode.title)
+    def create_remote_episode(self, title: str, filepath: Path) -> LocalEpisode:
+        """
+        Create episode as draft
+
+        The work page is loaded only once after creating the episode.
+        The new episode is linked to filepath and work.toml is synced with that toc.
+        """
+        return self.create_remote_episodes([(title, filepath)])[0]
 
     @require_login
-    def create_remote_episode(self, title: str, filepath: Path) -> None:
-        """Create episode as draft"""
-        # check if file exists
-        if not filepath.exists():
-            logger.error(f"file not found: {filepath}")
-            raise FileNotFoundError(f"file not found: {filepath}")
+    def create_remote_episodes(self, episodes: Sequence[tuple[str, Path]]) -> list[LocalEpisode]:
+        """
+        Create episodes as drafts in the given order
 
-        # check if episode already exists
-        if self.get_episode_by_path(filepath):
-            logger.error(f"episode already exists: {filepath}")
-            raise EpisodeAlreadyLinkedError(f"episode already exists: {filepath}")
+        The work page is loaded once after all episodes are created, and the new episodes are
+        linked to their files with a single work.toml write.
+        If creating an episode fails, the episodes created before it are still linked and the error is raised.
 
-        before_episodes = self.get_remote_episodes()
+        Args:
+        ----
+            episodes: list of (title, filepath)
 
-        with open(filepath, "r") as f:
-            body = f.read()
-            data = CreateEpisodeRequest(title=title, body=body)
+        Returns:
+        -------
+            created local episodes in the given order
 
-            self.session.create_episode(self.work.id, data)
+        """
+        work = self.work
+        work_root = self.config_dir.work_root
 
-        after_episodes = self.get_remote_episodes()
+        filepaths: set[Path] = set()
+        linked = work.get_episodes_by_paths(work_root, [filepath for _, filepath in episodes])
+        for _, filepath in episodes:
+            # check if file exists
+            if not filepath.exists():
+                logger.error(f"file not found: {filepath}")
+                raise FileNotFoundError(f"file not found: {filepath}")
+            # check if episode already exists
+            if filepath in linked or filepath.absolute() in filepaths:
+                logger.error(f"episode already exists: {filepath}")
+                raise EpisodeAlreadyLinkedError(f"episode already exists: {filepath}")
+            filepaths.add(filepath.absolute())
+
+        created: list[tuple[str, Path, EpisodeId | None]] = []
+        error: Exception | None = None
+        for title, filepath in episodes:
+            # 本文は送信時にファイルから読み込む
+            data = CreateEpisodeRequest(title=title, body=Path(filepath))
+            try:
+                created_id = self.session.create_episode(work.id, data)
+            except Exception as e:
+                logger.error(f"failed to create episode: {title} {filepath} {e}")
+                error = e
+                break
+            created.append((title, filepath, created_id))
+
+        if not created:
+            assert error
+            raise error
+
+        remote_episodes = self._get_remote_episode_records()
+        episode_ids = self._find_created_episode_ids(work, remote_episodes, created)
+
+        self._merge_remote_episodes(work, remote_episodes)
+        result: list[LocalEpisode] = []
+        for episode_id, (_, filepath, _) in zip(episode_ids, created):
+            result.append(work.set_episode_path(episode_id, work_root, filepath))
+            logger.info(f"set filepath to episode: {episode_id}")
+        self._dump_work_toml(work)
 
-        self.fetch_remote_episodes()
+        if error:
+            raise error
+        return result
 
-        new_episode = (set(after_episodes) - set(before_episodes)).pop()
+    def _find_created_episode_ids(
+        self,
+        work: Work,
+        remote_episodes: Sequence[EpisodeRecord],
+        created: Sequence[tuple[str, Path, EpisodeId | None]],
+    ) -> list[EpisodeId]:
+        """
+        Find the ids of the episodes just created
 
-        self._link_file(filepath, new_episode.id)
+        Ids returned by the create response are used as they are.
+        The others are looked up in the toc: new episodes are appended to the end in creation order,
+        so the last episodes which are not in work.toml are chosen, preferring the same title.
+        """
+        known_ids = {created_id for _, _, created_id in created if created_id}
+        candidates = [
+            episode for episode in remote_episodes if episode.id not in work.episodes and episode.id not in known_ids
+        ]
+
+        episode_ids: list[EpisodeId] = []
+        # 後ろから順に割り当てる
+        for title, _, created_id in reversed(created):
+            if created_id:
+                episode_ids.append(created_id)
+                continue
+            if not candidates:
+                raise EpisodeCreateFailedError(f"作成したエピソードが見つかりません: {title}")
+            same_title_episodes = [episode for episode in candidates if episode.title == title]
+            candidate = same_title_episodes[-1] if same_title_episodes else candidates[-1]
+            candidates.remove(candidate)
+            episode_ids.append(candidate.id)
+        episode_ids.reverse()
+        return episode_ids
 
     @require_login
     def delete_remote_episodes(self, episode_ids: Sequence[EpisodeId]) -> None:
@@ -246,13 +406,95 @@ class Client:
         if len(episode_ids) == 0:
             return
         self.session.delete_episodes(self.work.id, data)
+        # 削除したエピソードを選択肢に出さない
+        self.toc_store.clear()
+
+    def update_remote_episode(
+        self, filter_text: str, force: bool = False, refresh: bool = False
+    ) -> tuple[RemoteEpisode, bool]:
+        """
+        Update remote episode
+
+        Return the selected episode and whether it was uploaded (False if the linked file is unchanged)
+        """
+        remote_episode = self._select_remote_episode(filter_text=filter_text, refresh=refresh)
+        result = self.update_remote_episodes([remote_episode.id], max_workers=1, force=force)[remote_episode.id]
+        if isinstance(result, Exception):
+            raise result
+        return remote_episode, result
+
+    def update_remote_episodes(
+        self, episode_ids: Sequence[EpisodeId], max_workers: int = 4, force: bool = False
+    ) -> dict[EpisodeId, bool | Exception]:
+        """
+        Update remote episodes concurrently
+
+        Episodes whose linked file has the same content hash as the last push are skipped
+        without any request unless force is set.
+        All workers share the session's rate limiter, so the total request rate stays the same
+        regardless of max_workers.
+
+        Args:
+        ----
+            episode_ids: Episode IDs to update with their linked files
+            max_workers: number of episodes updated at the same time
+            force: upload even if the linked file is unchanged
+
+        Returns:
+        -------
+            dict of episode id to True if uploaded, False if skipped, or the raised exception
+
+        """
+        work_root = self.config_dir.work_root
+        results: dict[EpisodeId, bool | Exception] = {}
+        hashes: dict[EpisodeId, str] = {}
+        for episode_id in episode_ids:
+            try:
+                local_episode = self.get_episode_by_id(episode_id)
+                content_hash = local_episode.compute_hash(work_root)
+            except Exception as e:
+                logger.error(f"failed {episode_id}: {e}")
+                results[episode_id] = e
+                continue
+            if not force and content_hash == local_episode.content_hash:
+                logger.info(f"skip unchanged episode: {local_episode}")
+                results[episode_id] = False
+                continue
+            hashes[episode_id] = content_hash
+
+        if hashes:
+            finished: list[EpisodeId] = []
+            try:
+                uploaded = self._update_remote_episodes(list(hashes), max_workers=max_workers, finished=finished)
+            finally:
+                # 中断されても, アップロードが終わったエピソードのハッシュは記録する
+                self._mark_pushed({episode_id: hashes[episode_id] for episode_id in finished})
+            for episode_id, error in uploaded.items():
+                results[episode_id] = error if error else True
+
+        return {episode_id: results[episode_id] for episode_id in episode_ids}
 
     @require_login
-    def update_remote_episode(self, filter_text: str) -> RemoteEpisode:
-        """Update remote episodes"""
-        remote_episode = self._select_remote_episode(filter_text=filter_text)
-        self._update_remote_episode(remote_episode.id)
-        return remote_episode
+    def _update_remote_episodes(
+        self, episode_ids: Sequence[EpisodeId], max_workers: int, finished: list[EpisodeId]
+    ) -> dict[EpisodeId, Exception | None]:
+        """Upload linked files in a thread pool sharing the rate limiter, appending uploaded ids to finished"""
+
+        def upload(episode_id: EpisodeId) -> None:
+            self._update_remote_episode(episode_id)
+            finished.append(episode_id)
+
+        return run_bulk(upload, episode_ids, max_workers=max_workers)
+
+    def _mark_pushed(self, hashes: dict[EpisodeId, str]) -> None:
+        """Save content hashes of uploaded files to work.toml"""
+        if not hashes:
+            return
+        work = self.work
+        pushed_at = datetime.datetime.now(JST)
+        for episode_id, content_hash in hashes.items():
+            work.episodes[episode_id].mark_pushed(content_hash, pushed_at)
+        self._dump_work_toml(work)
 
     def _update_remote_episode(self, episode_id: EpisodeId, title: str = "", body: Iterable[str] = []) -> None:
         """
@@ -261,8 +503,8 @@ class Client:
         Args:
         ----
             episode_id: Episode ID
-            title: title
-            body: body
+            title: title, the local title if empty
+            body: lines without line endings (as returned by get_remote_episode_body), the linked file if empty
 
         Raises:
         ------
@@ -273,7 +515,8 @@ class Client:
 
         local_title = title if title else local_episode.title
         work_root = self.config_dir.work_root
-        local_body = "\n".join(body if body else local_episode.body(work_root))
+        # ファイルの行は改行を含むのでjoinせず, 送信時にファイルから読み込む
+        local_body: str | Path = "\n".join(body) if body else local_episode.path(work_root)
 
         scraper = self.session.episode_page(self.work.id, episode_id)
         csrf_token = scraper.scrape_csrf_token()
@@ -327,11 +570,125 @@ class Client:
         body_lines: list[str] = body.split("\n")
         return body_lines
 
+    def pull_remote_episode(
+        self, filter_text: str, directory: Path, overwrite: bool = False, refresh: bool = False
+    ) -> tuple[RemoteEpisode, bool]:
+        """
+        Pull the selected remote episode to a file
+
+        Return the selected episode and whether it was downloaded (False if already linked to an existing file)
+        """
+        self._check_in_work_root(directory)
+        remote_episode = self._select_remote_episode(filter_text=filter_text, refresh=refresh)
+        result = self.pull_remote_episodes(directory, [remote_episode.id], max_workers=1, overwrite=overwrite)
+        downloaded = result[remote_episode.id]
+        if isinstance(downloaded, Exception):
+            raise downloaded
+        return remote_episode, downloaded
+
+    @require_login
+    def pull_remote_episodes(
+        self,
+        directory: Path,
+        episode_ids: Sequence[EpisodeId] | None = None,
+        max_workers: int = 4,
+        overwrite: bool = False,
+    ) -> dict[EpisodeId, bool | Exception]:
+        """
+        Download bodies of remote episodes concurrently, write them to files and link them
+
+        The toc is merged into work.toml first. Episodes already linked to an existing file are skipped,
+        so an interrupted pull can be run again. Downloaded files are linked and their content hashes
+        recorded in one dump, which is also done when the pull is interrupted.
+
+        Args:
+        ----
+            directory: directory to write new files, named by the toc position and the title
+            episode_ids: episodes to download, all remote episodes if None
+            max_workers: number of episodes downloaded at the same time
+            overwrite: download linked episodes again and overwrite existing files
+
+        Returns:
+        -------
+            dict of episode id to True if downloaded, False if skipped, or the raised exception
+
+        """
+        # 全部ダウンロードしてからリンクに失敗しないように, 先にリンクできる場所か確かめる
+        self._check_in_work_root(directory)
+        work = self.work
+        work_root = self.config_dir.work_root
+        remote_episodes = self._get_remote_episode_records()
+        self._merge_remote_episodes(work, remote_episodes)
+        targets = list(episode_ids) if episode_ids is not None else [episode.id for episode in remote_episodes]
+        positions = {episode.id: i + 1 for i, episode in enumerate(remote_episodes)}
+        width = max(3, len(str(len(remote_episodes))))
+
+        results: dict[EpisodeId, bool | Exception] = {}
+        paths: dict[EpisodeId, Path] = {}
+        new_paths: dict[EpisodeId, Path] = {}
+        for episode_id in targets:
+            episode = work.episodes.get(episode_id)
+            if episode is None:
+                results[episode_id] = EpisodeNotFoundError(f"エピソードが見つかりません: {episode_id}")
+                continue
+            if episode.rel_path:
+                filepath = episode.path(work_root)
+                if filepath.exists() and not overwrite:
+                    results[episode_id] = False
+                    continue
+                paths[episode_id] = filepath
+            else:
+                new_paths[episode_id] = Path.joinpath(
+                    directory, f"{positions[episode_id]:0{width}}_{_safe_filename(episode.title)}.txt"
+                )
+
+        linked_episodes = work.get_episodes_by_paths(work_root, new_paths.values())
+        for episode_id, filepath in new_paths.items():
+            if linked := linked_episodes.get(filepath):
+                results[episode_id] = EpisodeAlreadyLinkedError(f"同じファイルパスが既にリンクされています: {linked}")
+                continue
+            if filepath.exists() and not overwrite:
+                results[episode_id] = EpisodeFileExistsError(f"ファイルが既に存在します: {filepath}")
+                continue
+            paths[episode_id] = filepath
+
+        downloaded: list[EpisodeId] = []
+
+        def download(episode_id: EpisodeId) -> None:
+            self._write_remote_episode_body(episode_id, paths[episode_id])
+            downloaded.append(episode_id)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        try:
+            for episode_id, error in run_bulk(download, list(paths), max_workers=max_workers).items():
+                results[episode_id] = error if error else True
+        finally:
+            # 中断されてもダウンロード済みのファイルはリンクしておき, 次回はスキップする
+            pulled_at = datetime.datetime.now(JST)
+            for episode_id in list(downloaded):
+                episode = work.set_episode_path(episode_id, work_root, paths[episode_id])
+                episode.mark_pushed(episode.compute_hash(work_root), pulled_at)
+            self._dump_work_toml(work)
+        return {episode_id: results[episode_id] for episode_id in targets}
+
+    def _check_in_work_root(self, directory: Path) -> None:
+        """Raise ValueError if files in directory cannot be linked, as they are outside of the work root"""
+        work_root = self.config_dir.work_root
+        if not directory.absolute().is_relative_to(work_root.absolute()):
+            raise ValueError(f"作品のディレクトリの外にはダウンロードできません: {directory} (作品: {work_root})")
+
+    def _write_remote_episode_body(self, episode_id: EpisodeId, filepath: Path) -> None:
+        """Write the remote body to filepath, replacing it at once"""
+        body = "\n".join(self._get_remote_episode_body(episode_id))
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        _replace(filepath, body.encode("utf-8"))
+        logger.info(f"pull {episode_id}: {filepath}")
+
     @require_login
-    def get_remote_episode_body(self, filter_text: str) -> Iterable[str]:
+    def get_remote_episode_body(self, filter_text: str, refresh: bool = False) -> Iterable[str]:
         """Get episode body"""
         try:
-            remote_episode = self._select_remote_episode(filter_text=filter_text)
+            remote_episode = self._select_remote_episode(filter_text=filter_text, refresh=refresh)
             body: Iterable[str] = self._get_remote_episode_body(remote_episode.id)
             return body
         except ValueError:
@@ -339,24 +696,43 @@ class Client:
         except IndexError:
             raise ValueError("選択された番号が存在しません")
 
+    def transaction(self) -> AbstractContextManager[None]:
+        """
+        Write work.toml once at the end of the block
+
+        e.g. fetch and link several files with one write:
+
+            with client.transaction():
+                client.fetch_remote_episodes()
+                client.link_files(links)
+        """
+        return self.work_store.transaction()
+
     def _dump_work_toml(self, work: Work) -> None:
         """Initialize work"""
         toml_path = self.config_dir.work_toml
         if toml_path.exists():
-            logger.info(f"work toml {toml_path=} already exists. override {work}")
+            # 大きな作品では全エピソードの文字列化が書き込みより遅いので作品名と件数だけ出す
+            logger.info(f"work toml {toml_path=} already exists. override {work.id}:{work.title}")
 
         try:
-            with open(toml_path, "w") as f:
-                toml.dump(work.model_dump(), f)
+            self.work_store.dump(work)
         except IOError as e:
             logger.error(f"ファイル書き込みエラー: {e}")
             raise
 
-        logger.info(f"dump work toml: {work}")
+        logger.info(f"dump work toml: {work.id}:{work.title} episodes={len(work.episodes)}")
 
-    def _select_remote_episode(self, filter_text: str) -> RemoteEpisode:
+    def _toc_for_selection(self, refresh: bool = False) -> Sequence[RemoteEpisode]:
+        """Remote episodes to choose from, taken from the saved toc unless it is expired or refresh is True"""
+        if not refresh and (episodes := self.toc_store.load(self.work.id)) is not None:
+            logger.debug(f"use toc snapshot: {self.toc_store.path}")
+            return episodes
+        return self.get_remote_episodes()
+
+    def _select_remote_episode(self, filter_text: str, refresh: bool = False) -> RemoteEpisode:
         """Select remote episode"""
-        episodes: Sequence[RemoteEpisode] = self.get_remote_episodes()
+        episodes: Sequence[RemoteEpisode] = self._toc_for_selection(refresh=refresh)
         if filter_text:
             episodes = [episode for episode in episodes if filter_text in episode.id or filter_text in episode.title]
 
@@ -402,15 +778,92 @@ class Client:
 
         self.session.publish_reserve(self.work.id, episode_id, request_body)
 
-    def reserve_publishing_episode(self, publish_at: datetime.datetime, filter_text: str) -> None:
-        """Publish episode"""
-        episode = self._select_remote_episode(filter_text=filter_text)
-        self._reserve_publishing_episode(episode.id, publish_at)
+    def reserve_publishing_episode(
+        self, publish_at: datetime.datetime, filter_text: str, refresh: bool = False, skip_unchanged: bool = False
+    ) -> bool:
+        """
+        Publish episode
 
-    def cancel_reservation(self, filter_text: str) -> None:
-        """Cancel reservation"""
-        episode = self._select_remote_episode(filter_text=filter_text)
-        self._cancel_reservation(episode.id)
+        If skip_unchanged is True, the current reservation is read first and
+        the request is sent only if it differs. Return False if it was skipped.
+        """
+        episode = self._select_remote_episode(filter_text=filter_text, refresh=refresh)
+        return self._reserve_if_changed(episode.id, publish_at, skip_unchanged)
+
+    @require_login
+    def reserve_publishing_episodes(
+        self,
+        schedule: Mapping[EpisodeId, datetime.datetime | None],
+        max_workers: int = 4,
+        skip_unchanged: bool = False,
+    ) -> dict[EpisodeId, bool | Exception]:
+        """
+        Reserve publishing episodes concurrently in one session
+
+        The requests share the session's rate limiter for writes.
+        With skip_unchanged, the publish pages are read first and only the episodes
+        whose reservation differs in minutes are sent, so re-running the same schedule only reads.
+
+        Args:
+        ----
+            schedule: dict of episode id to publish datetime, None to cancel the reservation
+            max_workers: number of requests in flight at the same time
+            skip_unchanged: skip episodes already reserved at the same datetime
+
+        Returns:
+        -------
+            dict of episode id to True if reserved, False if skipped, or the raised exception
+
+        """
+
+        def reserve(episode_id: EpisodeId) -> bool:
+            return self._reserve_if_changed(episode_id, schedule[episode_id], skip_unchanged)
+
+        return run_bulk(reserve, list(schedule), max_workers=max_workers)
+
+    def _reserve_if_changed(
+        self, episode_id: EpisodeId, publish_at: datetime.datetime | None, skip_unchanged: bool
+    ) -> bool:
+        """Reserve or cancel (if publish_at is None), return False if skipped as unchanged"""
+        if skip_unchanged and self._get_publish_status(episode_id).is_scheduled_at(publish_at):
+            logger.info(f"skip unchanged reservation: {episode_id} {publish_at=}")
+            return False
+        if publish_at is None:
+            self._cancel_reservation(episode_id)
+        else:
+            self._reserve_publishing_episode(episode_id, publish_at)
+        return True
+
+    @require_login
+    def get_publish_schedule(
+        self, episode_ids: Sequence[EpisodeId] | None = None, max_workers: int = 4
+    ) -> dict[EpisodeId, PublishReservationStatus | Exception]:
+        """
+        Get publish reservations by loading the publish pages concurrently
+
+        Args:
+        ----
+            episode_ids: episodes to get, all remote episodes in toc order if None
+            max_workers: number of pages loaded at the same time
+
+        Returns:
+        -------
+            dict of episode id to the reservation, or the raised exception
+
+        """
+        if episode_ids is None:
+            episode_ids = [episode.id for episode in self._get_remote_episode_records()]
+        return run_bulk(self._get_publish_status, episode_ids, max_workers=max_workers)
+
+    def _get_publish_status(self, episode_id: EpisodeId) -> PublishReservationStatus:
+        """Get publish reservation of the episode"""
+        scraper = self.session.publish_page(self.work.id, episode_id)
+        return scraper.scrape_status(episode_id)
+
+    def cancel_reservation(self, filter_text: str, refresh: bool = False, skip_unchanged: bool = False) -> bool:
+        """Cancel reservation, return False if skipped as not reserved with skip_unchanged"""
+        episode = self._select_remote_episode(filter_text=filter_text, refresh=refresh)
+        return self._reserve_if_changed(episode.id, None, skip_unchanged)
 
     def _cancel_reservation(self, episode_id: EpisodeId) -> None:
         """Cancel reservation"""
@@ -419,3 +872,11 @@ class Client:
             publish_at=None,
         )
         self.session.publish_reserve(self.work.id, episode_id, request_body)
+
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def _safe_filename(title: str) -> str:
+    """Replace characters which cannot be used in file names"""
+    return _UNSAFE_FILENAME_CHARS.sub("_", title).strip(" .") or "episode"
@@ -1,19 +1,34 @@
 """Decorators for the client"""
 
 from functools import wraps
-from typing import Callable, Concatenate, Self
+from typing import Awaitable, Callable, Concatenate, Self
 
 from kakuyomu.types.errors import NotLoginError
 
 
 def require_login[**P, R](func: Callable[Concatenate[Self, P], R]) -> Callable[Concatenate[Self, P], R]:  # type: ignore[valid-type, name-defined]
-    """Require login"""
+    """Require login (checked against the client's cached login status)"""
 
     @wraps(func)
     def inner(self: Self, *args: P.args, **kwargs: P.kwargs) -> R:  # type: ignore
         """Return result wrapped function"""
-        if not self.status().is_login:
+        if not self.cached_status().is_login:
             raise NotLoginError("Not Login")
         return func(self, *args, **kwargs)
 
     return inner
+
+
+def require_login_async[**P, R](  # type: ignore[valid-type]
+    func: Callable[Concatenate[Self, P], Awaitable[R]],  # type: ignore[misc]
+) -> Callable[Concatenate[Self, P], Awaitable[R]]:  # type: ignore[misc]
+    """Require login for a coroutine method of AsyncClient"""
+
+    @wraps(func)
+    async def inner(self: Self, *args: P.args, **kwargs: P.kwargs) -> R:  # type: ignore
+        """Return result of the wrapped coroutine"""
+        if not (await self.cached_status()).is_login:
+            raise NotLoginError("Not Login")
+        return await func(self, *args, **kwargs)
+
+    return inner
@@ -0,0 +1,75 @@
+"""Streaming application/x-www-form-urlencoded body"""
+
+import os
+from collections.abc import Iterable, Iterator
+from typing import Final
+from urllib.parse import quote_plus
+
+from kakuyomu.types.errors import EpisodeBodyChangedError
+
+FORM_CONTENT_TYPE: Final[str] = "application/x-www-form-urlencoded"
+# ファイルを読み込む文字数
+CHUNK_SIZE: Final[int] = 16 * 1024
+
+type FormValue = str | int | os.PathLike[str]  # type: ignore[valid-type]
+
+
+class FormBody:
+    """
+    Form-encoded body produced chunk by chunk
+
+    Values which are paths are read from the file while the body is sent, so a long episode is never held in memory.
+    requests sends an iterable body with __len__ with Content-Length instead of chunked encoding;
+    the length is counted by encoding the body once without keeping it.
+    If a file changes after its length was counted, sending raises EpisodeBodyChangedError
+    instead of sending a body which does not match Content-Length.
+    The Content-Type header has to be set by the caller.
+    """
+
+    fields: list[tuple[str, FormValue]]
+    _length: int | None
+
+    def __init__(self, fields: Iterable[tuple[str, FormValue]]) -> None:
+        """Initialize form body"""
+        self.fields = list(fields)
+        self._length = None
+
+    def _chunks(self) -> Iterator[str]:
+        """Yield encoded chunks"""
+        for i, (name, value) in enumerate(self.fields):
+            yield ("&" if i else "") + quote_plus(name) + "="
+            if isinstance(value, os.PathLike):
+                # テキストモードで読むので改行はこれまで通り\nになる
+                with open(value, "r", encoding="utf-8") as f:
+                    while chunk := f.read(CHUNK_SIZE):
+                        yield quote_plus(chunk)
+            else:
+                yield quote_plus(str(value))
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Iterate encoded bytes, checking that they match the counted length"""
+        length = self._length
+        sent = 0
+        for chunk in self._chunks():
+            data = chunk.encode("ascii")
+            sent += len(data)
+            if length is not None and sent > length:
+                self._changed(length)
+            yield data
+        if length is not None and sent != length:
+            self._changed(length)
+
+    def _changed(self, length: int) -> None:
+        """Raise the error for a file changed after its length was counted"""
+        # 次の送信では長さを数え直す
+        self._length = None
+        paths = [str(value) for _, value in self.fields if isinstance(value, os.PathLike)]
+        raise EpisodeBodyChangedError(
+            f"送信中にファイルが変更されました: {', '.join(paths)} (Content-Length: {length})"
+        )
+
+    def __len__(self) -> int:
+        """Length of the encoded body in bytes"""
+        if self._length is None:
+            self._length = sum(len(chunk) for chunk in self._chunks())
+        return self._length
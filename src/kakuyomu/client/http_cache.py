@@ -0,0 +1,121 @@
+"""On-disk cache for conditional GET"""
+
+import dataclasses
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any
+
+from kakuyomu.logger import get_logger
+from kakuyomu.types.path import Path
+
+logger = get_logger()
+
+
+@dataclass
+class CacheEntry:
+    """Cached page with its validators and the memoized scrape results"""
+
+    url: str
+    etag: str | None
+    last_modified: str | None
+    html: str
+    results: dict[str, Any] = field(default_factory=dict)
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Headers to ask the server whether the page has changed"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Cache of pages keyed by url
+
+    Each page is pickled to its own file named by the sha256 of the url,
+    so pages fetched concurrently do not share a file.
+    The scrape results are kept in a small sidecar file next to it,
+    so memoizing a new result does not write the html again.
+    """
+
+    directory: Path
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize http cache"""
+        self.directory = directory
+
+    def _path(self, url: str) -> Path:
+        """File of the page"""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory.joinpath(f"{key}.pickle")
+
+    def _results_path(self, url: str) -> Path:
+        """File of the scrape results"""
+        return self._path(url).with_suffix(".results")
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Get entry, None if it is not cached or broken"""
+        entry = _load(self._path(url))
+        if not isinstance(entry, CacheEntry) or entry.url != url:
+            return None
+        # 結果は同じ版のページのものだけ使う
+        saved = _load(self._results_path(url))
+        if isinstance(saved, tuple) and len(saved) == 3 and saved[:2] == (entry.etag, entry.last_modified):
+            entry.results = saved[2]
+        return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        """Save page and its scrape results"""
+        if not self.directory.parent.exists():
+            # .kakuyomuが無い場所ではキャッシュしない
+            return
+        self.directory.mkdir(exist_ok=True)
+        _dump(self._path(entry.url), dataclasses.replace(entry, results={}))
+        self.put_results(entry)
+
+    def put_results(self, entry: CacheEntry) -> None:
+        """Save only the scrape results of the page"""
+        if not self.directory.exists():
+            return
+        _dump(self._results_path(entry.url), (entry.etag, entry.last_modified, entry.results))
+
+    def delete(self, url: str) -> None:
+        """Delete entry"""
+        self._path(url).unlink(missing_ok=True)
+        self._results_path(url).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Delete all entries"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _load(path: Path) -> Any:
+    """Load pickled file, None if it does not exist or is broken"""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        logger.info(f"broken http cache {path=} {e=}")
+        return None
+
+
+def _dump(path: Path, obj: Any) -> None:
+    """Pickle obj to path, replacing it at once"""
+    # 読み込み中のプロセスに書きかけのファイルを見せない
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,105 @@
+"""Rate limiter for requests to kakuyomu.jp"""
+
+import asyncio
+import enum
+import threading
+import time
+from typing import Final, Protocol
+
+
+class EndpointClass(enum.StrEnum):
+    """Kind of endpoint, each kind has its own rate limiter"""
+
+    READ = "read"
+    WRITE = "write"
+
+
+# (rate [requests/sec], burst)
+DEFAULT_LIMITS: Final[dict[EndpointClass, tuple[float, float]]] = {
+    EndpointClass.READ: (4.0, 4.0),
+    EndpointClass.WRITE: (1.0, 2.0),
+}
+
+
+class RateLimiter(Protocol):
+    """Rate limiter used by Session before each request"""
+
+    def reserve(self) -> float:
+        """Take a permit and return seconds to wait before it can be used"""
+        ...
+
+    def acquire(self) -> float:
+        """Wait until a permit is available and return the waited seconds"""
+        ...
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter
+
+    Tokens are refilled at `rate` per second up to `burst`.
+    A bucket can be shared between threads; each caller reserves one token.
+    Time spent between requests (parsing, reading files) refills the bucket,
+    so callers only wait when they are actually faster than `rate`.
+    """
+
+    rate: float
+    burst: float
+    _tokens: float
+    _updated_at: float
+
+    def __init__(self, rate: float, burst: float = 1) -> None:
+        """Initialize token bucket"""
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate=}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1: {burst=}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls, endpoint: EndpointClass) -> "TokenBucket":
+        """Create token bucket with the default limit of the endpoint class"""
+        rate, burst = DEFAULT_LIMITS[endpoint]
+        return cls(rate=rate, burst=burst)
+
+    def reserve(self) -> float:
+        """Take a token and return seconds to wait before it can be used"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Wait until a token is available and return the waited seconds"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class NoLimit:
+    """Rate limiter which never waits"""
+
+    def reserve(self) -> float:
+        """Return no wait"""
+        return 0.0
+
+    def acquire(self) -> float:
+        """Return no wait"""
+        return 0.0
+
+
+async def acquire_async(limiter: RateLimiter) -> float:
+    """Wait for the limiter without blocking the event loop and return the waited seconds"""
+    delay = limiter.reserve()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return delay
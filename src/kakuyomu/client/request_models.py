@@ -1,20 +1,33 @@
 """Request body models for POST or PUT"""
 
 import datetime
-from typing import Iterable
+import json
+from typing import Any, Iterable
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
+from kakuyomu.settings.const import JST
+from kakuyomu.types.path import Path
 from kakuyomu.types.work import EpisodeId, EpisodeStatus
 
+from .form_body import FormBody
 
-class NoCsrfToken(BaseModel):
+
+class FormRequest(BaseModel):
+    """Request model sent as a form"""
+
+    def form_body(self) -> FormBody:
+        """Streaming form body, Path values are read from the file"""
+        return FormBody(self.model_dump().items())
+
+
+class NoCsrfToken(FormRequest):
     """Request model without CSRF token"""
 
     pass
 
 
-class WithCsrfToken(BaseModel):
+class WithCsrfToken(FormRequest):
     """Request model with CSRF token"""
 
     csrf_token: str
@@ -46,20 +59,24 @@ class DeleteEpisodesRequest(WithCsrfToken):
 
 
 class CreateEpisodeRequest(NoCsrfToken):
-    """Request model to create episode"""
+    """Request model to create episode, body is the text or the file to read it from"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     title: str
     status: str = "draft"
     edit_reservation: int = 0
     keep_editing: int = 0
-    body: str
+    body: str | Path
 
 
 class UpdateEpisodeRequest(WithCsrfToken, EpisodeStatus):  # type: ignore[misc]
-    """Request model to update episode"""
+    """Request model to update episode, body is the text or the file to read it from"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     title: str
-    body: str
+    body: str | Path
 
     @classmethod
     def create_from_status(
@@ -67,7 +84,7 @@ class UpdateEpisodeRequest(WithCsrfToken, EpisodeStatus):  # type: ignore[misc]
         status: EpisodeStatus,
         csrf_token: str,
         title: str,
-        body: str,
+        body: str | Path,
     ) -> "UpdateEpisodeRequest":
         """Create from status"""
         return cls(
@@ -124,10 +141,24 @@ class PublishRequest(BaseModel):
         episode_id: EpisodeId,
         publish_at: datetime.datetime | None,
     ) -> "PublishRequest":
-        """Create from episode id and publish at"""
+        """Create from episode id and publish at (naive datetime is in JST)"""
+        if publish_at and publish_at.tzinfo is not None:
+            publish_at = publish_at.astimezone(JST)
         reserveDatetime = publish_at.strftime("%Y-%m-%dT%H:%M:00.000+09:00") if publish_at else None
         return cls(
             variables=_Variables(
                 input=_Input(episodeId=episode_id, reserveDatetime=reserveDatetime),
             ),
         )
+
+    @staticmethod
+    def response_errors(content: bytes) -> list[Any]:
+        """Errors in the GraphQL response, which is returned with status 200"""
+        try:
+            response = json.loads(content)
+        except ValueError:
+            return []
+        if not isinstance(response, dict):
+            return []
+        errors: list[Any] = response.get("errors") or []
+        return errors
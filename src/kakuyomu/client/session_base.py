@@ -0,0 +1,125 @@
+"""Parts shared by Session and AsyncSession"""
+
+import http
+import pickle
+import time
+
+from requests.cookies import RequestsCookieJar
+
+from kakuyomu.logger import get_logger
+from kakuyomu.settings import URL
+from kakuyomu.types.path import Path
+
+from .rate_limit import EndpointClass, NoLimit, RateLimiter, TokenBucket
+from .trace import RequestEvent, RequestHook
+
+logger = get_logger()
+
+
+def load_cookie(filepath: Path) -> RequestsCookieJar | None:
+    """Load the cookie saved by `kakuyomu login`, None if it is missing or broken"""
+    cookie: RequestsCookieJar | None
+    try:
+        with open(filepath, "rb") as f:
+            cookie = pickle.load(f)
+            return cookie
+    except FileNotFoundError:
+        return None
+    except pickle.UnpicklingError:
+        return None
+
+
+class SessionBase:
+    """
+    Rate limiters, request hooks, login expiry and root_url of a session
+
+    Mixed into the sync Session on requests and the AsyncSession on httpx,
+    so both behave the same except for how the request is sent.
+    """
+
+    rate_limiters: dict[EndpointClass, RateLimiter]
+    login_expired: bool
+    request_hooks: list[RequestHook]
+    # URL.ROOTの代わりに使うURL. ローカルのモックサーバーなどに向けるときに変更する
+    root_url: str
+
+    def _init_base(self, read_limiter: RateLimiter | None, write_limiter: RateLimiter | None, root_url: str) -> None:
+        """Initialize the shared state"""
+        self.root_url = root_url
+        self.rate_limiters = {
+            EndpointClass.READ: read_limiter or TokenBucket.default(EndpointClass.READ),
+            EndpointClass.WRITE: write_limiter or TokenBucket.default(EndpointClass.WRITE),
+        }
+        self.login_expired = False
+        self.request_hooks = []
+
+    def url(self, url: str) -> str:
+        """Replace URL.ROOT with root_url"""
+        if self.root_url != URL.ROOT and url.startswith(URL.ROOT):
+            return self.root_url + url[len(URL.ROOT) :]
+        return url
+
+    def _check_login_expired(self, status_code: int, url: str, redirect_to: str) -> None:
+        """Mark login as expired on 401 or redirect to the login page"""
+        if status_code == http.HTTPStatus.UNAUTHORIZED or redirect_to.startswith(self.url(URL.LOGIN)):
+            logger.info(f"login expired: {status_code=} {url=}")
+            self.login_expired = True
+
+    def set_rate_limiter(self, limiter: RateLimiter, endpoint: EndpointClass | None = None) -> None:
+        """Set rate limiter for the endpoint class, or for all of them if endpoint is None"""
+        endpoints = [endpoint] if endpoint is not None else list(EndpointClass)
+        for _endpoint in endpoints:
+            self.rate_limiters[_endpoint] = limiter
+
+    def set_wait_time(self, wait_time: float) -> None:
+        """Limit all requests to one per wait_time seconds"""
+        limiter: RateLimiter = TokenBucket(rate=1 / wait_time) if wait_time > 0 else NoLimit()
+        self.set_rate_limiter(limiter)
+
+    def add_request_hook(self, hook: RequestHook) -> None:
+        """Call hook with a RequestEvent after each request"""
+        self.request_hooks.append(hook)
+
+    def remove_request_hook(self, hook: RequestHook) -> None:
+        """Stop calling hook"""
+        self.request_hooks.remove(hook)
+
+    def _emit(self, event: RequestEvent | None) -> None:
+        """Call request hooks"""
+        if event is None:
+            return
+        for hook in list(self.request_hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                # 計測のためのフックでリクエストを失敗させない
+                logger.warning(f"request hook failed: {hook=} {e=}")
+
+    def _emit_error(
+        self,
+        endpoint: str,
+        endpoint_class: EndpointClass,
+        method: str,
+        url: str,
+        started_at: float,
+        wait: float,
+        start: float,
+        error: Exception,
+    ) -> None:
+        """Emit the event of a request which raised error before a response"""
+        if not self.request_hooks:
+            return
+        self._emit(
+            RequestEvent(
+                endpoint=endpoint,
+                endpoint_class=endpoint_class,
+                method=method,
+                url=self.url(url),
+                status=None,
+                bytes=0,
+                started_at=started_at,
+                wait=wait,
+                network=time.perf_counter() - start,
+                error=repr(error),
+            )
+        )
@@ -0,0 +1,68 @@
+"""Snapshot of the remote toc"""
+
+import json
+import time
+from collections.abc import Sequence
+
+from pydantic import BaseModel, ValidationError
+
+from kakuyomu.logger import get_logger
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import Episode, EpisodeRecord, RemoteEpisode, WorkId
+
+logger = get_logger()
+
+
+class TocSnapshot(BaseModel):
+    """Remote episodes scraped from the work page"""
+
+    work_id: WorkId
+    fetched_at: float
+    episodes: list[RemoteEpisode]
+
+
+class TocStore:
+    """
+    Keep the last scraped toc in a file
+
+    The snapshot is used for interactive selection until it is older than ttl seconds,
+    so choosing an episode does not have to fetch the work page.
+    """
+
+    path: Path
+    ttl: float
+
+    def __init__(self, path: Path, ttl: float) -> None:
+        """Initialize toc store"""
+        self.path = path
+        self.ttl = ttl
+
+    def load(self, work_id: WorkId) -> list[RemoteEpisode] | None:
+        """Load episodes, None if the snapshot is missing, expired or of another work"""
+        try:
+            snapshot = TocSnapshot.model_validate_json(self.path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValidationError as e:
+            logger.info(f"broken toc snapshot {self.path=} {e=}")
+            return None
+        age = time.time() - snapshot.fetched_at
+        if snapshot.work_id != work_id or not 0 <= age < self.ttl:
+            return None
+        return snapshot.episodes
+
+    def dump(self, work_id: WorkId, episodes: Sequence[Episode | EpisodeRecord]) -> None:
+        """Save episodes as the latest snapshot"""
+        if not self.path.parent.exists():
+            return
+        # 大きな目次でもモデルを作らずに, TocSnapshotと同じ形のJSONを書く
+        snapshot = {
+            "work_id": work_id,
+            "fetched_at": time.time(),
+            "episodes": [{"id": episode.id, "title": episode.title} for episode in episodes],
+        }
+        self.path.write_text(json.dumps(snapshot))
+
+    def clear(self) -> None:
+        """Delete the snapshot"""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,65 @@
+"""Per-request events emitted by Session"""
+
+import threading
+from collections.abc import Callable
+from typing import IO
+
+from pydantic import BaseModel
+
+from kakuyomu.types.path import Path
+
+from .rate_limit import EndpointClass
+
+
+class RequestEvent(BaseModel):
+    """
+    One request made by Session
+
+    wait: seconds spent waiting for the rate limiter
+    network: seconds from sending the request to receiving the whole response
+    parse: seconds spent parsing the html, None for requests without a page to parse
+    cache_hit: True if the server answered 304 and the cached page was used
+    """
+
+    endpoint: str
+    endpoint_class: EndpointClass
+    method: str
+    url: str
+    status: int | None
+    bytes: int
+    started_at: float
+    wait: float
+    network: float
+    parse: float | None = None
+    cache_hit: bool = False
+    error: str | None = None
+
+
+type RequestHook = Callable[[RequestEvent], None]  # type: ignore[valid-type]
+
+
+class JsonlTraceWriter:
+    """Request hook which appends events to a JSON Lines file"""
+
+    path: Path
+    _file: IO[str]
+    _lock: threading.Lock
+
+    def __init__(self, path: Path) -> None:
+        """Open the trace file to append"""
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        """Write the event as one line"""
+        line = event.model_dump_json() + "\n"
+        # 一括更新ではスレッドから呼ばれる
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the trace file"""
+        with self._lock:
+            self._file.close()
@@ -5,12 +5,15 @@ This module is a web client for kakuyomu.jp.
 """
 
 import http
+import re
 import time
-from typing import override
+from typing import Any, override
+from urllib.parse import urljoin
 
 import requests
 
 from kakuyomu.logger import get_logger
+from kakuyomu.scrapers.base import ScraperBase
 from kakuyomu.scrapers.episode_page import EpisodePageScraper
 from kakuyomu.scrapers.my_page import MyPageScraper
 from kakuyomu.scrapers.private_page import PrivatePageScraper
@@ -22,18 +25,58 @@ from kakuyomu.types.errors import (
     EpisodeDeleteFailedError,
     EpisodeReservePublishError,
     EpisodeUpdateFailedError,
+    NotLoginError,
 )
 from kakuyomu.types.work import EpisodeId, WorkId
 
+from .form_body import FORM_CONTENT_TYPE
+from .http_cache import CacheEntry, HttpCache
+from .rate_limit import EndpointClass, RateLimiter
 from .request_models import CreateEpisodeRequest, DeleteEpisodesRequest, PublishRequest, UpdateEpisodeRequest
+from .session_base import SessionBase
+from .trace import RequestEvent
 
 logger = get_logger()
 
 
-class Session(requests.Session):
+class Session(SessionBase, requests.Session):
     """Session for kakuyomu"""
 
-    wait_time: float = 0.1
+    # work_pageとepisode_pageの条件付きGETに使う. Noneならキャッシュしない
+    http_cache: HttpCache | None
+    episode_location_regex = re.compile(r"/episodes/(?P<episode_id>\d+)")
+
+    def __init__(
+        self,
+        read_limiter: RateLimiter | None = None,
+        write_limiter: RateLimiter | None = None,
+        root_url: str = URL.ROOT,
+        http_cache: HttpCache | None = None,
+    ) -> None:
+        """
+        Initialize session
+
+        Args:
+        ----
+            read_limiter: rate limiter for page loads. default: TokenBucket.default(EndpointClass.READ)
+            write_limiter: rate limiter for POST requests. default: TokenBucket.default(EndpointClass.WRITE)
+            root_url: URL used in place of https://kakuyomu.jp
+            http_cache: cache for conditional GET of work and episode pages
+
+        """
+        super().__init__()
+        self._init_base(read_limiter, write_limiter, root_url)
+        self.hooks["response"].append(self._detect_login_expired)
+        self.http_cache = http_cache
+
+    def _detect_login_expired(self, res: requests.Response, *args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        """Mark login as expired on 401 or redirect to the login page"""
+        redirect_to = urljoin(res.url, res.headers.get("location", "")) if res.is_redirect else ""
+        self._check_login_expired(res.status_code, res.url, redirect_to)
+
+    @override
+    def request(self, method, url, *args, **kwargs) -> requests.Response:  # type: ignore[no-untyped-def]
+        return super().request(method, self.url(url), *args, **kwargs)
 
     @override
     def post(self, url, data=None, json=None, **kwargs) -> requests.Response:  # type: ignore[no-untyped-def]
@@ -44,21 +87,115 @@ class Session(requests.Session):
 
         return super().post(url, data=data, json=json, **kwargs)
 
-    def set_wait_time(self, wait_time: float) -> None:
-        """Set wait time"""
-        self.wait_time = wait_time
+    def _wait(self, endpoint: EndpointClass) -> float:
+        """Wait for the rate limiter of the endpoint class and return the waited seconds"""
+        return self.rate_limiters[endpoint].acquire()
+
+    def _send(
+        self,
+        endpoint: str,
+        endpoint_class: EndpointClass,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> tuple[requests.Response, RequestEvent | None]:
+        """
+        Wait for the rate limiter and send a request
+
+        Args:
+        ----
+            endpoint: name of the endpoint for RequestEvent
+            endpoint_class: rate limiter to wait for
+            method: GET or POST
+            url: url to request
+            kwargs: passed to get or post
+
+        Returns:
+        -------
+            response and the event to emit, the event is None when no hook is registered
+
+        """
+        wait = self._wait(endpoint_class)
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            res = self.post(url, **kwargs) if method == "POST" else self.get(url, **kwargs)
+        except requests.RequestException as e:
+            self._emit_error(endpoint, endpoint_class, method, url, started_at, wait, start, e)
+            raise
+        network = time.perf_counter() - start
+        if not self.request_hooks:
+            return res, None
+        event = RequestEvent(
+            endpoint=endpoint,
+            endpoint_class=endpoint_class,
+            method=method,
+            url=res.url,
+            status=res.status_code,
+            bytes=len(res.content),
+            started_at=started_at,
+            wait=wait,
+            network=network,
+        )
+        return res, event
+
+    def _get_page[S: ScraperBase](
+        self, endpoint: str, url: str, scraper_class: type[S], cache: bool = False, login: bool = True
+    ) -> S:
+        """
+        Get a page and create its scraper
+
+        If cache is True and http_cache is set, send a conditional request.
+        On 304 the scraper is created from the cached html with the cached scrape results, so it is not parsed again.
+        If login is True, raise NotLoginError instead of scraping the login page when the login has expired.
+        """
+        http_cache = self.http_cache if cache else None
+        entry = http_cache.get(self.url(url)) if http_cache else None
+        headers = entry.conditional_headers() if entry else {}
+        res, event = self._send(endpoint, EndpointClass.READ, "GET", url, headers=headers)
+        if login and self.login_expired:
+            self._emit(event)
+            raise NotLoginError(f"Not Login: {url}")
+        if entry is not None and http_cache is not None and res.status_code == http.HTTPStatus.NOT_MODIFIED:
+            logger.debug(f"not modified: {url}")
+            scraper = scraper_class(entry.html, results=entry.results)
+            self._save_results(http_cache, entry, scraper)
+            if event is not None:
+                event.cache_hit = True
+            self._emit(event)
+            return scraper
+
+        scraper = scraper_class(res.text)
+        if http_cache is not None:
+            etag, last_modified = res.headers.get("ETag"), res.headers.get("Last-Modified")
+            # リダイレクトされた応答は要求したURLのページではないので保存しない
+            if res.status_code == http.HTTPStatus.OK and not res.history and (etag or last_modified):
+                entry = CacheEntry(
+                    url=self.url(url), etag=etag, last_modified=last_modified, html=res.text, results=scraper.results
+                )
+                http_cache.put(entry)
+                self._save_results(http_cache, entry, scraper)
+            elif entry is not None:
+                http_cache.delete(entry.url)
+        if event is not None:
+            # HTMLの解析は遅延されるので, 計測するときだけここで解析しておく
+            start = time.perf_counter()
+            scraper.soup
+            event.parse = time.perf_counter() - start
+        self._emit(event)
+        return scraper
+
+    def _save_results(self, http_cache: HttpCache, entry: CacheEntry, scraper: ScraperBase) -> None:
+        """Save the results of the entry when the scraper memoizes a new result"""
+        scraper.on_result = lambda: http_cache.put_results(entry)
 
     def my_page(self) -> MyPageScraper:
         """Get my page"""
-        time.sleep(self.wait_time)
-        res = self.get(URL.MY)
-        return MyPageScraper(res.text)
+        return self._get_page("my_page", URL.MY, MyPageScraper, login=False)
 
     def private_page(self) -> PrivatePageScraper:
         """Get private page"""
-        time.sleep(self.wait_time)
-        res = self.get(URL.PRIVATE)
-        return PrivatePageScraper(res.text)
+        return self._get_page("private_page", URL.PRIVATE, PrivatePageScraper, login=False)
 
     def get_work_url(self, work_id: WorkId) -> str:
         """Get work url"""
@@ -77,75 +214,95 @@ class Session(requests.Session):
 
     def work_page(self, work_id: WorkId) -> WorkPageScraper:
         """Get work page"""
-        time.sleep(self.wait_time)
-        url = self.get_work_url(work_id)
-        res = self.get(url)
-        return WorkPageScraper(res.text)
+        return self._get_page("work_page", self.get_work_url(work_id), WorkPageScraper, cache=True)
 
     def episode_page(self, work_id: WorkId, episode_id: EpisodeId) -> EpisodePageScraper:
         """Get episode page"""
-        time.sleep(self.wait_time)
-        url = self.episode_url(work_id, episode_id)
-        res = self.get(url)
-        return EpisodePageScraper(res.text)
+        return self._get_page("episode_page", self.episode_url(work_id, episode_id), EpisodePageScraper, cache=True)
 
     def publish_page(self, work_id: WorkId, episode_id: EpisodeId) -> PublishPageScraper:
         """Get publish page"""
-        time.sleep(self.wait_time)
-        url = self.publish_url(work_id, episode_id)
-        res = self.get(url)
-        return PublishPageScraper(res.text)
-
-    def create_episode(self, work_id: WorkId, request: CreateEpisodeRequest) -> None:
-        """Create Episode"""
-        time.sleep(self.wait_time)
+        return self._get_page("publish_page", self.publish_url(work_id, episode_id), PublishPageScraper)
+
+    def create_episode(self, work_id: WorkId, request: CreateEpisodeRequest) -> EpisodeId | None:
+        """
+        Create Episode
+
+        Return the new episode id if the response tells it, otherwise None
+        """
         url = URL.NEW_EPISODE.format(work_id=work_id)
-        res = self.post(url, data=request.model_dump())
+        res, event = self._send(
+            "create_episode",
+            EndpointClass.WRITE,
+            "POST",
+            url,
+            data=request.form_body(),
+            headers={"Content-Type": FORM_CONTENT_TYPE},
+        )
+        self._emit(event)
         if res.status_code != http.HTTPStatus.OK:
-            # result = res.json()  # {"location":"/my/works/99999999999"} episode id返してくれない
             logger.error(f"{res.status_code=} {res.text=}")
             raise EpisodeCreateFailedError(f"create failed: {res}")
-        logger.info(f"CREATE: {res.status_code=} {res.text=}")
+        logger.info(f"CREATE: {res.status_code=} bytes={len(res.content)}")
+        # 通常は {"location":"/my/works/99999999999"} でepisode idは返ってこない
+        try:
+            location = res.json().get("location", "")
+        except (ValueError, AttributeError):
+            location = res.headers.get("location", "")
+        matcher = self.episode_location_regex.search(location or "")
+        return matcher.group("episode_id") if matcher else None
 
     def update_episode(self, work_id: WorkId, episode_id: EpisodeId, request: UpdateEpisodeRequest) -> None:
         """Update Episode"""
-        time.sleep(self.wait_time)
         url = self.episode_url(work_id, episode_id)
-        res = self.post(url, data=request.model_dump())
+        res, event = self._send(
+            "update_episode",
+            EndpointClass.WRITE,
+            "POST",
+            url,
+            data=request.form_body(),
+            headers={"Content-Type": FORM_CONTENT_TYPE},
+        )
+        self._emit(event)
         if res.status_code != http.HTTPStatus.OK:
             logger.error(f"{res.status_code=} {res.text=}")
             raise EpisodeUpdateFailedError(f"update failed: {res}")
-        logger.info(f"UPDATE {episode_id}: {res.status_code=} {res.text=}")
+        logger.info(f"UPDATE {episode_id}: {res.status_code=} bytes={len(res.content)}")
 
     def delete_episodes(self, work_id: WorkId, request: DeleteEpisodesRequest) -> None:
         """Delete episodes"""
-        time.sleep(self.wait_time)
         url = URL.EDIT_TOC.format(work_id=work_id)
-        res = self.post(url, data=request.model_dump())
+        res, event = self._send("delete_episodes", EndpointClass.WRITE, "POST", url, data=request.model_dump())
+        self._emit(event)
         if res.status_code != http.HTTPStatus.OK:
             logger.error(f"{res.status_code=} {res.text=}")
             raise EpisodeDeleteFailedError(f"delete failed: {res}")
-        logger.info(f"DELETE {request.target_toc_item_id}: {res.status_code=} {res.text=}")
+        logger.info(f"DELETE {request.target_toc_item_id}: {res.status_code=} bytes={len(res.content)}")
 
     def publish_reserve(self, work_id: WorkId, episode_id: EpisodeId, request: PublishRequest) -> None:
         """Reserve publish"""
-        time.sleep(self.wait_time)
         _ = work_id
         url = URL.OPERATION.format(opname=request.operationName)
         headers = dict(
-            Referer=f"https://kakuyomu.jp/my/works/{work_id}/episodes/{episode_id}/publish",
+            Referer=self.url(self.publish_url(work_id, episode_id)),
+        )
+        res, event = self._send(
+            "publish_reserve", EndpointClass.WRITE, "POST", url, headers=headers, json=request.model_dump()
         )
-        res = self.post(url, headers=headers, json=request.model_dump())
+        self._emit(event)
         if res.status_code != http.HTTPStatus.OK:
             logger.error(f"{res.status_code=} {res.text=}")
-            raise EpisodeReservePublishError(f"delete failed: {res}")
-        logger.info(f"PUBLISH {episode_id}: {res.status_code=} {res.text=}")
+            raise EpisodeReservePublishError(f"publish failed: {res}")
+        if errors := request.response_errors(res.content):
+            logger.error(f"{errors=}")
+            raise EpisodeReservePublishError(f"publish failed: {errors}")
+        logger.info(f"PUBLISH {episode_id}: {res.status_code=} bytes={len(res.content)}")
 
     def login(self, email: str, password: str) -> requests.Response:
         """Login"""
-        time.sleep(self.wait_time)
         data = {"email_address": email, "password": password}
-        res = self.post(URL.LOGIN, data=data)
+        res, event = self._send("login", EndpointClass.WRITE, "POST", URL.LOGIN, data=data)
+        self._emit(event)
         if res.status_code != http.HTTPStatus.OK:
             raise Exception(f"login failed: {res}")
         return res
@@ -0,0 +1,213 @@
+"""Cached access to work.toml"""
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from kakuyomu.logger import get_logger
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import Work
+from kakuyomu.types.work.toml_writer import dumps
+
+logger = get_logger()
+
+type FileStamp = tuple[int, int]  # type: ignore[valid-type]
+
+# キャッシュの形式が変わったら上げて, 古いキャッシュを使わないようにする
+CACHE_VERSION = 2
+
+
+@functools.cache
+def _schema_hash() -> str:
+    """Hash of the Work model fields, which changes when the definition of Work or its episodes changes"""
+    schema = json.dumps(Work.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+
+class WorkStore:
+    """
+    Keep the parsed work.toml in memory
+
+    The file is parsed again only when its mtime or size has changed since the last load or dump.
+    The returned Work is shared, so changes made to it must be written back with dump().
+    The file is replaced at once, so it is never left half written.
+    In a transaction, dump() only keeps the work in memory and the file is written once at the end.
+    If cache_path is given, the parsed work is also pickled there with the stamp of work.toml,
+    so a new process can load a large work without parsing the TOML.
+    The sidecar starts with a small header (version, stamp, hash of the model fields)
+    and the work is unpickled only when the header matches.
+    """
+
+    path: Path
+    cache_path: Path | None
+    _work: Work | None
+    _stamp: FileStamp | None
+    _depth: int
+    _dirty: bool
+
+    def __init__(self, path: Path, cache_path: Path | None = None) -> None:
+        """
+        Initialize work store
+
+        Args:
+        ----
+            path: work.toml
+            cache_path: pickle sidecar of the parsed work, not used if None
+
+        """
+        self.path = path
+        self.cache_path = cache_path
+        self._work = None
+        self._stamp = None
+        self._depth = 0
+        self._dirty = False
+
+    def _file_stamp(self) -> FileStamp | None:
+        """Return (mtime_ns, size) of the file, None if it does not exist"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self) -> Work:
+        """Load work, reusing the cached model while the file is unchanged"""
+        if self._dirty and self._work is not None:
+            # トランザクション中はまだ書き込んでいない変更を返す
+            return self._work
+        stamp = self._file_stamp()
+        if self._work is not None and stamp is not None and stamp == self._stamp:
+            return self._work
+        work = self._load_cache(stamp)
+        if work is None:
+            work = Work.load(self.path)
+            logger.debug(f"load work toml: {self.path} {stamp=}")
+            self._dump_cache(work, stamp)
+        self._work = work
+        self._stamp = stamp
+        return work
+
+    def _load_cache(self, stamp: FileStamp | None) -> Work | None:
+        """Load work from the sidecar if it was made from the current file"""
+        if self.cache_path is None or stamp is None:
+            return None
+        try:
+            with open(self.cache_path, "rb") as f:
+                # 古いキャッシュのWorkを読まないように, ヘッダーが一致してから本体を読む
+                if pickle.load(f) != (CACHE_VERSION, stamp, _schema_hash()):
+                    return None
+                work = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"ignore broken work cache: {self.cache_path} {e=}")
+            return None
+        if not isinstance(work, Work):
+            return None
+        logger.debug(f"load work cache: {self.cache_path} {stamp=}")
+        return work
+
+    def _dump_cache(self, work: Work, stamp: FileStamp | None) -> None:
+        """Save work to the sidecar, ignoring errors as it is only a cache"""
+        if self.cache_path is None or stamp is None:
+            return
+        try:
+            header = pickle.dumps((CACHE_VERSION, stamp, _schema_hash()), pickle.HIGHEST_PROTOCOL)
+            _replace(self.cache_path, header + pickle.dumps(work, pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            logger.warning(f"failed to write work cache: {self.cache_path} {e=}")
+
+    def dump(self, work: Work) -> None:
+        """Write work to the file and keep it as the cached model, or only keep it in a transaction"""
+        # 呼び出し側が持っている別のWorkをキャッシュと共有しないようにコピーしておく
+        work = work if work is self._work else work.model_copy(deep=True)
+        if self._depth:
+            self._work = work
+            self._dirty = True
+            return
+        self._write(work)
+        self._work = work
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Write the file once at the end instead of on each dump()
+
+        Transactions can be nested and the file is written when the outermost one ends.
+        Works dumped before an error are still written, like the steps already done.
+        """
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth and self._dirty:
+                self._dirty = False
+                assert self._work is not None
+                self._write(self._work)
+
+    def _write(self, work: Work) -> None:
+        """Write work to a temporary file, then replace the file with it"""
+        # 書き込みに失敗したら, 手元のWorkがファイルと一致しているとみなさず次のloadで読み直す
+        self._stamp = None
+        _replace(self.path, dumps(work.model_dump()).encode("utf-8"), fsync=True)
+        self._stamp = self._file_stamp()
+        logger.debug(f"write work toml: {self.path} {self._stamp=}")
+        self._dump_cache(work, self._stamp)
+
+
+def _replace(path: Path, data: bytes, fsync: bool = False) -> None:
+    """Write data to a temporary file in the same directory, then rename it to path"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstempは0600で作るので既存のファイルの権限を引き継ぐ
+        os.chmod(tmp, _file_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+def _read_umask() -> int:
+    """Read the umask of the process, which can only be read by setting it"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# umaskを一時的に変えると並行して作られるファイルの権限が変わるので, importのときに一度だけ読む
+_UMASK = _read_umask()
+
+
+def _file_mode(path: Path) -> int:
+    """Permission of the current file, or the default one for a new file"""
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Make the rename durable (not supported on some platforms)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
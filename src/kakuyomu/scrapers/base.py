@@ -1,14 +1,66 @@
 """Base class for scraper"""
 
+import functools
+import importlib.util
+from collections.abc import Callable
+from functools import cached_property
+from typing import Any, ClassVar, Final, cast
+
 import bs4
 
 
+def default_parser() -> str:
+    """Return lxml if it is installed, otherwise the builtin html.parser"""
+    if importlib.util.find_spec("lxml") is not None:
+        return "lxml"
+    return "html.parser"
+
+
+PARSER: Final[str] = default_parser()
+
+
 class ScraperBase:
-    """BaseClass for scrape"""
+    """
+    BaseClass for scrape
+
+    The html is parsed on the first access to soup, not in __init__.
+    Subclasses can set parse_only to build the tree only from the tags they scrape.
+    Results of methods decorated with memoize are kept in results,
+    so a scraper created with the results of an unchanged page does not parse it.
+    """
 
     html: str
+    parser: str
+    parse_only: ClassVar[bs4.SoupStrainer | None] = None
+    results: dict[str, Any]
+    # memoizeした結果が増えたときに呼ばれる. HTTPキャッシュの保存に使う
+    on_result: Callable[[], None] | None
 
-    def __init__(self, html: str):
+    def __init__(self, html: str, parser: str | None = None, results: dict[str, Any] | None = None):
         """Initialize"""
         self.html = html
-        self.soup = bs4.BeautifulSoup(self.html, "html.parser")
+        self.parser = parser or PARSER
+        self.results = results if results is not None else {}
+        self.on_result = None
+
+    @cached_property
+    def soup(self) -> bs4.BeautifulSoup:
+        """Parsed html"""
+        return bs4.BeautifulSoup(self.html, self.parser, parse_only=self.parse_only)
+
+
+def memoize[S: ScraperBase, R](method: Callable[[S], R]) -> Callable[[S], R]:
+    """Keep the result of a scrape method in scraper.results"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: S) -> R:
+        if name in self.results:
+            return cast(R, self.results[name])
+        result = method(self)
+        self.results[name] = result
+        if self.on_result is not None:
+            self.on_result()
+        return result
+
+    return wrapper
@@ -7,12 +7,16 @@ import bs4
 from kakuyomu.types.errors import EpisodeBodyNotFoundError
 from kakuyomu.types.work import EpisodeStatus
 
-from .base import ScraperBase
+from .base import ScraperBase, memoize
 
 
 class EpisodePageScraper(ScraperBase):
     """Class for scrape my page."""
 
+    # title, csrf_token, statusはinput, bodyはtextarea
+    parse_only = bs4.SoupStrainer(["input", "textarea"])
+
+    @memoize
     def scrape_title(self) -> str:
         """Scrape title from episode page"""
         tag = self.soup.select_one("input[name='title']")
@@ -23,6 +27,7 @@ class EpisodePageScraper(ScraperBase):
             raise ValueError("title is not str")
         return title
 
+    @memoize
     def scrape_body(self) -> str:
         """Scrape body text from episode page"""
         textarea = self.soup.select_one("textarea[name='body']")
@@ -33,6 +38,7 @@ class EpisodePageScraper(ScraperBase):
         body = textarea.text
         return body
 
+    @memoize
     def scrape_csrf_token(self) -> str:
         """Scrape csrf_token"""
         tag = self.soup.select_one("input[name='csrf_token']")
@@ -43,6 +49,7 @@ class EpisodePageScraper(ScraperBase):
             raise ValueError("csrf_token is not str")
         return csrf_token
 
+    @memoize
     def scrape_status(self) -> EpisodeStatus:
         """Scrape status"""
         episode_status: dict[str, Any] = {}
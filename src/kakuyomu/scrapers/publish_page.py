@@ -1,53 +1,80 @@
 """Module for scraping episode page."""
 
-import re
+import json
+from collections.abc import Iterator
+from typing import Any
 
-from kakuyomu.types.work.episode import PublishReservationStatus
+import bs4
 
-from .base import ScraperBase
+from kakuyomu.types.work.episode import EpisodeId, PublishReservationStatus
+
+from .base import ScraperBase, memoize
 
 
 class PublishPageScraper(ScraperBase):
     """Class for scrape my page."""
 
     script_id = "__NEXT_DATA__"
-    regex = re.compile(r""".*toBePublishedAt.*""")
-    reserved_regex = re.compile(r""".*"toBePublishedAt"\s*:\s*"(?P<to_be_published_at>[^"]+)".*""")
-    draft_regex = re.compile(r""".*"toBePublishedAt"\s*:\s*(null).*""")
+    parse_only = bs4.SoupStrainer("script", id=script_id)
 
-    def scrape_status(self) -> PublishReservationStatus:
+    @memoize
+    def scrape_next_data(self) -> dict[str, Any]:
         """
-        Scrape status
+        Scrape the page data
 
-        <script id="__NEXT_DATA__" type="application/json">
-            ...
-                                "toBePublishedAt": "2024-07-04T09:00:37Z"
-            ...
+        <script id="__NEXT_DATA__" type="application/json">{"props": ...}</script>
         """
         tag = self.soup.select_one(f"script#{self.script_id}")
         if not tag:
             raise ValueError(f"{self.script_id} not found")
-        contents = tag.text
-        matcher = self.regex.match(contents)
-        if not matcher:
-            raise ValueError(f"toBePublishedAt not found: {contents=}")
+        next_data = json.loads(tag.text)
+        if not isinstance(next_data, dict):
+            raise ValueError(f"unexpected {self.script_id}: {type(next_data)=}")
+        return next_data
 
-        line = matcher.group(0)
+    @memoize
+    def scrape_reservations(self) -> dict[EpisodeId, PublishReservationStatus]:
+        """
+        Scrape reservations of the episodes in the page data
 
-        draft_matcher = self.draft_regex.match(line)
-        if draft_matcher:
-            return PublishReservationStatus.from_str(None)
+        Episodes are the objects with "id" and "toBePublishedAt" anywhere in the page data
 
-        reserved_matcher = self.reserved_regex.match(line)
-        if not reserved_matcher:
-            raise ValueError(f"unexpected format 'toBePublishedAt': {line}")
+            "Episode:16816927859880026113": {
+                "__typename": "Episode",
+                "id": "16816927859880026113",
+                "toBePublishedAt": "2024-07-04T09:00:37Z"
+            }
+        """
+        reservations: dict[EpisodeId, PublishReservationStatus] = {}
+        for obj in _objects(self.scrape_next_data()):
+            episode_id = obj.get("id")
+            to_be_published_at = obj["toBePublishedAt"]
+            if not isinstance(episode_id, str) or not isinstance(to_be_published_at, str | None):
+                continue
+            reservations.setdefault(episode_id, PublishReservationStatus.from_str(to_be_published_at))
+        return reservations
 
-        to_be_published_at = reserved_matcher.group("to_be_published_at")
-        if not isinstance(to_be_published_at, str):
-            raise ValueError(f"toBePublishedAt is not str: {to_be_published_at=}")
+    def scrape_status(self, episode_id: EpisodeId | None = None) -> PublishReservationStatus:
+        """Scrape status of the episode, or of the only episode in the page if episode_id is None"""
+        reservations = self.scrape_reservations()
+        if episode_id is not None:
+            if episode_id not in reservations:
+                raise ValueError(f"toBePublishedAt not found: {episode_id=}")
+            return reservations[episode_id]
+        if not reservations:
+            raise ValueError("toBePublishedAt not found")
+        return next(iter(reservations.values()))
 
-        if to_be_published_at == "null":
-            return PublishReservationStatus.from_str(None)
-        to_be_published_at = to_be_published_at.strip('"')
 
-        return PublishReservationStatus.from_str(to_be_published_at)
+def _objects(data: Any) -> Iterator[dict[str, Any]]:
+    """Objects having toBePublishedAt in the JSON data"""
+    # 深いJSONでも再帰しないようにスタックで辿る
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if "toBePublishedAt" in value:
+                yield value
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
@@ -1,27 +1,37 @@
 """Scrape work page."""
 
-from kakuyomu.types import RemoteEpisode
+import bs4
 
-from .base import ScraperBase
+from kakuyomu.types.work import EpisodeRecord, RemoteEpisode
+
+from .base import ScraperBase, memoize
 
 
 class WorkPageScraper(ScraperBase):
     """Class for scrape work page."""
 
-    def scrape_episodes(self) -> list[RemoteEpisode]:
-        """Scrape episodes from work page"""
+    # エピソードはtd.episode-title, csrf_tokenはinput
+    parse_only = bs4.SoupStrainer(["td", "input"])
+
+    @memoize
+    def scrape_episode_records(self) -> list[EpisodeRecord]:
+        """Scrape episodes from work page in toc order"""
         links = self.soup.select("td.episode-title a")
-        result: list[RemoteEpisode] = []
+        result: list[EpisodeRecord] = []
         for link in links:
             href = link.get("href")
             if not href or not isinstance(href, str):
                 continue
             episode_id = href.split("/")[-1]
             episode_title = link.text
-            episode = RemoteEpisode(id=episode_id, title=episode_title)
-            result.append(episode)
+            result.append(EpisodeRecord(id=episode_id, title=episode_title))
         return result
 
+    def scrape_episodes(self) -> list[RemoteEpisode]:
+        """Scrape episodes from work page as RemoteEpisode"""
+        return [record.remote() for record in self.scrape_episode_records()]
+
+    @memoize
     def scrape_csrf_token(self) -> str:
         """Scrape csrf token from work page"""
         tag = self.soup.select_one("input[name=csrf_token]")
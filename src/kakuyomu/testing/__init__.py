@@ -0,0 +1,22 @@
+"""
+Helpers to run the client against a local mock of kakuyomu.jp
+
+Used by the tests and the benchmarks.
+"""
+
+from kakuyomu.client import Client
+from kakuyomu.client.rate_limit import NoLimit
+from kakuyomu.types.path import Path
+
+from .mock_server import TEMPLATE_DIR, MockKakuyomuServer
+
+__all__ = ["MockKakuyomuServer", "TEMPLATE_DIR", "create_mock_client"]
+
+
+def create_mock_client(server: MockKakuyomuServer, cwd: Path) -> Client:
+    """Create client logged in to the mock server"""
+    client = Client(cwd=cwd)
+    client.session.root_url = server.url
+    client.session.set_rate_limiter(NoLimit())
+    client.login(server.email, server.password)
+    return client
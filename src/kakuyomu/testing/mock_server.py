@@ -0,0 +1,481 @@
+"""
+kakuyomu.jpのモックサーバー
+
+テストやベンチマークをオフラインで実行するためのローカルHTTPサーバー.
+templates/*.html からページを生成する.
+
+* latency: 全てのレスポンスを遅延させる秒数
+* failure_rate: ランダムに503を返す割合
+* fail_next(): 次のn回のリクエストを指定したステータスで失敗させる
+* etag: HTMLにETagを付けて, If-None-Matchが一致すれば304を返す
+"""
+
+import datetime
+import hashlib
+import html
+import http
+import http.cookies
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Final, Self
+
+from kakuyomu.types.path import Path
+
+TEMPLATE_DIR: Final[Path] = Path(__file__).parent.joinpath("templates")
+SESSION_COOKIE: Final[str] = "mock_session"
+
+
+def _template(name: str) -> str:
+    """Read template html"""
+    return TEMPLATE_DIR.joinpath(name).read_text()
+
+
+@dataclass
+class MockEpisode:
+    """Episode stored in the mock server"""
+
+    id: str
+    title: str
+    body: str = ""
+    status: str = "draft"
+    edit_reservation: int = 0
+    keep_editing: int = 0
+    use_reservation: int = 1
+    to_be_published_at: str | None = None
+
+
+@dataclass
+class MockWork:
+    """Work stored in the mock server"""
+
+    id: str
+    title: str
+    episodes: dict[str, MockEpisode] = field(default_factory=dict)
+
+
+@dataclass
+class RequestRecord:
+    """Request received by the mock server"""
+
+    method: str
+    path: str
+    status: int
+
+
+class MockKakuyomuServer:
+    """Local stand-in for kakuyomu.jp"""
+
+    email: str
+    password: str
+    user_name: str
+    user_id: str
+    works: dict[str, MockWork]
+    latency: float
+    failure_rate: float
+    etag: bool
+    requests: list[RequestRecord]
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        etag: bool = True,
+        email: str = "test@example.com",
+        password: str = "password",
+    ) -> None:
+        """Initialize mock server"""
+        self.email = email
+        self.password = password
+        self.user_name = "テストユーザー"
+        self.user_id = "test_user"
+        self.works = {}
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.etag = etag
+        self.requests = []
+        self.csrf_token = secrets.token_urlsafe(16)
+        self._random = random.Random(seed)
+        self._sessions: set[str] = set()
+        self._fail_next: list[int] = []
+        self._next_id = 16816927860000000000
+        self._lock = threading.RLock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Root url of the server"""
+        assert self._server, "server is not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> Self:
+        """Start serving in a background thread"""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_class(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop server"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> Self:
+        """Start server"""
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop server"""
+        self.stop()
+
+    def new_id(self) -> str:
+        """Issue a new id"""
+        with self._lock:
+            self._next_id += 1
+            return str(self._next_id)
+
+    def add_work(self, title: str, work_id: str | None = None) -> MockWork:
+        """Add work"""
+        work = MockWork(id=work_id or self.new_id(), title=title)
+        self.works[work.id] = work
+        return work
+
+    def add_episode(self, work_id: str, title: str, body: str = "", episode_id: str | None = None) -> MockEpisode:
+        """Add episode to the end of the toc"""
+        episode = MockEpisode(id=episode_id or self.new_id(), title=title, body=body)
+        self.works[work_id].episodes[episode.id] = episode
+        return episode
+
+    def fail_next(self, count: int = 1, status: int = http.HTTPStatus.INTERNAL_SERVER_ERROR) -> None:
+        """Fail next count requests with status"""
+        with self._lock:
+            self._fail_next.extend([status] * count)
+
+    def count(self, method: str | None = None, path: str | None = None) -> int:
+        """Count received requests"""
+        return len(
+            [
+                record
+                for record in self.requests
+                if (method is None or record.method == method) and (path is None or record.path == path)
+            ]
+        )
+
+    def _injected_failure(self) -> int | None:
+        """Return status to fail with if a failure is injected"""
+        with self._lock:
+            if self._fail_next:
+                return self._fail_next.pop(0)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                return http.HTTPStatus.SERVICE_UNAVAILABLE
+        return None
+
+    def _login(self, email: str, password: str) -> str | None:
+        """Create session token"""
+        if email != self.email or password != self.password:
+            return None
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._sessions.add(token)
+        return token
+
+    def _is_login(self, token: str | None) -> bool:
+        """Check session token"""
+        return token is not None and token in self._sessions
+
+    def logout_all(self) -> None:
+        """Expire all sessions"""
+        with self._lock:
+            self._sessions.clear()
+
+    def render_my_page(self) -> str:
+        """Render /my"""
+        row = _template("my_work_row.html")
+        rows = "".join(row.format(work_id=work.id, work_title=html.escape(work.title)) for work in self.works.values())
+        return _template("my.html").format(user_name=html.escape(self.user_name), user_id=self.user_id, work_rows=rows)
+
+    def render_private_page(self) -> str:
+        """Render /settings/private"""
+        return _template("private.html").format(birth_day="2000年01月01日", email=self.email, user_id=self.user_id)
+
+    def render_work_page(self, work: MockWork) -> str:
+        """Render /my/works/{work_id}"""
+        row = _template("work_episode_row.html")
+        rows = "".join(
+            row.format(work_id=work.id, episode_id=episode.id, title=html.escape(episode.title), status=episode.status)
+            for episode in work.episodes.values()
+        )
+        return _template("work.html").format(
+            work_id=work.id, work_title=html.escape(work.title), csrf_token=self.csrf_token, episode_rows=rows
+        )
+
+    def render_episode_page(self, work: MockWork, episode: MockEpisode) -> str:
+        """Render /my/works/{work_id}/episodes/{episode_id}"""
+        return _template("episode.html").format(
+            work_id=work.id,
+            episode_id=episode.id,
+            csrf_token=self.csrf_token,
+            title=html.escape(episode.title),
+            body=html.escape(episode.body),
+            status=episode.status,
+            edit_reservation=episode.edit_reservation,
+            keep_editing=episode.keep_editing,
+            use_reservation=episode.use_reservation,
+        )
+
+    def render_publish_page(self, work: MockWork, episode: MockEpisode) -> str:
+        """Render /my/works/{work_id}/episodes/{episode_id}/publish"""
+        next_data = {
+            "props": {
+                "pageProps": {
+                    "__APOLLO_STATE__": {
+                        f"Work:{work.id}": {"__typename": "Work", "id": work.id, "title": work.title},
+                        f"Episode:{episode.id}": {
+                            "__typename": "Episode",
+                            "id": episode.id,
+                            "title": episode.title,
+                            "publicationStatus": "RESERVED" if episode.to_be_published_at else "DRAFT",
+                            "toBePublishedAt": episode.to_be_published_at,
+                        },
+                    }
+                }
+            },
+            "page": "/my/works/[workId]/episodes/[episodeId]/publish",
+        }
+        # scriptタグの中身はエスケープされないので, 終了タグだけ壊しておく
+        return _template("publish.html").format(next_data=json.dumps(next_data).replace("</", "<\\/"))
+
+
+def _handler_class(server: MockKakuyomuServer) -> type[BaseHTTPRequestHandler]:
+    """Create request handler bound to server"""
+
+    class Handler(_MockHandler):
+        mock = server
+
+    return Handler
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Request handler of MockKakuyomuServer"""
+
+    mock: MockKakuyomuServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Suppress access log"""
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Handle GET"""
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Handle POST"""
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        """Route request"""
+        mock = self.mock
+        if mock.latency:
+            time.sleep(mock.latency)
+        parsed = urllib.parse.urlsplit(self.path)
+        body = self._read_body()
+        self._status = 0
+        if failure := mock._injected_failure():
+            self._send(failure, "injected failure")
+        else:
+            route = getattr(self, f"_{method.lower()}", None)
+            if route is None:
+                self._send(http.HTTPStatus.METHOD_NOT_ALLOWED, "method not allowed")
+            else:
+                route(parsed.path.rstrip("/").split("/")[1:], parsed.query, body)
+        mock.requests.append(RequestRecord(method=method, path=parsed.path, status=self._status))
+
+    def _read_body(self) -> bytes:
+        """Read request body (Content-Length or chunked)"""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _send(
+        self,
+        status: int,
+        content: str,
+        content_type: str = "text/plain; charset=utf-8",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Send response"""
+        data = content.encode("utf-8")
+        self._status = status
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_html(self, content: str) -> None:
+        """Send html with ETag, 304 if it matches If-None-Match"""
+        etag = '"' + hashlib.sha256(content.encode("utf-8")).hexdigest()[:32] + '"'
+        if self.mock.etag and self.headers.get("If-None-Match") == etag:
+            self._status = http.HTTPStatus.NOT_MODIFIED
+            self.send_response(http.HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        headers = {"ETag": etag} if self.mock.etag else None
+        self._send(http.HTTPStatus.OK, content, "text/html; charset=utf-8", headers=headers)
+
+    def _send_json(self, content: Any, status: int = http.HTTPStatus.OK) -> None:
+        """Send json"""
+        self._send(status, json.dumps(content), "application/json")
+
+    def _redirect_to_login(self) -> None:
+        """Redirect to login page"""
+        self._send(http.HTTPStatus.FOUND, "", headers={"Location": "/login"})
+
+    def _is_login(self) -> bool:
+        """Check session cookie"""
+        cookies = http.cookies.SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookies.get(SESSION_COOKIE)
+        return self.mock._is_login(morsel.value if morsel else None)
+
+    def _find(self, work_id: str, episode_id: str | None = None) -> tuple[MockWork, MockEpisode | None] | None:
+        """Find work and episode, send 404 if not found"""
+        work = self.mock.works.get(work_id)
+        episode = work.episodes.get(episode_id) if work and episode_id else None
+        if not work or (episode_id and not episode):
+            self._send(http.HTTPStatus.NOT_FOUND, "not found")
+            return None
+        return work, episode
+
+    def _get(self, paths: list[str], query: str, body: bytes) -> None:
+        """Handle GET routes"""
+        mock = self.mock
+        if paths == ["login"]:
+            self._send_html("<html><body>login</body></html>")
+            return
+        if not self._is_login():
+            self._redirect_to_login()
+            return
+        match paths:
+            case ["my"]:
+                self._send_html(mock.render_my_page())
+            case ["settings", "private"]:
+                self._send_html(mock.render_private_page())
+            case ["my", "works", work_id]:
+                if found := self._find(work_id):
+                    self._send_html(mock.render_work_page(found[0]))
+            case ["my", "works", work_id, "episodes", episode_id]:
+                if (found := self._find(work_id, episode_id)) and found[1]:
+                    self._send_html(mock.render_episode_page(found[0], found[1]))
+            case ["my", "works", work_id, "episodes", episode_id, "publish"]:
+                if (found := self._find(work_id, episode_id)) and found[1]:
+                    self._send_html(mock.render_publish_page(found[0], found[1]))
+            case _:
+                self._send(http.HTTPStatus.NOT_FOUND, "not found")
+
+    def _post(self, paths: list[str], query: str, body: bytes) -> None:
+        """Handle POST routes"""
+        mock = self.mock
+        if paths == ["login"]:
+            form = self._form(body)
+            token = mock._login(form.get("email_address", [""])[0], form.get("password", [""])[0])
+            if token is None:
+                self._send_json({"error": "login failed"}, http.HTTPStatus.BAD_REQUEST)
+                return
+            self._send(
+                http.HTTPStatus.OK,
+                "{}",
+                "application/json",
+                headers={"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"},
+            )
+            return
+        if not self._is_login():
+            self._send_json({"error": "unauthorized"}, http.HTTPStatus.UNAUTHORIZED)
+            return
+        match paths:
+            case ["my", "works", work_id, "episodes", "new"]:
+                if found := self._find(work_id):
+                    form = self._form(body)
+                    episode = mock.add_episode(
+                        found[0].id, title=form.get("title", [""])[0], body=form.get("body", [""])[0]
+                    )
+                    episode.status = form.get("status", ["draft"])[0]
+                    self._send_json({"location": f"/my/works/{work_id}"})
+            case ["my", "works", work_id, "episodes", episode_id]:
+                if (found := self._find(work_id, episode_id)) and found[1]:
+                    form = self._form(body)
+                    if form.get("csrf_token", [""])[0] != mock.csrf_token:
+                        self._send_json({"error": "invalid csrf token"}, http.HTTPStatus.FORBIDDEN)
+                        return
+                    episode = found[1]
+                    episode.title = form.get("title", [episode.title])[0]
+                    episode.body = form.get("body", [""])[0]
+                    self._send_json({"location": f"/my/works/{work_id}/episodes/{episode_id}"})
+            case ["my", "works", work_id, "edit_toc_bulk"]:
+                if found := self._find(work_id):
+                    form = self._form(body)
+                    if form.get("csrf_token", [""])[0] != mock.csrf_token:
+                        self._send_json({"error": "invalid csrf token"}, http.HTTPStatus.FORBIDDEN)
+                        return
+                    if form.get("bulk_action_name", [""])[0] == "delete":
+                        for item_id in form.get("target_toc_item_id", []):
+                            found[0].episodes.pop(item_id.removeprefix("episode:"), None)
+                    self._send_json({"location": f"/my/works/{work_id}"})
+            case ["graphql"]:
+                self._graphql(body)
+            case _:
+                self._send(http.HTTPStatus.NOT_FOUND, "not found")
+
+    def _graphql(self, body: bytes) -> None:
+        """Handle graphql operations"""
+        request = json.loads(body)
+        if request.get("operationName") != "UpdateEpisodeReservationMutation":
+            self._send_json({"errors": [{"message": "unknown operation"}]}, http.HTTPStatus.BAD_REQUEST)
+            return
+        _input = request["variables"]["input"]
+        for work in self.mock.works.values():
+            if episode := work.episodes.get(_input["episodeId"]):
+                reserve_datetime = _input["reserveDatetime"]
+                # 本物と同じくUTCで返す
+                episode.to_be_published_at = (
+                    datetime.datetime.fromisoformat(reserve_datetime)
+                    .astimezone(datetime.UTC)
+                    .strftime("%Y-%m-%dT%H:%M:%SZ")
+                    if reserve_datetime
+                    else None
+                )
+                episode.status = "reserved" if reserve_datetime else "draft"
+                self._send_json({"data": {"updateEpisodeReservation": {"episode": {"id": episode.id}}}})
+                return
+        self._send_json({"errors": [{"message": "episode not found"}]})
+
+    @staticmethod
+    def _form(body: bytes) -> dict[str, list[str]]:
+        """Parse form-encoded body"""
+        return urllib.parse.parse_qs(body.decode("utf-8"), keep_blank_values=True)
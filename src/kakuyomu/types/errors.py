@@ -43,3 +43,11 @@ class EpisodeBodyNotFoundError(Exception):
 
 class EpisodeReservePublishError(Exception):
     """Episode publish reserve error"""
+
+
+class EpisodeFileExistsError(Exception):
+    """File to write an episode already exists"""
+
+
+class EpisodeBodyChangedError(Exception):
+    """File of an episode changed while it was sent"""
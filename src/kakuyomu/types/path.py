@@ -41,7 +41,22 @@ class ConfigDir(Path):
         """Get the work toml file"""
         return Path.joinpath(self, "work.toml")
 
+    @cached_property
+    def work_cache(self) -> Path:
+        """Get the parsed work cache file"""
+        return Path.joinpath(self, "work.pickle")
+
     @cached_property
     def cookie(self) -> Path:
         """Get the cookie file"""
         return Path.joinpath(self, "cookie")
+
+    @cached_property
+    def http_cache(self) -> Path:
+        """Get the http cache directory"""
+        return Path.joinpath(self, "http_cache")
+
+    @cached_property
+    def toc(self) -> Path:
+        """Get the remote toc snapshot file"""
+        return Path.joinpath(self, "toc.json")
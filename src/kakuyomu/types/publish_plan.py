@@ -0,0 +1,114 @@
+"""
+Publish schedule manifest
+
+A plan is a TOML file with explicit entries, a cadence, or both:
+
+    [[episodes]]
+    episode = "16816927859880026113"   # episode id or the linked file path
+    publish_at = 2024-07-01T19:00:00
+
+    [cadence]
+    start = 2024-07-02T19:00:00        # the first episode is published at start
+    interval_days = 1                  # then one episode every interval_days
+    episodes = ["publish/010.txt", "publish/011.txt"]
+
+Datetimes without an offset are in JST. File paths are relative to the plan file.
+"""
+
+import datetime
+import tomllib
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from kakuyomu.settings.const import JST
+from kakuyomu.types.errors import EpisodeNotFoundError
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import EpisodeId, Work
+
+
+class PlanEntry(BaseModel):
+    """Publish one episode at publish_at"""
+
+    episode: str
+    publish_at: datetime.datetime
+
+
+class Cadence(BaseModel):
+    """Publish episodes in order, one every interval_days from start"""
+
+    start: datetime.datetime
+    interval_days: int = Field(default=1, ge=1)
+    episodes: list[str]
+
+    def entries(self) -> list[PlanEntry]:
+        """Expand into entries"""
+        interval = datetime.timedelta(days=self.interval_days)
+        return [
+            PlanEntry(episode=episode, publish_at=self.start + interval * i) for i, episode in enumerate(self.episodes)
+        ]
+
+
+class PublishPlan(BaseModel):
+    """Publish schedule manifest"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    episodes: list[PlanEntry] = []
+    cadence: Cadence | None = None
+    # エピソードのファイルパスの基準になるディレクトリ
+    base_dir: Path = Field(default_factory=Path.cwd, exclude=True)
+
+    @classmethod
+    def load(cls, path: Path) -> "PublishPlan":
+        """Load plan from TOML file"""
+        with open(path, "rb") as f:
+            params = tomllib.load(f)
+        return cls(**params, base_dir=Path(path).absolute().parent)
+
+    def entries(self) -> list[PlanEntry]:
+        """Explicit entries followed by the entries of the cadence"""
+        cadence_entries = self.cadence.entries() if self.cadence else []
+        return self.episodes + cadence_entries
+
+    def resolve(self, work: Work, root: Path) -> dict[EpisodeId, datetime.datetime]:
+        """
+        Resolve episodes of the plan
+
+        Args:
+        ----
+            work: work with the episodes
+            root: work root of the linked file paths
+
+        Returns:
+        -------
+            dict of episode id to publish datetime in JST, in the order of the plan
+
+        Raises:
+        ------
+            EpisodeNotFoundError: episode is not in the work or no episode is linked to the file
+            ValueError: episode appears more than once
+
+        """
+        schedule: dict[EpisodeId, datetime.datetime] = {}
+        for entry in self.entries():
+            episode_id = self._resolve_episode(entry.episode, work, root)
+            if episode_id in schedule:
+                raise ValueError(f"エピソードが複数回指定されています: {entry.episode}")
+            schedule[episode_id] = _to_jst(entry.publish_at)
+        return schedule
+
+    def _resolve_episode(self, episode: str, work: Work, root: Path) -> EpisodeId:
+        """Resolve episode id or linked file path to episode id"""
+        if episode in work.episodes:
+            return episode
+        local_episode = work.get_episode_by_path(root, Path.joinpath(self.base_dir, episode))
+        if local_episode is None:
+            raise EpisodeNotFoundError(f"エピソードが見つかりません: {episode}")
+        return local_episode.id
+
+
+def _to_jst(value: datetime.datetime) -> datetime.datetime:
+    """Treat naive datetime as JST and convert aware datetime to JST"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=JST)
+    return value.astimezone(JST)
@@ -1,6 +1,6 @@
 """Define type aliases and models."""
 
-from .episode import Episode, EpisodeId, EpisodeStatus, LocalEpisode, RemoteEpisode
+from .episode import Episode, EpisodeId, EpisodeRecord, EpisodeStatus, LocalEpisode, RemoteEpisode
 from .episode_query import Diff, Query
 from .work import LoginStatus, Work, WorkId
 
@@ -8,6 +8,7 @@ __all__ = [
     "Diff",
     "Episode",
     "EpisodeId",
+    "EpisodeRecord",
     "EpisodeStatus",
     "LocalEpisode",
     "LoginStatus",
@@ -1,7 +1,9 @@
 """Define types around episode"""
 
 import datetime
+import hashlib
 from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import TypedDict
 
 from pydantic import BaseModel, ConfigDict
@@ -50,6 +52,22 @@ class PublishReservationStatus(BaseModel):
 
         return cls(scheduled_at=schedule_datetime)
 
+    def is_scheduled_at(self, publish_at: datetime.datetime | None) -> bool:
+        """
+        Check if the reservation is publish_at in minutes, None for not reserved
+
+        Reservations are sent in minutes, so seconds are ignored. Naive datetime is in JST.
+        """
+        if self.scheduled_at is None or publish_at is None:
+            return self.scheduled_at is None and publish_at is None
+        return _jst_minute(self.scheduled_at) == _jst_minute(publish_at)
+
+
+def _jst_minute(value: datetime.datetime) -> datetime.datetime:
+    """Convert to JST truncated to minutes"""
+    value = value.replace(tzinfo=JST) if value.tzinfo is None else value.astimezone(JST)
+    return value.replace(second=0, microsecond=0)
+
 
 class LocalEpisodeDict(TypedDict):
     """Episode dict"""
@@ -57,6 +75,8 @@ class LocalEpisodeDict(TypedDict):
     id: EpisodeId
     title: str
     rel_path: str | None
+    content_hash: str | None
+    pushed_at: datetime.datetime | None
 
 
 class Episode(BaseModel):
@@ -80,10 +100,34 @@ class RemoteEpisode(Episode):
     model_config = ConfigDict(frozen=True)
 
 
+@dataclass(slots=True, frozen=True)
+class EpisodeRecord:
+    """
+    Lightweight episode of the toc
+
+    Scrapers and the client keep toc entries as records, which are much cheaper to create
+    and to pickle than pydantic models. RemoteEpisode is created only when returned to the caller.
+    """
+
+    id: EpisodeId
+    title: str
+
+    def remote(self) -> RemoteEpisode:
+        """Convert to RemoteEpisode"""
+        return RemoteEpisode(id=self.id, title=self.title)
+
+    def __str__(self) -> str:
+        """Return string representation of the episode"""
+        return f"{self.id}:{self.title}"
+
+
 class LocalEpisode(Episode):
     """Local episode model"""
 
     rel_path: str | None = None
+    # 最後にアップロードしたファイルの内容のハッシュと日時
+    content_hash: str | None = None
+    pushed_at: datetime.datetime | None = None
 
     def __str__(self) -> str:
         """Return string representation of the episode"""
@@ -94,7 +138,7 @@ class LocalEpisode(Episode):
         if self.rel_path is None:
             raise ValueError(f"Path is not set: {self=}")
         filepath = self.path(root)
-        with open(filepath, "r") as f:
+        with open(filepath, "r", encoding="utf-8") as f:
             yield from f
 
     def path(self, root: Path) -> Path:
@@ -103,9 +147,24 @@ class LocalEpisode(Episode):
             raise ValueError(f"Path is not set: {self=}")
         return Path.joinpath(root, self.rel_path)
 
-    def set_path(self, root: Path, path: Path) -> None:
-        """Set path"""
+    def _set_path(self, root: Path, path: Path) -> None:
+        """Set path, use Work.set_episode_path to keep the path index of the work"""
         self.rel_path = str(path.relative_to(root))
+        self.content_hash = None
+        self.pushed_at = None
+
+    def compute_hash(self, root: Path) -> str:
+        """Return sha256 hex digest of the linked file"""
+        digest = hashlib.sha256()
+        with open(self.path(root), "rb") as f:
+            while chunk := f.read(1 << 16):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def mark_pushed(self, content_hash: str, pushed_at: datetime.datetime) -> None:
+        """Record the content uploaded to the remote episode"""
+        self.content_hash = content_hash
+        self.pushed_at = pushed_at
 
     def dump(self) -> LocalEpisodeDict:
         """Dump model"""
@@ -113,4 +172,6 @@ class LocalEpisode(Episode):
             "id": self.id,
             "title": self.title,
             "rel_path": self.rel_path,
+            "content_hash": self.content_hash,
+            "pushed_at": self.pushed_at,
         }
@@ -1,6 +1,9 @@
 """Episode query"""
 
-from collections.abc import Sequence
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from functools import cached_property
 
 from pydantic import BaseModel
 
@@ -8,11 +11,48 @@ from .episode import Episode, EpisodeId, LocalEpisode
 
 
 class Diff(BaseModel):
-    """Episodes diff model"""
+    """
+    Episodes diff model
+
+    appended: episodes only in the newer
+    removed: episodes only in the older
+    updated: episodes whose path or pushed content changed
+    renamed: episodes whose title changed
+    reordered: episodes moved in the toc, the fewest needed to turn the older order into the newer
+    """
 
     appended: list[Episode] = []
     removed: list[Episode] = []
     updated: list[Episode] = []
+    renamed: list[Episode] = []
+    reordered: list[Episode] = []
+
+
+class EpisodeColumns:
+    """
+    Episodes in toc order as columns
+
+    Titles and the other local fields are kept as hashes, so the diff compares integers
+    in arrays instead of pydantic models.
+    """
+
+    __slots__ = ("ids", "titles", "states", "index")
+
+    ids: list[EpisodeId]
+    titles: array[int]
+    states: array[int]
+    index: dict[EpisodeId, int]
+
+    def __init__(self, episodes: Iterable[LocalEpisode]) -> None:
+        """Build columns"""
+        self.ids = []
+        self.titles = array("q")
+        self.states = array("q")
+        for episode in episodes:
+            self.ids.append(episode.id)
+            self.titles.append(hash(episode.title))
+            self.states.append(hash((episode.rel_path, episode.content_hash, episode.pushed_at)))
+        self.index = {episode_id: i for i, episode_id in enumerate(self.ids)}
 
 
 class Query:
@@ -24,6 +64,11 @@ class Query:
         """Initialize episode query"""
         self._dict = episodes
 
+    @cached_property
+    def columns(self) -> EpisodeColumns:
+        """Columns of the episodes"""
+        return EpisodeColumns(self._dict.values())
+
     def _exists_same_id(self, episodes: Sequence[Episode]) -> bool:
         """Validate episodes"""
         ids = [episode.id for episode in episodes]
@@ -34,23 +79,66 @@ class Query:
         return self._dict[episode_id]
 
     def diff(self, newer: "Query") -> Diff:
-        """Diff episodes"""
-        appended = set(newer._dict.keys()) - set(self._dict.keys())
-        removed = set(self._dict.keys()) - set(newer._dict.keys())
-
-        updated = set()
-        remains = set(self._dict.keys()) & set(newer._dict.keys())
-
-        for remain in remains:
-            if self._dict[remain] != newer._dict[remain]:
-                updated.add(remain)
-        return Diff(
-            appended=[newer._dict[episode_id] for episode_id in appended],
-            removed=[self._dict[episode_id] for episode_id in removed],
-            updated=[newer._dict[episode_id] for episode_id in updated],
-        )
+        """Diff episodes, each category in the toc order of the newer (removed in the older)"""
+        older_columns, newer_columns = self.columns, newer.columns
+        older_index = older_columns.index
+        appended: list[Episode] = []
+        updated: list[Episode] = []
+        renamed: list[Episode] = []
+        # 両方にあるエピソードの, 新しい順での位置と古い順での位置
+        common = array("q")
+        older_positions = array("q")
+        for j, episode_id in enumerate(newer_columns.ids):
+            i = older_index.get(episode_id)
+            if i is None:
+                appended.append(newer._dict[episode_id])
+                continue
+            common.append(j)
+            older_positions.append(i)
+            if older_columns.titles[i] != newer_columns.titles[j]:
+                renamed.append(newer._dict[episode_id])
+            if older_columns.states[i] != newer_columns.states[j]:
+                updated.append(newer._dict[episode_id])
+
+        newer_index = newer_columns.index
+        removed: list[Episode] = [
+            self._dict[episode_id] for episode_id in older_columns.ids if episode_id not in newer_index
+        ]
+        kept = _increasing_subsequence(older_positions)
+        reordered: list[Episode] = [newer._dict[newer_columns.ids[j]] for k, j in enumerate(common) if not kept[k]]
+        return Diff(appended=appended, removed=removed, updated=updated, renamed=renamed, reordered=reordered)
 
     def __str__(self) -> str:
         """Return string representation of the query"""
         _list = [episode for episode in self._dict.values()]
         return "\n".join([episode.id for episode in _list])
+
+
+def _increasing_subsequence(values: array[int]) -> bytearray:
+    """
+    Mark a longest increasing subsequence of values in O(n log n)
+
+    Episodes whose older positions are in it keep their relative order,
+    so the others are the fewest episodes to move.
+    """
+    # tails[k]: 長さk+1の増加部分列の末尾の値が最小になるときの, その末尾のindex
+    tails = array("q")
+    tail_values = array("q")
+    previous = array("q", [-1]) * len(values)
+    for index, value in enumerate(values):
+        k = bisect_left(tail_values, value)
+        if k:
+            previous[index] = tails[k - 1]
+        if k == len(tails):
+            tails.append(index)
+            tail_values.append(value)
+        else:
+            tails[k] = index
+            tail_values[k] = value
+
+    kept = bytearray(len(values))
+    index = tails[-1] if tails else -1
+    while index >= 0:
+        kept[index] = 1
+        index = previous[index]
+    return kept
@@ -0,0 +1,93 @@
+"""
+Minimal TOML writer for work.toml
+
+The standard library only reads TOML (tomllib), so this module writes the subset used by work.toml:
+scalar values, arrays of scalars and arrays of tables. None values are omitted as TOML has no null.
+"""
+
+import datetime
+import math
+import re
+from collections.abc import Mapping
+from typing import Any
+
+_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+_ESCAPES = {'"': '\\"', "\\": "\\\\", "\b": "\\b", "\t": "\\t", "\n": "\\n", "\f": "\\f", "\r": "\\r"}
+_ESCAPE_CHARS = re.compile(r'["\\\x00-\x1f\x7f]')
+
+
+def _escape(match: re.Match[str]) -> str:
+    """Escape one character of a basic string"""
+    char = match.group()
+    return _ESCAPES.get(char) or f"\\u{ord(char):04x}"
+
+
+def _key(key: str) -> str:
+    """Format key, quoted unless it is a bare key"""
+    return key if _BARE_KEY.fullmatch(key) else _string(key)
+
+
+def _string(value: str) -> str:
+    """Format basic string"""
+    return '"' + _ESCAPE_CHARS.sub(_escape, value) + '"'
+
+
+def _value(value: Any) -> str:
+    """Format value"""
+    match value:
+        case str():
+            return _string(value)
+        case bool():
+            return "true" if value else "false"
+        case int():
+            return str(value)
+        case float():
+            if math.isnan(value):
+                return "nan"
+            if math.isinf(value):
+                return "inf" if value > 0 else "-inf"
+            return repr(value)
+        case datetime.datetime() | datetime.date() | datetime.time():
+            return value.isoformat()
+        case list() | tuple():
+            return "[" + ", ".join(_value(item) for item in value) + "]"
+    raise TypeError(f"TOMLに書き込めない値です: {value!r}")
+
+
+def _is_table_array(value: Any) -> bool:
+    """Check if value is written as an array of tables"""
+    return isinstance(value, list | tuple) and bool(value) and all(isinstance(item, Mapping) for item in value)
+
+
+def _scalars(table: Mapping[str, Any]) -> list[str]:
+    """Format key/value lines of table except arrays of tables"""
+    return [
+        f"{_key(key)} = {_value(value)}"
+        for key, value in table.items()
+        if value is not None and not _is_table_array(value)
+    ]
+
+
+def dumps(data: Mapping[str, Any]) -> str:
+    """
+    Format data as TOML
+
+    Args:
+    ----
+        data: dict of scalars, arrays of scalars and arrays of tables of scalars
+
+    Returns:
+    -------
+        TOML document
+
+    """
+    lines = _scalars(data)
+    for key, value in data.items():
+        if not _is_table_array(value):
+            continue
+        header = f"[[{_key(key)}]]"
+        for table in value:
+            lines.append("")
+            lines.append(header)
+            lines.extend(_scalars(table))
+    return "\n".join(lines) + "\n"
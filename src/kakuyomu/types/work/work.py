@@ -1,9 +1,11 @@
 """Define type around work"""
 
-from typing import TypedDict
+import os
+import tomllib
+from collections.abc import Iterable, Mapping
+from typing import Any, Self, TypedDict
 
-import toml
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from pydantic.functional_serializers import field_serializer
 from pydantic.functional_validators import field_validator
 
@@ -30,6 +32,98 @@ class Work(BaseModel):
     title: str
     # episodes: list["LocalEpisode"] = []
     episodes: dict["EpisodeId", "LocalEpisode"] = {}
+    # 正規化したrel_path -> EpisodeId
+    _path_index: dict[str, EpisodeId] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Build path index"""
+        self._build_path_index()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set attribute and rebuild path index when episodes are replaced"""
+        super().__setattr__(name, value)
+        if name == "episodes":
+            self._build_path_index()
+
+    @staticmethod
+    def _normalize_path(rel_path: str) -> str:
+        """Normalize relative path for the path index"""
+        return os.path.normpath(rel_path)
+
+    def _build_path_index(self) -> None:
+        """Build index from relative path to episode id"""
+        self._path_index = {
+            self._normalize_path(episode.rel_path): episode.id for episode in self.episodes.values() if episode.rel_path
+        }
+
+    def _rel_key(self, root: Path, filepath: Path) -> str | None:
+        """Key of filepath in the path index, None if it cannot be relative to root"""
+        try:
+            rel_path = os.path.relpath(filepath.absolute(), root.absolute())
+        except ValueError:
+            # windowsでドライブが異なる場合
+            return None
+        return self._normalize_path(rel_path)
+
+    def _lookup(self, key: str) -> LocalEpisode | None:
+        """Look up the path index, None if the entry is missing or stale"""
+        episode_id = self._path_index.get(key)
+        episode = self.episodes.get(episode_id) if episode_id is not None else None
+        if episode is None or episode.rel_path is None or self._normalize_path(episode.rel_path) != key:
+            return None
+        return episode
+
+    def get_episode_by_path(self, root: Path, filepath: Path) -> LocalEpisode | None:
+        """
+        Get episode linked to filepath
+
+        The index is rebuilt on a miss, as episodes can be replaced in place without going through Work.
+        """
+        key = self._rel_key(root, filepath)
+        if key is None:
+            return None
+        episode = self._lookup(key)
+        if episode is None:
+            self._build_path_index()
+            episode = self._lookup(key)
+        return episode
+
+    def get_episodes_by_paths(self, root: Path, filepaths: Iterable[Path]) -> dict[Path, LocalEpisode]:
+        """Get episodes linked to filepaths with one rebuild of the index, only the linked filepaths are returned"""
+        self._build_path_index()
+        found: dict[Path, LocalEpisode] = {}
+        for filepath in filepaths:
+            key = self._rel_key(root, filepath)
+            episode = self._lookup(key) if key is not None else None
+            if episode is not None:
+                found[filepath] = episode
+        return found
+
+    def set_episode_path(self, episode_id: EpisodeId, root: Path, filepath: Path) -> LocalEpisode:
+        """Link filepath to episode"""
+        episode = self.episodes[episode_id]
+        if episode.rel_path:
+            self._path_index.pop(self._normalize_path(episode.rel_path), None)
+        episode._set_path(root, filepath)
+        assert episode.rel_path
+        self._path_index[self._normalize_path(episode.rel_path)] = episode_id
+        return episode
+
+    def unset_episode_path(self, episode_id: EpisodeId) -> LocalEpisode:
+        """Unlink filepath from episode"""
+        episode = self.episodes[episode_id]
+        if episode.rel_path:
+            self._path_index.pop(self._normalize_path(episode.rel_path), None)
+        episode.rel_path = None
+        episode.content_hash = None
+        episode.pushed_at = None
+        return episode
+
+    def model_copy(self, *, update: Mapping[str, Any] | None = None, deep: bool = False) -> Self:
+        """Copy work and rebuild the path index of the copy"""
+        copied = super().model_copy(update=update, deep=deep)
+        copied._build_path_index()
+        return copied
 
     @field_validator("episodes", mode="before")
     @classmethod
@@ -47,11 +141,11 @@ class Work(BaseModel):
         """Load work from file"""
         if not toml_path.exists():
             raise FileNotFoundError(f"Workファイルが見つかりません: {toml_path}")
-        with open(toml_path, "r") as f:
+        with open(toml_path, "rb") as f:
             try:
-                params = toml.load(f)
+                params = tomllib.load(f)
                 return cls(**params)
-            except toml.TomlDecodeError as e:
+            except tomllib.TOMLDecodeError as e:
                 logger.error(f"Error decoding TOML: {e}")
                 raise e
             except Exception as e:
@@ -0,0 +1 @@
+"""Test for benchmarks"""
@@ -0,0 +1,32 @@
+"""Smoke test for benchmarks"""
+
+import json
+
+from click.testing import CliRunner
+
+from benchmarks.__main__ import main
+from benchmarks.cases import CASES
+from benchmarks.runner import iter_results
+from kakuyomu.types.path import Path
+
+
+def test_all_cases() -> None:
+    """All cases run with a small work"""
+    results = list(iter_results(CASES, [3], repeat=1))
+    assert [result.name for result in results] == list(CASES)
+    for result in results:
+        assert result.size == 3
+        assert result.seconds > 0
+        assert result.peak_bytes > 0
+
+
+def test_main_json(tmp_path: Path) -> None:
+    """Results are written as json"""
+    json_path = Path(tmp_path).joinpath("result.json")
+    runner = CliRunner()
+    result = runner.invoke(main, ["-n", "2", "-r", "1", "-k", "query_diff", "--json", str(json_path)])
+    assert result.exit_code == 0, result.output
+    assert "query_diff" in result.output
+    [record] = json.loads(json_path.read_text())
+    assert record["name"] == "query_diff"
+    assert record["throughput"] > 0
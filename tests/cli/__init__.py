@@ -0,0 +1 @@
+"""cli tests"""
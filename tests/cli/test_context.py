@@ -0,0 +1,36 @@
+"""Test for CLI context"""
+
+from click.testing import CliRunner
+from pytest_mock import MockFixture
+
+from kakuyomu.cli.commands import kakuyomu
+from kakuyomu.cli.commands.context import CliContext
+from kakuyomu.client import Client
+from kakuyomu.client.trace import JsonlTraceWriter
+from kakuyomu.types.path import Path
+
+
+class TestCliContext:
+    """Test for lazy client creation"""
+
+    def test_help_does_not_create_client(self, mocker: MockFixture) -> None:
+        """--help does not create client"""
+        init = mocker.patch.object(Client, "__init__", return_value=None)
+        result = CliRunner().invoke(kakuyomu, ["episode", "--help"])
+        assert result.exit_code == 0
+        init.assert_not_called()
+
+    def test_client_created_once(self) -> None:
+        """Client is created on first use and reused"""
+        context = CliContext()
+        assert context.client is context.client
+
+    def test_trace(self, tmp_path: Path) -> None:
+        """--trace registers a writer to the client and closes it"""
+        trace_path = Path(tmp_path).joinpath("trace.jsonl")
+        context = CliContext(trace_path=str(trace_path))
+        hooks = context.client.session.request_hooks
+        assert len(hooks) == 1
+        assert isinstance(hooks[0], JsonlTraceWriter)
+        context.close()
+        assert trace_path.exists()
@@ -0,0 +1,78 @@
+"""Test for episode commands"""
+
+import os
+
+from click.testing import CliRunner
+from pytest_mock import MockFixture
+
+from kakuyomu.cli.commands import kakuyomu
+from kakuyomu.client import Client
+from kakuyomu.types import LocalEpisode, Work
+from kakuyomu.types.path import Path
+
+
+class TestCreateFromDir:
+    """Test for `episode create --from-dir`"""
+
+    def test_create_from_dir(self, mocker: MockFixture) -> None:
+        """Files are created in name order with titles from the first line, skipping linked files"""
+        create = mocker.patch.object(Client, "create_remote_episodes", return_value=[])
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            root = Path(os.getcwd())
+            root.joinpath(".kakuyomu").mkdir()
+            root.joinpath("publish").mkdir()
+            root.joinpath("publish/002.txt").write_text("\n# 第二話\n\n本文\n")
+            root.joinpath("publish/001.txt").write_text("# 第一話\n本文\n")
+            root.joinpath("publish/000.txt").write_text("リンク済み\n")
+            root.joinpath("publish/memo.md").write_text("対象外\n")
+            work = Work(id="work", title="work")
+            work.episodes = {"0": LocalEpisode(id="0", title="zero", rel_path="publish/000.txt")}
+            Client(root)._dump_work_toml(work)
+
+            result = runner.invoke(kakuyomu, ["episode", "create", "--from-dir", "publish"])
+
+        assert result.exit_code == 0, result.output
+        episodes = create.call_args.args[0]
+        assert [(title, filepath.name) for title, filepath in episodes] == [
+            ("第一話", "001.txt"),
+            ("第二話", "002.txt"),
+        ]
+
+
+class TestPublishPlan:
+    """Test for `episode publish --plan`"""
+
+    def test_publish_plan(self, mocker: MockFixture) -> None:
+        """Episodes in the plan are reserved in one call"""
+        reserve = mocker.patch.object(
+            Client, "reserve_publishing_episodes", return_value={"1": True, "2": Exception("failed"), "3": False}
+        )
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            root = Path(os.getcwd())
+            root.joinpath(".kakuyomu").mkdir()
+            work = Work(id="work", title="work")
+            work.episodes = {
+                "1": LocalEpisode(id="1", title="第1話"),
+                "2": LocalEpisode(id="2", title="第2話", rel_path="publish/002.txt"),
+                "3": LocalEpisode(id="3", title="第3話"),
+            }
+            Client(root)._dump_work_toml(work)
+            root.joinpath("plan.toml").write_text(
+                '[cadence]\nstart = 2024-07-01T19:00:00\nepisodes = ["1", "publish/002.txt", "3"]\n'
+            )
+
+            result = runner.invoke(kakuyomu, ["episode", "publish", "--plan", "plan.toml", "--skip-unchanged"])
+
+        assert result.exit_code == 0, result.output
+        schedule = reserve.call_args.args[0]
+        assert {episode_id: f"{publish_at:%m/%d %H:%M}" for episode_id, publish_at in schedule.items()} == {
+            "1": "07/01 19:00",
+            "2": "07/02 19:00",
+            "3": "07/03 19:00",
+        }
+        assert reserve.call_args.kwargs["skip_unchanged"]
+        assert "予約公開しました: 2024/07/01 19:00 1:第1話" in result.output
+        assert "予約公開に失敗しました: 2:第2話" in result.output
+        assert "同じ日時で予約済みのためスキップしました: 2024/07/03 19:00 3:第3話" in result.output
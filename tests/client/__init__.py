@@ -0,0 +1 @@
+"""client tests"""
@@ -0,0 +1,69 @@
+"""Fixtures for client tests."""
+
+from collections.abc import Iterator
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+from kakuyomu.testing import MockKakuyomuServer, create_mock_client
+from kakuyomu.types import LocalEpisode, Work
+from kakuyomu.types.path import Path
+
+WORK_ID = "16816927860000000001"
+
+
+@pytest.fixture
+def episodes() -> list[tuple[str, str]]:
+    """Titles and bodies of the episodes on the mock server, override in the test module"""
+    return [("第1話", "本文")]
+
+
+@pytest.fixture
+def server(episodes: list[tuple[str, str]]) -> Iterator[MockKakuyomuServer]:
+    """Start mock server with one work of the episodes, whose ids are 1, 2, ..."""
+    with MockKakuyomuServer() as server:
+        server.add_work("テスト作品", work_id=WORK_ID)
+        for i, (title, body) in enumerate(episodes, start=1):
+            server.add_episode(WORK_ID, title, body, episode_id=str(i))
+        yield server
+
+
+@pytest.fixture
+def mock_client(server: MockKakuyomuServer, tmp_path: Path) -> Client:
+    """Create client logged in to the mock server"""
+    root = Path(tmp_path)
+    root.joinpath(".kakuyomu").mkdir()
+    root.joinpath("publish").mkdir()
+    client = create_mock_client(server, root)
+    client._dump_work_toml(Work(id=WORK_ID, title="テスト作品"))
+    # require_loginのステータス確認をテスト中のリクエストに含めない
+    client.cached_status()
+    return client
+
+
+@pytest.fixture
+def local_episodes() -> list[str]:
+    """Titles of the linked episodes of offline_client, override in the test module"""
+    return ["one"]
+
+
+@pytest.fixture
+def offline_client(local_episodes: list[str], tmp_path: Path, mocker: MockFixture) -> Client:
+    """
+    Create client which does not access kakuyomu.jp and is treated as logged in
+
+    Episodes of the work have ids 1, 2, ... and are linked to publish/001.txt, publish/002.txt, ...
+    """
+    root = Path(tmp_path)
+    root.joinpath(".kakuyomu").mkdir()
+    root.joinpath("publish").mkdir()
+    client = Client(cwd=root)
+    work = Work(id="work", title="work")
+    for i, title in enumerate(local_episodes, start=1):
+        rel_path = f"publish/{i:03}.txt"
+        root.joinpath(rel_path).write_text(f"body {i:03}\n")
+        work.episodes[str(i)] = LocalEpisode(id=str(i), title=title, rel_path=rel_path)
+    client._dump_work_toml(work)
+    mocker.patch.object(client, "cached_status").return_value.is_login = True
+    return client
@@ -0,0 +1,211 @@
+"""Test for AsyncClient"""
+
+import asyncio
+import datetime
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from kakuyomu.client.async_client import AsyncClient
+from kakuyomu.client.async_web import AsyncSession, _stream
+from kakuyomu.client.form_body import FormBody
+from kakuyomu.client.rate_limit import NoLimit, TokenBucket, acquire_async
+from kakuyomu.client.session_base import load_cookie
+from kakuyomu.client.trace import RequestEvent
+from kakuyomu.settings.const import JST
+from kakuyomu.testing import MockKakuyomuServer, create_mock_client
+from kakuyomu.types import LocalEpisode, Work
+from kakuyomu.types.errors import NotLoginError
+from kakuyomu.types.path import Path
+
+WORK_IDS = ["16816927860000000001", "16816927860000000002"]
+
+
+@pytest.fixture
+def server() -> Iterator[MockKakuyomuServer]:
+    """Start mock server with two works of two episodes"""
+    with MockKakuyomuServer() as server:
+        for work_id in WORK_IDS:
+            server.add_work(f"作品{work_id[-1]}", work_id=work_id)
+            for i in range(1, 3):
+                server.add_episode(work_id, f"第{i}話", f"本文{i}", episode_id=f"{work_id[-1]}{i}")
+        yield server
+
+
+def create_work_dir(server: MockKakuyomuServer, root: Path, work_id: str) -> Path:
+    """Create work directory with linked files and the login cookie"""
+    root.mkdir()
+    root.joinpath(".kakuyomu").mkdir()
+    root.joinpath("publish").mkdir()
+    client = create_mock_client(server, root)
+    work = Work(id=work_id, title="作品")
+    episodes = {}
+    for episode_id in server.works[work_id].episodes:
+        rel_path = f"publish/{episode_id}.txt"
+        root.joinpath(rel_path).write_text(f"新しい本文{episode_id}\n")
+        episodes[episode_id] = LocalEpisode(id=episode_id, title=f"題{episode_id}", rel_path=rel_path)
+    work.episodes = episodes
+    client._dump_work_toml(work)
+    return root
+
+
+def create_session(server: MockKakuyomuServer, root: Path) -> AsyncSession:
+    """Create session with the cookie saved in the work directory"""
+    session = AsyncSession(root_url=server.url, cookies=load_cookie(root.joinpath(".kakuyomu/cookie")))
+    session.set_rate_limiter(NoLimit())
+    return session
+
+
+class TestAsyncClient:
+    """Test for AsyncClient against the mock server"""
+
+    def test_get_remote_episodes(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Toc and body are fetched"""
+        root = create_work_dir(server, Path(tmp_path).joinpath("work"), WORK_IDS[0])
+
+        async def run() -> tuple[list[str], list[str]]:
+            async with AsyncClient(root, session=create_session(server, root)) as client:
+                episodes = await client.get_remote_episodes()
+                body = await client._get_remote_episode_body("11")
+                return [episode.id for episode in episodes], body
+
+        episode_ids, body = asyncio.run(run())
+        assert episode_ids == ["11", "12"]
+        assert body == ["本文1"]
+
+    def test_update_several_works(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Works sharing one session are updated in one event loop"""
+        roots = [
+            create_work_dir(server, Path(tmp_path).joinpath(f"work{i}"), work_id) for i, work_id in enumerate(WORK_IDS)
+        ]
+
+        async def run() -> list[dict[str, bool | Exception]]:
+            async with create_session(server, roots[0]) as session:
+                clients = [AsyncClient(root, session=session) for root in roots]
+                return await asyncio.gather(
+                    *[client.update_remote_episodes(list(client.work.episodes)) for client in clients]
+                )
+
+        results = asyncio.run(run())
+        assert results == [{"11": True, "12": True}, {"21": True, "22": True}]
+        assert server.works[WORK_IDS[1]].episodes["22"].body == "新しい本文22\n"
+        assert server.works[WORK_IDS[1]].episodes["22"].title == "題22"
+
+        # 2回目は変更が無いのでスキップされる
+        async def run_again() -> dict[str, bool | Exception]:
+            async with AsyncClient(roots[0], session=create_session(server, roots[0])) as client:
+                return await client.update_remote_episodes(["11"])
+
+        assert asyncio.run(run_again()) == {"11": False}
+
+    def test_publish_reserve(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Reservation is set and canceled"""
+        root = create_work_dir(server, Path(tmp_path).joinpath("work"), WORK_IDS[0])
+        episode = server.works[WORK_IDS[0]].episodes["11"]
+
+        async def run() -> str | None:
+            async with AsyncClient(root, session=create_session(server, root)) as client:
+                await client.reserve_publishing_episode("11", datetime.datetime(2030, 1, 1, 9, 0, tzinfo=JST))
+                reserved = episode.to_be_published_at
+                await client.cancel_reservation("11")
+                return reserved
+
+        assert asyncio.run(run()) == "2030-01-01T00:00:00Z"
+        assert episode.to_be_published_at is None
+
+    def test_not_login(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Operations fail without login"""
+        root = create_work_dir(server, Path(tmp_path).joinpath("work"), WORK_IDS[0])
+        server.logout_all()
+
+        async def run() -> None:
+            async with AsyncClient(root, session=create_session(server, root)) as client:
+                await client.get_remote_episodes()
+
+        with pytest.raises(NotLoginError):
+            asyncio.run(run())
+
+    def test_login_expired_after_status(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Login expired after the cached status check raises instead of scraping the login page"""
+        root = create_work_dir(server, Path(tmp_path).joinpath("work"), WORK_IDS[0])
+
+        async def run() -> None:
+            async with AsyncClient(root, session=create_session(server, root)) as client:
+                await client.cached_status()
+                server.logout_all()
+                await client.get_remote_episodes()
+
+        with pytest.raises(NotLoginError):
+            asyncio.run(run())
+
+    def test_error_event(self) -> None:
+        """Connection error is reported to the request hooks before it is raised, as in Session"""
+        events: list[RequestEvent] = []
+
+        async def run() -> None:
+            async with AsyncSession(root_url="http://127.0.0.1:1") as session:
+                session.set_rate_limiter(NoLimit())
+                session.add_request_hook(events.append)
+                await session.work_page(WORK_IDS[0])
+
+        with pytest.raises(Exception):
+            asyncio.run(run())
+        [event] = events
+        assert event.status is None
+        assert event.error
+
+    def test_concurrency_bound(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Requests in flight are bounded by max_concurrency"""
+        root = create_work_dir(server, Path(tmp_path).joinpath("work"), WORK_IDS[0])
+        server.latency = 0.05
+
+        async def run() -> float:
+            cookies = load_cookie(root.joinpath(".kakuyomu/cookie"))
+            async with AsyncSession(root_url=server.url, max_concurrency=2, cookies=cookies) as session:
+                session.set_rate_limiter(NoLimit())
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                await asyncio.gather(*[session.work_page(WORK_IDS[0]) for _ in range(4)])
+                return loop.time() - start
+
+        # 4リクエストを2並列で送るので2回分の遅延がかかる
+        assert asyncio.run(run()) >= 0.1
+
+
+def test_acquire_async() -> None:
+    """Token bucket is waited for with asyncio.sleep"""
+    bucket = TokenBucket(rate=20, burst=1)
+
+    async def run() -> list[float]:
+        return [await acquire_async(bucket) for _ in range(3)]
+
+    waits = asyncio.run(run())
+    assert waits[0] == 0
+    assert waits[1] > 0
+
+
+class TestStream:
+    """Test for streaming the form body"""
+
+    def test_file_read_off_the_event_loop(self, tmp_path: Path) -> None:
+        """The linked file is read in a worker thread, not in the event loop thread"""
+        filepath = Path(tmp_path).joinpath("body.txt")
+        filepath.write_text("本文\n" * 10)
+        readers: set[int] = set()
+
+        class RecordingFormBody(FormBody):
+            def _chunks(self) -> Iterator[str]:
+                readers.add(threading.get_ident())
+                return super()._chunks()
+
+        body = RecordingFormBody([("body", filepath)])
+
+        async def run() -> tuple[int, bytes]:
+            return threading.get_ident(), b"".join([chunk async for chunk in _stream(body)])
+
+        loop_thread, content = asyncio.run(run())
+        assert content == b"".join(FormBody([("body", filepath)]))
+        assert readers and loop_thread not in readers
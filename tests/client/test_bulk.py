@@ -0,0 +1,61 @@
+"""Test for bulk helpers"""
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client.bulk import run_bulk
+
+
+def test_run_bulk_keeps_order_and_errors() -> None:
+    """Results are returned in item order and errors are collected"""
+
+    def square(n: int) -> int:
+        if n == 3:
+            raise ValueError("three")
+        return n * n
+
+    results = run_bulk(square, [5, 3, 1], max_workers=2)
+    assert list(results) == [5, 3, 1]
+    assert results[5] == 25
+    assert results[1] == 1
+    assert isinstance(results[3], ValueError)
+
+
+def test_run_bulk_interrupt_cancels_queued_items(mocker: MockFixture) -> None:
+    """KeyboardInterrupt cancels the items not started yet and is re-raised"""
+    called: list[int] = []
+    futures: list[Future[int]] = []
+    interrupted = threading.Event()
+
+    class Executor(ThreadPoolExecutor):
+        def submit(self, fn: Callable[[int], int], /, *args: Any, **kwargs: Any) -> Future[int]:
+            future = super().submit(fn, *args, **kwargs)
+            futures.append(future)
+            return future
+
+        def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+            # 待機中の項目を取り消してから, 割り込み前に始まった項目を終わらせる
+            super().shutdown(wait=False, cancel_futures=cancel_futures)
+            interrupted.set()
+            super().shutdown(wait=wait)
+
+    mocker.patch("kakuyomu.client.bulk.ThreadPoolExecutor", Executor)
+
+    def interrupt(n: int) -> int:
+        called.append(n)
+        if n == 0:
+            raise KeyboardInterrupt
+        interrupted.wait()
+        return n
+
+    with pytest.raises(KeyboardInterrupt):
+        run_bulk(interrupt, list(range(20)), max_workers=1)
+    assert called[0] == 0
+    # 割り込みの時点で取り出されていた項目は高々1つで, 残りは実行されずに取り消される
+    assert len(called) <= 2
+    assert all(future.cancelled() for future in futures[len(called) :])
@@ -0,0 +1,104 @@
+"""Test for creating remote episodes"""
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+from kakuyomu.types.work import EpisodeRecord
+
+
+@pytest.fixture
+def offline_client(offline_client: Client) -> Client:
+    """Client with one linked episode and an unlinked file publish/002.txt"""
+    offline_client.config_dir.work_root.joinpath("publish/002.txt").write_text("body\n")
+    return offline_client
+
+
+class TestCreateRemoteEpisode:
+    """Test for create_remote_episode"""
+
+    def test_single_toc_fetch(self, offline_client: Client, mocker: MockFixture) -> None:
+        """New episode is found from one toc fetch and linked"""
+        client = offline_client
+        create = mocker.patch.object(client.session, "create_episode", return_value=None)
+        remote_episodes = [
+            EpisodeRecord(id="1", title="one"),
+            EpisodeRecord(id="2", title="two"),
+            EpisodeRecord(id="3", title="other"),
+        ]
+        get_records = mocker.patch.object(client, "_get_remote_episode_records", return_value=remote_episodes)
+
+        filepath = client.config_dir.work_root.joinpath("publish/002.txt")
+        episode = client.create_remote_episode(title="two", filepath=filepath)
+
+        assert create.call_count == 1
+        assert get_records.call_count == 1
+        assert episode.id == "2"
+        work = client.work
+        assert list(work.episodes) == ["1", "2", "3"]
+        assert work.episodes["1"].rel_path == "publish/001.txt"
+        assert work.episodes["2"].rel_path == "publish/002.txt"
+
+    def test_id_from_response(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Episode id in the create response is used"""
+        client = offline_client
+        mocker.patch.object(client.session, "create_episode", return_value="3")
+        remote_episodes = [
+            EpisodeRecord(id="1", title="one"),
+            EpisodeRecord(id="2", title="two"),
+            EpisodeRecord(id="3", title="two"),
+        ]
+        mocker.patch.object(client, "_get_remote_episode_records", return_value=remote_episodes)
+
+        filepath = client.config_dir.work_root.joinpath("publish/002.txt")
+        episode = client.create_remote_episode(title="two", filepath=filepath)
+        assert episode.id == "3"
+
+
+class TestCreateRemoteEpisodes:
+    """Test for create_remote_episodes"""
+
+    def test_batch(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Episodes are created in order and linked with one toc fetch"""
+        client = offline_client
+        work_root = client.config_dir.work_root
+        for name in ["003", "004"]:
+            work_root.joinpath(f"publish/{name}.txt").write_text(f"{name}\n")
+        create = mocker.patch.object(client.session, "create_episode", return_value=None)
+        remote_episodes = [
+            EpisodeRecord(id="1", title="one"),
+            EpisodeRecord(id="2", title="same"),
+            EpisodeRecord(id="3", title="same"),
+            EpisodeRecord(id="4", title="four"),
+        ]
+        get_records = mocker.patch.object(client, "_get_remote_episode_records", return_value=remote_episodes)
+        dump = mocker.spy(client, "_dump_work_toml")
+
+        created = client.create_remote_episodes(
+            [
+                ("same", work_root.joinpath("publish/002.txt")),
+                ("same", work_root.joinpath("publish/003.txt")),
+                ("four", work_root.joinpath("publish/004.txt")),
+            ]
+        )
+
+        assert create.call_count == 3
+        assert get_records.call_count == 1
+        assert dump.call_count == 1
+        assert [episode.id for episode in created] == ["2", "3", "4"]
+        assert [episode.rel_path for episode in created] == ["publish/002.txt", "publish/003.txt", "publish/004.txt"]
+
+    def test_partial_failure(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Episodes created before a failure are still linked"""
+        client = offline_client
+        work_root = client.config_dir.work_root
+        work_root.joinpath("publish/003.txt").write_text("003\n")
+        mocker.patch.object(client.session, "create_episode", side_effect=[None, RuntimeError("failed")])
+        remote_episodes = [EpisodeRecord(id="1", title="one"), EpisodeRecord(id="2", title="two")]
+        mocker.patch.object(client, "_get_remote_episode_records", return_value=remote_episodes)
+
+        with pytest.raises(RuntimeError):
+            client.create_remote_episodes(
+                [("two", work_root.joinpath("publish/002.txt")), ("three", work_root.joinpath("publish/003.txt"))]
+            )
+        assert client.work.episodes["2"].rel_path == "publish/002.txt"
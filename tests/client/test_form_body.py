@@ -0,0 +1,95 @@
+"""Test for streaming form body"""
+
+import tracemalloc
+from urllib.parse import urlencode
+
+import pytest
+
+from kakuyomu.client import Client
+from kakuyomu.client.form_body import FormBody
+from kakuyomu.client.request_models import CreateEpisodeRequest
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types.errors import EpisodeBodyChangedError
+from kakuyomu.types.path import Path
+
+from .conftest import WORK_ID
+
+BODY = "一行目\n\n「二行目」 & 三行目 100%\n"
+
+
+class TestFormBody:
+    """Test for FormBody"""
+
+    def test_same_as_urlencode(self, tmp_path: Path) -> None:
+        """Body read from a file is encoded like urlencode"""
+        filepath = Path(tmp_path).joinpath("body.txt")
+        filepath.write_text(BODY)
+        body = FormBody([("title", "タイトル"), ("keep_editing", 0), ("body", filepath)])
+
+        expected = urlencode({"title": "タイトル", "keep_editing": 0, "body": BODY}).encode("ascii")
+        assert b"".join(body) == expected
+        assert len(body) == len(expected)
+        # 何度でも送信できる
+        assert b"".join(body) == expected
+
+    @pytest.mark.parametrize("changed", [BODY + "追記\n", "短い\n"])
+    def test_changed_after_len(self, tmp_path: Path, changed: str) -> None:
+        """Body of a file changed after its length was counted is not sent silently"""
+        filepath = Path(tmp_path).joinpath("body.txt")
+        filepath.write_text(BODY)
+        body = FormBody([("title", "タイトル"), ("body", filepath)])
+        len(body)
+
+        filepath.write_text(changed)
+        with pytest.raises(EpisodeBodyChangedError):
+            b"".join(body)
+        # 数え直せば送信できる
+        assert len(body) == len(b"".join(body))
+
+    def test_request_model(self, tmp_path: Path) -> None:
+        """Request model accepts the body text or a file"""
+        filepath = Path(tmp_path).joinpath("body.txt")
+        filepath.write_text(BODY)
+        from_file = CreateEpisodeRequest(title="タイトル", body=filepath).form_body()
+        from_text = CreateEpisodeRequest(title="タイトル", body=BODY).form_body()
+        assert b"".join(from_file) == b"".join(from_text)
+
+    def test_flat_memory(self, tmp_path: Path) -> None:
+        """Long file is not loaded at once"""
+        filepath = Path(tmp_path).joinpath("body.txt")
+        with open(filepath, "w") as f:
+            for _ in range(100_000):
+                f.write("吾輩は猫である。名前はまだ無い。\n")
+        body = FormBody([("body", filepath)])
+
+        tracemalloc.start()
+        try:
+            length = len(body)
+            sent = sum(len(chunk) for chunk in body)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert sent == length
+        # エンコード後は10MB以上になる
+        assert length > 10 * 1024 * 1024
+        assert peak < 4 * 1024 * 1024
+
+
+class TestUploadBody:
+    """Test for the body uploaded to the server"""
+
+    def test_update_keeps_newlines(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Lines of the linked file are not joined with extra newlines"""
+        filepath = mock_client.config_dir.work_root.joinpath("publish/001.txt")
+        filepath.write_text(BODY)
+        mock_client.fetch_remote_episodes()
+        mock_client._link_file(filepath, "1")
+
+        mock_client._update_remote_episode("1")
+        assert server.works[WORK_ID].episodes["1"].body == BODY
+
+    def test_update_with_lines(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Lines given without line endings are joined with newlines"""
+        mock_client.fetch_remote_episodes()
+        mock_client._update_remote_episode("1", title="題", body=["一行目", "二行目"])
+        assert server.works[WORK_ID].episodes["1"].body == "一行目\n二行目"
@@ -0,0 +1,104 @@
+"""Test for conditional GET cache"""
+
+import pytest
+
+from kakuyomu.client import Client
+from kakuyomu.client.http_cache import CacheEntry, HttpCache
+from kakuyomu.client.trace import RequestEvent
+from kakuyomu.scrapers.work_page import WorkPageScraper
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types.errors import NotLoginError
+from kakuyomu.types.path import Path
+
+from .conftest import WORK_ID
+
+
+class TestHttpCache:
+    """Test for HttpCache"""
+
+    def test_put_get(self, tmp_path: Path) -> None:
+        """Entry is saved per url"""
+        cache = HttpCache(Path(tmp_path).joinpath("http_cache"))
+        entry = CacheEntry(url="http://example.com/a", etag='"1"', last_modified=None, html="<html>", results={"a": 1})
+        cache.put(entry)
+        assert cache.get("http://example.com/a") == entry
+        assert cache.get("http://example.com/b") is None
+        assert entry.conditional_headers() == {"If-None-Match": '"1"'}
+
+        cache.clear()
+        assert cache.get("http://example.com/a") is None
+
+    def test_broken_file(self, tmp_path: Path) -> None:
+        """Broken entry is ignored"""
+        cache = HttpCache(Path(tmp_path).joinpath("http_cache"))
+        cache.put(CacheEntry(url="http://example.com/a", etag='"1"', last_modified=None, html=""))
+        cache._path("http://example.com/a").write_bytes(b"broken")
+        assert cache.get("http://example.com/a") is None
+
+    def test_put_results(self, tmp_path: Path) -> None:
+        """Results are saved without writing the page again, and only used with the same page"""
+        cache = HttpCache(Path(tmp_path).joinpath("http_cache"))
+        entry = CacheEntry(url="http://example.com/a", etag='"1"', last_modified=None, html="<html>")
+        cache.put(entry)
+        page_mtime = cache._path(entry.url).stat().st_mtime_ns
+
+        entry.results["a"] = 1
+        cache.put_results(entry)
+        assert cache._path(entry.url).stat().st_mtime_ns == page_mtime
+        assert cache.get(entry.url) == entry
+
+        # 別の版のページの結果は使わない
+        cache.put(CacheEntry(url=entry.url, etag='"2"', last_modified=None, html="<html>2"))
+        cache.put_results(entry)
+        cached = cache.get(entry.url)
+        assert cached is not None and cached.results == {}
+
+
+class TestConditionalGet:
+    """Test for conditional GET of Session"""
+
+    def test_not_modified(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Unchanged page is not parsed again"""
+        events: list[RequestEvent] = []
+        mock_client.session.add_request_hook(events.append)
+        first = mock_client.session.work_page(WORK_ID).scrape_episodes()
+
+        scraper = mock_client.session.work_page(WORK_ID)
+        assert scraper.scrape_episodes() == first
+        assert "soup" not in scraper.__dict__
+        assert [(event.status, event.cache_hit) for event in events] == [(200, False), (304, True)]
+
+    def test_modified(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Changed page is downloaded and parsed"""
+        mock_client.session.work_page(WORK_ID).scrape_episodes()
+        server.add_episode(WORK_ID, "第2話", "本文", episode_id="2")
+        episodes = mock_client.session.work_page(WORK_ID).scrape_episodes()
+        assert [episode.id for episode in episodes] == ["1", "2"]
+
+    def test_results_saved_after_scrape(self, mock_client: Client) -> None:
+        """Results scraped after the page is cached are saved too"""
+        mock_client.session.episode_page(WORK_ID, "1").scrape_body()
+        scraper = mock_client.session.episode_page(WORK_ID, "1")
+        assert scraper.scrape_body().lstrip("\n") == "本文"
+        assert "soup" not in scraper.__dict__
+        # キャッシュに無い結果は保存したHTMLを解析する
+        assert scraper.scrape_title() == "第1話"
+
+    def test_redirect_not_cached(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Page redirected to the login page is not cached under the requested url"""
+        server.logout_all()
+        session = mock_client.session
+        with pytest.raises(NotLoginError):
+            session.work_page(WORK_ID)
+        # ログイン切れで止めない場合も, リダイレクト先のページは保存しない
+        session._get_page("work_page", session.get_work_url(WORK_ID), WorkPageScraper, cache=True, login=False)
+        url = mock_client.session.url(mock_client.session.get_work_url(WORK_ID))
+        assert mock_client.session.http_cache is not None
+        assert mock_client.session.http_cache.get(url) is None
+
+    def test_logout_clears_cache(self, mock_client: Client) -> None:
+        """Logout deletes the cache"""
+        mock_client.session.work_page(WORK_ID)
+        assert mock_client.config_dir.http_cache.exists()
+        mock_client.logout()
+        assert not mock_client.config_dir.http_cache.exists()
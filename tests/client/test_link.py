@@ -0,0 +1,65 @@
+"""Test for linking files in bulk"""
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types import Work
+from kakuyomu.types.errors import EpisodeAlreadyLinkedError, EpisodeNotFoundError
+
+from .conftest import WORK_ID
+
+
+@pytest.fixture
+def episodes() -> list[tuple[str, str]]:
+    """Two episodes"""
+    return [("第1話", "本文1"), ("第2話", "本文2")]
+
+
+class TestLinkFiles:
+    """Test for Client.link_files"""
+
+    def test_fetch_and_link(self, mock_client: Client, mocker: MockFixture) -> None:
+        """Fetch and links in a transaction write work.toml once"""
+        root = mock_client.config_dir.work_root
+        write = mocker.spy(mock_client.work_store, "_write")
+        with mock_client.transaction():
+            mock_client.fetch_remote_episodes()
+            results = mock_client.link_files([(root.joinpath("1.txt"), "1"), (root.joinpath("2.txt"), "2")])
+        assert write.call_count == 1
+        assert set(results) == {"1", "2"}
+
+        work = Work.load(mock_client.config_dir.work_toml)
+        assert work.episodes["1"].path(root) == root.joinpath("1.txt")
+        assert work.episodes["2"].path(root) == root.joinpath("2.txt")
+
+    def test_errors(self, mock_client: Client) -> None:
+        """Failed links are returned with the others linked"""
+        root = mock_client.config_dir.work_root
+        mock_client.fetch_remote_episodes()
+        results = mock_client.link_files(
+            [(root.joinpath("1.txt"), "1"), (root.joinpath("1.txt"), "2"), (root.joinpath("3.txt"), "3")]
+        )
+        assert not isinstance(results["1"], Exception)
+        assert isinstance(results["2"], EpisodeAlreadyLinkedError)
+        assert isinstance(results["3"], EpisodeNotFoundError)
+        assert mock_client.work.episodes["2"].rel_path is None
+
+
+class TestFetch:
+    """Test for Client.fetch_remote_episodes"""
+
+    def test_renamed(self, mock_client: Client, server: MockKakuyomuServer) -> None:
+        """Remote titles are synced as renamed, keeping the links"""
+        root = mock_client.config_dir.work_root
+        mock_client.fetch_remote_episodes()
+        mock_client.link_files([(root.joinpath("1.txt"), "1")])
+        server.works[WORK_ID].episodes["1"].title = "改題"
+
+        diff = mock_client.fetch_remote_episodes()
+        assert [episode.id for episode in diff.renamed] == ["1"]
+        assert diff.appended == diff.removed == diff.updated == diff.reordered == []
+        episode = mock_client.work.episodes["1"]
+        assert episode.title == "改題"
+        assert episode.rel_path == "1.txt"
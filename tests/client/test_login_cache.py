@@ -0,0 +1,76 @@
+"""Test for login status cache"""
+
+import requests
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+from kakuyomu.settings import URL
+from kakuyomu.types.path import Path
+
+
+class FakeMyPage:
+    """Fake my page scraper"""
+
+    def scrape_login_user(self) -> str:
+        """Return login user"""
+        return "user"
+
+
+class FakePrivatePage:
+    """Fake private page scraper"""
+
+    def scrape_email(self) -> str:
+        """Return email"""
+        return "test@example.com"
+
+
+def create_client(mocker: MockFixture) -> tuple[Client, object]:
+    """Create client which does not access kakuyomu.jp"""
+    client = Client(cwd=Path("tests/testdata/no_episodes"))
+    my_page = mocker.patch.object(client.session, "my_page", return_value=FakeMyPage())
+    mocker.patch.object(client.session, "private_page", return_value=FakePrivatePage())
+    return client, my_page
+
+
+class TestLoginCache:
+    """Test for login status cache"""
+
+    def test_cached_within_ttl(self, mocker: MockFixture) -> None:
+        """Status is fetched only once within ttl"""
+        client, my_page = create_client(mocker)
+        assert client.cached_status().is_login
+        assert client.cached_status().is_login
+        assert my_page.call_count == 1  # type: ignore[attr-defined]
+
+    def test_expired_ttl(self, mocker: MockFixture) -> None:
+        """Status is fetched again after ttl"""
+        client, my_page = create_client(mocker)
+        client.login_cache_ttl = 0
+        client.cached_status()
+        client.cached_status()
+        assert my_page.call_count == 2  # type: ignore[attr-defined]
+
+    def test_invalidated_by_redirect_to_login(self, mocker: MockFixture) -> None:
+        """Redirect to login page invalidates cache"""
+        client, my_page = create_client(mocker)
+        client.cached_status()
+
+        res = requests.Response()
+        res.status_code = 302
+        res.url = URL.MY
+        res.headers["location"] = "/login"
+        client.session._detect_login_expired(res)
+
+        assert client.session.login_expired
+        client.cached_status()
+        assert my_page.call_count == 2  # type: ignore[attr-defined]
+        assert not client.session.login_expired
+
+    def test_invalidated_by_unauthorized(self, mocker: MockFixture) -> None:
+        """401 invalidates cache"""
+        client, _ = create_client(mocker)
+        res = requests.Response()
+        res.status_code = 401
+        res.url = URL.MY
+        client.session._detect_login_expired(res)
+        assert client.session.login_expired
@@ -0,0 +1,111 @@
+"""Test client against the local mock server"""
+
+import datetime
+
+import pytest
+import requests
+
+from kakuyomu.client import Client
+from kakuyomu.settings.const import JST
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types import LocalEpisode
+from kakuyomu.types.errors import NotLoginError
+from kakuyomu.types.path import Path
+
+from .conftest import WORK_ID
+
+
+@pytest.fixture
+def episodes() -> list[tuple[str, str]]:
+    """Two episodes, one with characters escaped in html"""
+    return [("第1話", "本文1\n本文2"), ("第2話 <&>", "本文")]
+
+
+class TestMockServer:
+    """Test for MockKakuyomuServer"""
+
+    def test_status(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Login status is read from my page and private page"""
+        status = mock_client.status()
+        assert status.is_login
+        assert status.email == server.email
+
+    def test_logout(self, mock_client: Client) -> None:
+        """Session without cookie is redirected to the login page"""
+        mock_client.logout()
+        assert not mock_client.status().is_login
+
+    def test_login_expired_during_fetch(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Login expired after the cached status check stops the fetch instead of scraping the login page"""
+        mock_client.cached_status()
+        server.logout_all()
+        with pytest.raises(NotLoginError):
+            mock_client.fetch_remote_episodes()
+        assert mock_client.work.episodes == {}
+        assert mock_client.session.login_expired
+
+    def test_login_failed(self, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Wrong password is rejected"""
+        res = requests.post(f"{server.url}/login", data={"email_address": server.email, "password": "wrong"})
+        assert res.status_code == 400
+
+    def test_get_works(self, mock_client: Client) -> None:
+        """Works are listed"""
+        works = mock_client.get_works()
+        assert list(works) == [WORK_ID]
+        assert works[WORK_ID].title == "テスト作品"
+
+    def test_get_remote_episodes(self, mock_client: Client) -> None:
+        """Toc is scraped in order with escaped titles"""
+        episodes = mock_client.get_remote_episodes()
+        assert [(episode.id, episode.title) for episode in episodes] == [("1", "第1話"), ("2", "第2話 <&>")]
+
+    def test_create_and_update(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Created episode is linked and its body can be updated"""
+        filepath = mock_client.config_dir.work_root.joinpath("publish/003.txt")
+        filepath.write_text("新しい本文")
+        episode = mock_client.create_remote_episode(title="第3話", filepath=filepath)
+        assert isinstance(episode, LocalEpisode)
+        remote = server.works[WORK_ID].episodes[episode.id]
+        assert remote.title == "第3話"
+        assert remote.body == "新しい本文"
+
+        filepath.write_text("更新した本文")
+        assert mock_client.update_remote_episodes([episode.id]) == {episode.id: True}
+        assert remote.body.startswith("更新した本文")
+
+    def test_delete(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Episodes are deleted from the toc"""
+        # 削除には目次ページのcsrf tokenが必要
+        mock_client.get_remote_episodes()
+        mock_client.delete_remote_episodes(["1"])
+        assert list(server.works[WORK_ID].episodes) == ["2"]
+
+    def test_reserve_publishing(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Reservation is stored and shown on the publish page"""
+        publish_at = datetime.datetime(2030, 1, 1, 9, 0, tzinfo=JST)
+        mock_client._reserve_publishing_episode("1", publish_at)
+        assert server.works[WORK_ID].episodes["1"].to_be_published_at == "2030-01-01T00:00:00Z"
+        scraper = mock_client.session.publish_page(WORK_ID, "1")
+        assert scraper.scrape_status().scheduled_at == publish_at
+
+    def test_fail_next(self, server: MockKakuyomuServer, mock_client: Client) -> None:
+        """Injected failure is returned once"""
+        count = server.count("GET", "/my")
+        server.fail_next(1, 503)
+        res = mock_client.session.get(f"{server.url}/my")
+        assert res.status_code == 503
+        res = mock_client.session.get(f"{server.url}/my")
+        assert res.status_code == 200
+        assert server.count("GET", "/my") == count + 2
+
+    def test_failure_rate(self) -> None:
+        """Random failures are reproducible with the seed"""
+
+        def statuses() -> list[int]:
+            with MockKakuyomuServer(failure_rate=0.5, seed=1) as server:
+                return [requests.get(f"{server.url}/login").status_code for _ in range(10)]
+
+        first = statuses()
+        assert 503 in first and 200 in first
+        assert first == statuses()
@@ -0,0 +1,90 @@
+"""Test for reserving publishing episodes in bulk"""
+
+import datetime
+
+import pytest
+
+from kakuyomu.client import Client
+from kakuyomu.settings.const import JST
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types.errors import EpisodeReservePublishError
+
+from .conftest import WORK_ID
+
+
+@pytest.fixture
+def episodes() -> list[tuple[str, str]]:
+    """Three episodes"""
+    return [(f"第{i}話", f"本文{i}") for i in range(1, 4)]
+
+
+class TestReservePublishingEpisodes:
+    """Test for Client.reserve_publishing_episodes"""
+
+    def test_reserve(self, mock_client: Client, server: MockKakuyomuServer) -> None:
+        """Episodes are reserved and cancelled without loading the toc"""
+        server.works[WORK_ID].episodes["3"].to_be_published_at = "2024-07-01T10:00:00Z"
+        schedule = {
+            "1": datetime.datetime(2024, 7, 1, 19, 0),
+            "2": datetime.datetime(2024, 7, 2, 10, 0, tzinfo=datetime.UTC),
+            "3": None,
+        }
+        results = mock_client.reserve_publishing_episodes(schedule)
+        assert results == {"1": True, "2": True, "3": True}
+
+        episodes = server.works[WORK_ID].episodes
+        assert episodes["1"].to_be_published_at == "2024-07-01T10:00:00Z"
+        assert episodes["2"].to_be_published_at == "2024-07-02T10:00:00Z"
+        assert episodes["3"].to_be_published_at is None
+        assert server.count("POST", "/graphql") == 3
+        assert server.count("GET", f"/my/works/{WORK_ID}") == 0
+
+    def test_errors(self, mock_client: Client) -> None:
+        """GraphQL errors are returned per episode"""
+        publish_at = datetime.datetime(2024, 7, 1, 19, 0, tzinfo=JST)
+        results = mock_client.reserve_publishing_episodes({"1": publish_at, "4": publish_at})
+        assert results["1"] is True
+        assert isinstance(results["4"], EpisodeReservePublishError)
+
+    def test_skip_unchanged(self, mock_client: Client, server: MockKakuyomuServer) -> None:
+        """Only reservations which differ in minutes are sent"""
+        episodes = server.works[WORK_ID].episodes
+        episodes["1"].to_be_published_at = "2024-07-01T10:00:00Z"
+        episodes["2"].to_be_published_at = "2024-07-02T10:00:00Z"
+        schedule = {
+            "1": datetime.datetime(2024, 7, 1, 19, 0, 30),
+            "2": datetime.datetime(2024, 7, 3, 19, 0, tzinfo=JST),
+            "3": None,
+        }
+        results = mock_client.reserve_publishing_episodes(schedule, skip_unchanged=True)
+        assert results == {"1": False, "2": True, "3": False}
+        assert server.count("POST", "/graphql") == 1
+        assert episodes["2"].to_be_published_at == "2024-07-03T10:00:00Z"
+
+        assert mock_client.reserve_publishing_episodes(schedule, skip_unchanged=True) == {
+            "1": False,
+            "2": False,
+            "3": False,
+        }
+        assert server.count("POST", "/graphql") == 1
+
+
+class TestGetPublishSchedule:
+    """Test for Client.get_publish_schedule"""
+
+    def test_schedule(self, mock_client: Client, server: MockKakuyomuServer) -> None:
+        """Reservations of all episodes are returned in toc order"""
+        server.works[WORK_ID].episodes["2"].to_be_published_at = "2024-07-01T10:00:00Z"
+        schedule = mock_client.get_publish_schedule()
+        assert list(schedule) == ["1", "2", "3"]
+        assert not isinstance(schedule["1"], Exception) and schedule["1"].scheduled_at is None
+        assert not isinstance(schedule["2"], Exception)
+        assert schedule["2"].scheduled_at == datetime.datetime(2024, 7, 1, 19, 0, tzinfo=JST)
+
+    def test_reserved_then_read(self, mock_client: Client) -> None:
+        """Reservations made by reserve_publishing_episodes are read back"""
+        publish_at = datetime.datetime(2024, 7, 1, 19, 0, tzinfo=JST)
+        mock_client.reserve_publishing_episodes({"3": publish_at})
+        schedule = mock_client.get_publish_schedule(["3"])
+        assert not isinstance(schedule["3"], Exception)
+        assert schedule["3"].scheduled_at == publish_at
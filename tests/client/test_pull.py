@@ -0,0 +1,85 @@
+"""Test for pulling remote episode bodies"""
+
+import os
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types.errors import EpisodeFileExistsError
+from kakuyomu.types.path import Path
+
+from .conftest import WORK_ID
+
+
+@pytest.fixture
+def episodes() -> list[tuple[str, str]]:
+    """Three episodes"""
+    return [("第1話", "本文1\n二行目"), ("第2話 a/b", "本文2"), ("第3話", "本文3")]
+
+
+class TestPull:
+    """Test for Client.pull_remote_episodes"""
+
+    def test_pull_all(self, mock_client: Client, mocker: MockFixture) -> None:
+        """All bodies are written, linked and recorded in one dump"""
+        directory = mock_client.config_dir.work_root.joinpath("publish")
+        dump = mocker.spy(mock_client, "_dump_work_toml")
+        results = mock_client.pull_remote_episodes(directory)
+        assert results == {"1": True, "2": True, "3": True}
+        assert dump.call_count == 1
+
+        work = mock_client.work
+        root = mock_client.config_dir.work_root
+        assert work.episodes["1"].path(root) == directory.joinpath("001_第1話.txt")
+        assert work.episodes["2"].path(root) == directory.joinpath("002_第2話 a_b.txt")
+        assert work.episodes["1"].path(root).read_text() == "本文1\n二行目"
+        for episode in work.episodes.values():
+            assert episode.content_hash == episode.compute_hash(root)
+
+    def test_file_mode(self, mock_client: Client) -> None:
+        """Pulled files get the default permission, not the 0600 of the temporary file"""
+        directory = mock_client.config_dir.work_root.joinpath("publish")
+        mock_client.pull_remote_episodes(directory)
+        umask = os.umask(0)
+        os.umask(umask)
+        for filepath in directory.iterdir():
+            assert filepath.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    def test_resume(self, mock_client: Client, server: MockKakuyomuServer) -> None:
+        """Episodes already linked to an existing file are skipped"""
+        directory = mock_client.config_dir.work_root.joinpath("publish")
+        assert mock_client.pull_remote_episodes(directory, ["1"]) == {"1": True}
+        before = server.count("GET", f"/my/works/{WORK_ID}/episodes/1")
+        results = mock_client.pull_remote_episodes(directory)
+        assert results == {"1": False, "2": True, "3": True}
+        assert server.count("GET", f"/my/works/{WORK_ID}/episodes/1") == before
+
+    def test_overwrite(self, mock_client: Client, server: MockKakuyomuServer) -> None:
+        """Linked episodes are downloaded again with overwrite"""
+        directory = mock_client.config_dir.work_root.joinpath("publish")
+        mock_client.pull_remote_episodes(directory, ["1"])
+        filepath = directory.joinpath("001_第1話.txt")
+        filepath.write_text("ローカルの変更")
+        assert mock_client.pull_remote_episodes(directory, ["1"], overwrite=True) == {"1": True}
+        assert filepath.read_text() == "本文1\n二行目"
+
+    def test_unlinked_file_exists(self, mock_client: Client) -> None:
+        """Unlinked file is not overwritten"""
+        directory = mock_client.config_dir.work_root.joinpath("publish")
+        filepath = directory.joinpath("001_第1話.txt")
+        filepath.write_text("ローカルのファイル")
+        results = mock_client.pull_remote_episodes(directory, ["1", "3"])
+        assert isinstance(results["1"], EpisodeFileExistsError)
+        assert results["3"] is True
+        assert filepath.read_text() == "ローカルのファイル"
+        assert mock_client.work.episodes["1"].rel_path is None
+
+    def test_outside_work_root(self, mock_client: Client, server: MockKakuyomuServer, tmp_path: Path) -> None:
+        """Directory outside of the work root is rejected before any download"""
+        count = server.count("GET")
+        with pytest.raises(ValueError):
+            mock_client.pull_remote_episodes(Path(tmp_path).parent.joinpath("outside"))
+        assert server.count("GET") == count
+        assert all(episode.rel_path is None for episode in mock_client.work.episodes.values())
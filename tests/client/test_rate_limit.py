@@ -0,0 +1,59 @@
+"""Test for rate limiter"""
+
+import pytest
+
+from kakuyomu.client.rate_limit import EndpointClass, NoLimit, TokenBucket
+from kakuyomu.client.web import Session
+
+
+class TestTokenBucket:
+    """Test for TokenBucket"""
+
+    def test_burst(self) -> None:
+        """Tokens up to burst are available without waiting"""
+        bucket = TokenBucket(rate=1, burst=3)
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+    def test_wait_after_burst(self) -> None:
+        """Reservations beyond burst wait in turn"""
+        bucket = TokenBucket(rate=10, burst=1)
+        assert bucket.reserve() == 0
+        first = bucket.reserve()
+        second = bucket.reserve()
+        assert first == pytest.approx(0.1, abs=0.01)
+        assert second == pytest.approx(0.2, abs=0.01)
+
+    def test_invalid_rate(self) -> None:
+        """Rate must be positive"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestSessionRateLimiter:
+    """Test for rate limiters of Session"""
+
+    def test_default_limiters(self) -> None:
+        """Read and write have separate limiters"""
+        session = Session()
+        read = session.rate_limiters[EndpointClass.READ]
+        write = session.rate_limiters[EndpointClass.WRITE]
+        assert isinstance(read, TokenBucket)
+        assert isinstance(write, TokenBucket)
+        assert read is not write
+
+    def test_shared_limiter(self) -> None:
+        """One limiter can be shared by all endpoint classes"""
+        limiter = TokenBucket(rate=1)
+        session = Session()
+        session.set_rate_limiter(limiter)
+        assert all(_limiter is limiter for _limiter in session.rate_limiters.values())
+
+    def test_set_wait_time(self) -> None:
+        """wait_time is converted to rate"""
+        session = Session()
+        session.set_wait_time(0.5)
+        limiter = session.rate_limiters[EndpointClass.READ]
+        assert isinstance(limiter, TokenBucket)
+        assert limiter.rate == 2
+        session.set_wait_time(0)
+        assert isinstance(session.rate_limiters[EndpointClass.WRITE], NoLimit)
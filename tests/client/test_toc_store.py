@@ -0,0 +1,82 @@
+"""Test for remote toc snapshot"""
+
+import time
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+from kakuyomu.client.toc_store import TocStore
+from kakuyomu.testing import MockKakuyomuServer
+from kakuyomu.types import RemoteEpisode
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import EpisodeRecord
+
+from .conftest import WORK_ID
+
+
+@pytest.fixture
+def episodes() -> list[tuple[str, str]]:
+    """Two episodes"""
+    return [("第1話", "本文1"), ("第2話", "本文2")]
+
+
+class TestTocStore:
+    """Test for TocStore"""
+
+    def test_dump_load(self, tmp_path: Path) -> None:
+        """Snapshot is loaded for the same work within ttl"""
+        store = TocStore(Path(tmp_path).joinpath("toc.json"), ttl=60)
+        episodes = [RemoteEpisode(id="1", title="第1話")]
+        assert store.load("work") is None
+        store.dump("work", episodes)
+        assert store.load("work") == episodes
+        assert store.load("other") is None
+
+    def test_expired(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """Snapshot older than ttl is not used"""
+        store = TocStore(Path(tmp_path).joinpath("toc.json"), ttl=60)
+        store.dump("work", [RemoteEpisode(id="1", title="第1話")])
+        mocker.patch("kakuyomu.client.toc_store.time.time", return_value=time.time() + 61)
+        assert store.load("work") is None
+
+    def test_dump_records(self, tmp_path: Path) -> None:
+        """Records are saved as the same snapshot"""
+        store = TocStore(Path(tmp_path).joinpath("toc.json"), ttl=60)
+        store.dump("work", [EpisodeRecord(id="1", title="第1話")])
+        assert store.load("work") == [RemoteEpisode(id="1", title="第1話")]
+
+    def test_broken(self, tmp_path: Path) -> None:
+        """Broken snapshot is ignored"""
+        store = TocStore(Path(tmp_path).joinpath("toc.json"), ttl=60)
+        store.path.write_text("{")
+        assert store.load("work") is None
+
+
+class TestSelectRemoteEpisode:
+    """Test for selecting episodes from the snapshot"""
+
+    def test_use_snapshot(self, server: MockKakuyomuServer, mock_client: Client, mocker: MockFixture) -> None:
+        """Selection after a toc fetch does not fetch the work page again"""
+        mocker.patch("builtins.input", return_value="1")
+        mock_client.get_remote_episodes()
+        requests_before = server.count("GET", f"/my/works/{WORK_ID}")
+
+        episode = mock_client._select_remote_episode(filter_text="")
+        assert episode.id == "2"
+        assert server.count("GET", f"/my/works/{WORK_ID}") == requests_before
+
+    def test_refresh(self, server: MockKakuyomuServer, mock_client: Client, mocker: MockFixture) -> None:
+        """The work page is fetched with refresh"""
+        mocker.patch("builtins.input", return_value="2")
+        mock_client.get_remote_episodes()
+        server.add_episode(WORK_ID, "第3話", "本文3", episode_id="3")
+
+        episode = mock_client._select_remote_episode(filter_text="", refresh=True)
+        assert episode.id == "3"
+
+    def test_delete_clears_snapshot(self, mock_client: Client) -> None:
+        """Deleted episodes are not offered from the snapshot"""
+        mock_client.get_remote_episodes()
+        mock_client.delete_remote_episodes(["1"])
+        assert mock_client.toc_store.load(WORK_ID) is None
@@ -0,0 +1,88 @@
+"""Test for request events"""
+
+import json
+
+import pytest
+
+from kakuyomu.client import Client
+from kakuyomu.client.rate_limit import EndpointClass
+from kakuyomu.client.trace import JsonlTraceWriter, RequestEvent
+from kakuyomu.types.path import Path
+
+from .conftest import WORK_ID
+
+
+class TestRequestHook:
+    """Test for Session request hooks"""
+
+    def test_page_event(self, mock_client: Client) -> None:
+        """Page request reports status, size and parse time"""
+        events: list[RequestEvent] = []
+        mock_client.session.add_request_hook(events.append)
+        mock_client.session.work_page(WORK_ID)
+
+        [event] = events
+        assert event.endpoint == "work_page"
+        assert event.endpoint_class == EndpointClass.READ
+        assert event.method == "GET"
+        assert event.url.endswith(f"/my/works/{WORK_ID}")
+        assert event.status == 200
+        assert event.bytes > 0
+        assert event.network > 0
+        assert event.parse is not None
+
+    def test_post_event(self, mock_client: Client) -> None:
+        """POST request has no parse time"""
+        events: list[RequestEvent] = []
+        mock_client.session.add_request_hook(events.append)
+        mock_client.get_remote_episodes()
+        mock_client.delete_remote_episodes(["1"])
+
+        assert [event.endpoint for event in events] == ["work_page", "delete_episodes"]
+        assert events[1].endpoint_class == EndpointClass.WRITE
+        assert events[1].parse is None
+
+    def test_no_hook_keeps_parse_lazy(self, mock_client: Client) -> None:
+        """Html is not parsed when nobody listens"""
+        scraper = mock_client.session.work_page(WORK_ID)
+        assert "soup" not in scraper.__dict__
+
+    def test_failing_hook(self, mock_client: Client) -> None:
+        """Broken hook does not break the request"""
+
+        def hook(event: RequestEvent) -> None:
+            raise RuntimeError("broken")
+
+        mock_client.session.add_request_hook(hook)
+        assert mock_client.get_remote_episodes()
+        mock_client.session.remove_request_hook(hook)
+        assert mock_client.session.request_hooks == []
+
+    def test_error_event(self, mock_client: Client) -> None:
+        """Connection error is reported before it is raised"""
+        events: list[RequestEvent] = []
+        mock_client.session.add_request_hook(events.append)
+        mock_client.session.root_url = "http://127.0.0.1:1"
+        with pytest.raises(Exception):
+            mock_client.session.work_page(WORK_ID)
+
+        [event] = events
+        assert event.status is None
+        assert event.error
+
+
+class TestJsonlTraceWriter:
+    """Test for JsonlTraceWriter"""
+
+    def test_write(self, mock_client: Client, tmp_path: Path) -> None:
+        """Each event is written as one json line"""
+        trace_path = Path(tmp_path).joinpath("trace.jsonl")
+        writer = JsonlTraceWriter(trace_path)
+        mock_client.session.add_request_hook(writer)
+        mock_client.get_remote_episodes()
+        mock_client.session.episode_page(WORK_ID, "1")
+        writer.close()
+
+        lines = [json.loads(line) for line in trace_path.read_text().splitlines()]
+        assert [line["endpoint"] for line in lines] == ["work_page", "episode_page"]
+        assert {"wait", "network", "parse", "bytes", "status"} <= set(lines[0])
@@ -0,0 +1,60 @@
+"""Test for updating remote episodes from linked files"""
+
+import pytest
+from pytest_mock import MockFixture
+
+from kakuyomu.client import Client
+
+
+@pytest.fixture
+def local_episodes() -> list[str]:
+    """Two linked episodes"""
+    return ["one", "two"]
+
+
+class TestUpdateRemoteEpisodes:
+    """Test for update_remote_episodes"""
+
+    def test_skip_unchanged(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Only changed files are uploaded"""
+        client = offline_client
+        upload = mocker.patch.object(client, "_update_remote_episode", return_value=None)
+
+        assert client.update_remote_episodes(["1", "2"]) == {"1": True, "2": True}
+        assert upload.call_count == 2
+        assert all(episode.content_hash for episode in client.work.episodes.values())
+        assert all(episode.pushed_at for episode in client.work.episodes.values())
+
+        client.config_dir.work_root.joinpath("publish/002.txt").write_text("changed\n")
+        assert client.update_remote_episodes(["1", "2"]) == {"1": False, "2": True}
+        assert upload.call_count == 3
+
+    def test_force(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Unchanged files are uploaded with force"""
+        client = offline_client
+        upload = mocker.patch.object(client, "_update_remote_episode", return_value=None)
+        client.update_remote_episodes(["1"])
+        assert client.update_remote_episodes(["1"], force=True) == {"1": True}
+        assert upload.call_count == 2
+
+    def test_failed_upload_is_not_recorded(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Failed episode keeps no hash and is retried next time"""
+        client = offline_client
+        mocker.patch.object(client, "_update_remote_episode", side_effect=RuntimeError("failed"))
+        results = client.update_remote_episodes(["1"])
+        assert isinstance(results["1"], RuntimeError)
+        assert client.work.episodes["1"].content_hash is None
+
+    def test_interrupted_upload_records_finished(self, offline_client: Client, mocker: MockFixture) -> None:
+        """Hashes of the episodes uploaded before an interrupt are recorded"""
+        client = offline_client
+
+        def upload(episode_id: str) -> None:
+            if episode_id == "2":
+                raise KeyboardInterrupt
+
+        mocker.patch.object(client, "_update_remote_episode", side_effect=upload)
+        with pytest.raises(KeyboardInterrupt):
+            client.update_remote_episodes(["1", "2"], max_workers=1)
+        assert client.work.episodes["1"].content_hash
+        assert client.work.episodes["2"].content_hash is None
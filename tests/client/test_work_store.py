@@ -0,0 +1,198 @@
+"""Test for WorkStore"""
+
+import os
+import pickle
+import shutil
+
+import pytest
+from pytest_mock import MockFixture
+
+import tests.helper
+from kakuyomu.client.work_store import WorkStore
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import LocalEpisode, Work
+
+
+class TestWorkStore:
+    """Test for WorkStore"""
+
+    source = Path(tests.helper.__file__).parent.joinpath("work.toml")
+
+    def create_store(self, tmp_path: Path) -> WorkStore:
+        """Copy work.toml to tmp_path and create store"""
+        path = Path(tmp_path).joinpath("work.toml")
+        shutil.copy(self.source, path)
+        return WorkStore(path)
+
+    def test_load_cached(self, tmp_path: Path) -> None:
+        """Unchanged file is not parsed again"""
+        store = self.create_store(tmp_path)
+        assert store.load() is store.load()
+
+    def test_reload_modified(self, tmp_path: Path) -> None:
+        """Modified file is parsed again"""
+        store = self.create_store(tmp_path)
+        work = store.load()
+        with open(store.path, "a") as f:
+            f.write('\n[[episodes]]\nid = "1"\ntitle = "added"\n')
+        stat = store.path.stat()
+        os.utime(store.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        reloaded = store.load()
+        assert reloaded is not work
+        assert "1" in reloaded.episodes
+
+    def test_dump_updates_cache(self, tmp_path: Path) -> None:
+        """Dumped work is kept without parsing the file"""
+        store = self.create_store(tmp_path)
+        work = store.load()
+        work.title = "changed"
+        store.dump(work)
+        assert store.load() is work
+        assert Work.load(store.path).title == "changed"
+
+    def test_dump_other_work_is_copied(self, tmp_path: Path) -> None:
+        """Work given from outside is not shared with the cache"""
+        store = self.create_store(tmp_path)
+        work = Work(id="1", title="title")
+        store.dump(work)
+        cached = store.load()
+        assert cached is not work
+        assert cached == work
+
+    def test_dump_atomic(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """File is kept as it was if writing fails"""
+        store = self.create_store(tmp_path)
+        before = store.path.read_text()
+        work = store.load()
+        work.title = "changed"
+        mocker.patch("kakuyomu.client.work_store.dumps", side_effect=OSError("disk full"))
+        with pytest.raises(OSError):
+            store.dump(work)
+        assert store.path.read_text() == before
+        assert os.listdir(tmp_path) == ["work.toml"]
+
+    def test_failed_dump_not_cached(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """Work failed to be written is not returned as the content of the file"""
+        store = self.create_store(tmp_path)
+        title = store.load().title
+        mocker.patch("kakuyomu.client.work_store.dumps", side_effect=OSError("disk full"))
+        with pytest.raises(OSError):
+            store.dump(Work(id="1", title="changed"))
+        assert store.load().title == title
+
+        work = store.load()
+        work.title = "changed"
+        with pytest.raises(OSError):
+            store.dump(work)
+        assert store.load().title == title
+
+    def test_dump_in_place_links(self, tmp_path: Path) -> None:
+        """Episodes linked in place are found by path after dump"""
+        store = WorkStore(Path(tmp_path).joinpath("work.toml"))
+        work = Work(id="1", title="title")
+        work.episodes["1"] = LocalEpisode(id="1", title="one", rel_path="publish/001.txt")
+        store.dump(work)
+        root = Path(tmp_path)
+        assert store.load().get_episode_by_path(root, root.joinpath("publish/001.txt")) is not None
+        assert Work.load(store.path).get_episode_by_path(root, root.joinpath("publish/001.txt")) is not None
+
+    def test_dump_keeps_mode(self, tmp_path: Path) -> None:
+        """Replaced file keeps the permission"""
+        store = self.create_store(tmp_path)
+        store.path.chmod(0o640)
+        store.dump(store.load())
+        assert store.path.stat().st_mode & 0o777 == 0o640
+
+    def test_new_file_mode_without_umask(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """New file gets the default permission without changing the umask of the process"""
+        umask = os.umask(0)
+        os.umask(umask)
+        set_umask = mocker.patch("os.umask")
+        store = WorkStore(Path(tmp_path).joinpath("work.toml"))
+        store.dump(Work(id="1", title="title"))
+        assert set_umask.call_count == 0
+        assert store.path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    def test_transaction(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """File is written once at the end of the outermost transaction"""
+        store = self.create_store(tmp_path)
+        write = mocker.spy(store, "_write")
+        with store.transaction():
+            with store.transaction():
+                work = store.load()
+                work.title = "first"
+                store.dump(work)
+            work = store.load()
+            work.title = "second"
+            store.dump(Work(id=work.id, title="second"))
+            assert write.call_count == 0
+            assert store.load().title == "second"
+        assert write.call_count == 1
+        assert Work.load(store.path).title == "second"
+
+    def test_transaction_error(self, tmp_path: Path) -> None:
+        """Works dumped before an error are written"""
+        store = self.create_store(tmp_path)
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                work = store.load()
+                work.title = "changed"
+                store.dump(work)
+                raise RuntimeError
+        assert Work.load(store.path).title == "changed"
+
+    def test_transaction_without_dump(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """File is not written if nothing is dumped"""
+        store = self.create_store(tmp_path)
+        write = mocker.spy(store, "_write")
+        with store.transaction():
+            store.load()
+        assert write.call_count == 0
+
+    def test_cache(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """Work is loaded from the sidecar while work.toml is unchanged"""
+        path = self.create_store(tmp_path).path
+        cache_path = Path(tmp_path).joinpath("work.pickle")
+        expected = WorkStore(path, cache_path=cache_path).load()
+        assert cache_path.exists()
+
+        load = mocker.spy(Work, "load")
+        assert WorkStore(path, cache_path=cache_path).load() == expected
+        assert load.call_count == 0
+
+        with open(path, "a") as f:
+            f.write('\n[[episodes]]\nid = "1"\ntitle = "added"\n')
+        assert "1" in WorkStore(path, cache_path=cache_path).load().episodes
+        assert load.call_count == 1
+
+    def test_cache_updated_by_dump(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """Dumped work is written to the sidecar"""
+        store = self.create_store(tmp_path)
+        cache_path = Path(tmp_path).joinpath("work.pickle")
+        store = WorkStore(store.path, cache_path=cache_path)
+        work = store.load()
+        work.title = "changed"
+        store.dump(work)
+
+        load = mocker.spy(Work, "load")
+        assert WorkStore(store.path, cache_path=cache_path).load().title == "changed"
+        assert load.call_count == 0
+
+    def test_broken_cache(self, tmp_path: Path) -> None:
+        """Broken sidecar is ignored"""
+        path = self.create_store(tmp_path).path
+        cache_path = Path(tmp_path).joinpath("work.pickle")
+        cache_path.write_bytes(b"broken")
+        assert WorkStore(path, cache_path=cache_path).load() == Work.load(path)
+
+    def test_stale_cache_not_unpickled(self, tmp_path: Path, mocker: MockFixture) -> None:
+        """Work in the sidecar is not unpickled when the header does not match"""
+        path = self.create_store(tmp_path).path
+        cache_path = Path(tmp_path).joinpath("work.pickle")
+        WorkStore(path, cache_path=cache_path).load()
+
+        mocker.patch("kakuyomu.client.work_store._schema_hash", return_value="changed")
+        load = mocker.spy(pickle, "load")
+        assert WorkStore(path, cache_path=cache_path).load() == Work.load(path)
+        assert load.call_count == 1
@@ -0,0 +1,66 @@
+"""Test for EpisodePageScraper"""
+
+import html
+import os
+from typing import Final
+
+import pytest
+
+from kakuyomu.scrapers.base import default_parser
+from kakuyomu.scrapers.episode_page import EpisodePageScraper
+from kakuyomu.testing import TEMPLATE_DIR
+
+template_path: Final[str] = os.path.join(TEMPLATE_DIR, "episode.html")
+
+title: Final[str] = "第1話 <テスト>"
+body: Final[str] = "一行目\n\n「二行目」 & 三行目\n"
+csrf_token: Final[str] = "test_csrf_token"
+
+parsers: Final[list[str]] = sorted({"html.parser", default_parser()})
+
+
+def render() -> str:
+    """Render episode page"""
+    return (
+        open(template_path)
+        .read()
+        .format(
+            work_id="1",
+            episode_id="2",
+            csrf_token=csrf_token,
+            title=html.escape(title),
+            body=html.escape(body),
+            status="draft",
+            edit_reservation=0,
+            keep_editing=0,
+            use_reservation=1,
+        )
+    )
+
+
+@pytest.mark.parametrize("parser", parsers)
+class TestEpisodePageScraper:
+    """Test for EpisodePageScraper."""
+
+    def test_scrape(self, parser: str) -> None:
+        """Test scrape title, body, csrf_token and status"""
+        scraper = EpisodePageScraper(render(), parser=parser)
+        assert scraper.scrape_title() == title
+        assert scraper.scrape_body().lstrip("\n") == body
+        assert scraper.scrape_csrf_token() == csrf_token
+        status = scraper.scrape_status()
+        assert status.status == "draft"
+        assert status.use_reservation == 1
+
+    def test_lazy_parse(self, parser: str) -> None:
+        """Html is not parsed until scraping"""
+        scraper = EpisodePageScraper(render(), parser=parser)
+        assert "soup" not in scraper.__dict__
+        scraper.scrape_csrf_token()
+        assert "soup" in scraper.__dict__
+
+    def test_parse_only(self, parser: str) -> None:
+        """Partial tree has only input and textarea"""
+        scraper = EpisodePageScraper(render(), parser=parser)
+        assert scraper.soup.select_one("form") is None
+        assert scraper.soup.select_one("textarea[name='body']") is not None
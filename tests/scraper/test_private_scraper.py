@@ -4,12 +4,13 @@ import os
 from typing import ClassVar, Final
 
 from kakuyomu.scrapers.private_page import PrivatePageScraper
+from kakuyomu.testing import TEMPLATE_DIR
 
 birth_day: Final[str] = "2025年01月09日"
 email: Final[str] = "test@gmail.com"
 user_id: Final[str] = "test_user_id"
 
-template_path: Final[str] = os.path.join(os.path.dirname(__file__), "private.html")
+template_path: Final[str] = os.path.join(TEMPLATE_DIR, "private.html")
 html: Final[str] = open(template_path).read()
 
 
@@ -0,0 +1,62 @@
+"""Test for PublishPageScraper"""
+
+import datetime
+import json
+import os
+from typing import Any, Final
+
+import pytest
+
+from kakuyomu.scrapers.publish_page import PublishPageScraper
+from kakuyomu.settings.const import JST
+from kakuyomu.testing import TEMPLATE_DIR
+
+template_path: Final[str] = os.path.join(TEMPLATE_DIR, "publish.html")
+
+
+def render(next_data: dict[str, Any]) -> str:
+    """Render publish page"""
+    return open(template_path).read().format(next_data=json.dumps(next_data).replace("</", "<\\/"))
+
+
+def apollo_state(*episodes: tuple[str, str | None]) -> dict[str, Any]:
+    """Page data with the episodes"""
+    state: dict[str, Any] = {"Work:1": {"__typename": "Work", "id": "1", "title": "</script>"}}
+    for episode_id, to_be_published_at in episodes:
+        state[f"Episode:{episode_id}"] = {
+            "__typename": "Episode",
+            "id": episode_id,
+            "toBePublishedAt": to_be_published_at,
+        }
+    return {"props": {"pageProps": {"__APOLLO_STATE__": state}}}
+
+
+class TestPublishPageScraper:
+    """Test for PublishPageScraper"""
+
+    def test_reserved(self) -> None:
+        """Reservation is converted to JST"""
+        scraper = PublishPageScraper(render(apollo_state(("2", "2024-07-04T09:00:37Z"))))
+        status = scraper.scrape_status()
+        assert status.scheduled_at == datetime.datetime(2024, 7, 4, 18, 0, 37, tzinfo=JST)
+
+    def test_draft(self) -> None:
+        """Null is not reserved"""
+        scraper = PublishPageScraper(render(apollo_state(("2", None))))
+        assert scraper.scrape_status("2").scheduled_at is None
+
+    def test_reservations(self) -> None:
+        """All episodes in the page data are scraped"""
+        scraper = PublishPageScraper(render(apollo_state(("2", None), ("3", "2024-07-04T09:00:00Z"))))
+        reservations = scraper.scrape_reservations()
+        assert list(reservations) == ["2", "3"]
+        assert scraper.scrape_status("3").scheduled_at == datetime.datetime(2024, 7, 4, 18, 0, tzinfo=JST)
+        with pytest.raises(ValueError):
+            scraper.scrape_status("4")
+
+    def test_not_found(self) -> None:
+        """Page without the page data is an error"""
+        with pytest.raises(ValueError):
+            PublishPageScraper("<html></html>").scrape_status()
+        with pytest.raises(ValueError):
+            PublishPageScraper(render({"props": {}})).scrape_status()
@@ -0,0 +1,60 @@
+"""Test for WorkPageScraper"""
+
+import os
+from typing import Final
+
+import pytest
+
+from kakuyomu.scrapers.base import default_parser
+from kakuyomu.scrapers.work_page import WorkPageScraper
+from kakuyomu.testing import TEMPLATE_DIR
+from kakuyomu.types.work import EpisodeRecord, RemoteEpisode
+
+template_path: Final[str] = os.path.join(TEMPLATE_DIR, "work.html")
+row_template_path: Final[str] = os.path.join(TEMPLATE_DIR, "work_episode_row.html")
+
+work_id: Final[str] = "16816927859498193192"
+csrf_token: Final[str] = "test_csrf_token"
+episodes: Final[list[tuple[str, str]]] = [(f"1681692785985982{i:04d}", f"第{i}話") for i in range(10)]
+
+parsers: Final[list[str]] = sorted({"html.parser", default_parser()})
+
+
+def render() -> str:
+    """Render work page"""
+    row_template = open(row_template_path).read()
+    rows = "".join(
+        row_template.format(work_id=work_id, episode_id=episode_id, title=title, status="draft")
+        for episode_id, title in episodes
+    )
+    return (
+        open(template_path)
+        .read()
+        .format(work_id=work_id, work_title="テスト作品", csrf_token=csrf_token, episode_rows=rows)
+    )
+
+
+@pytest.mark.parametrize("parser", parsers)
+class TestWorkPageScraper:
+    """Test for WorkPageScraper."""
+
+    def test_scrape_episodes(self, parser: str) -> None:
+        """Test scrape episodes in toc order"""
+        scraper = WorkPageScraper(render(), parser=parser)
+        scraped = scraper.scrape_episodes()
+        assert [(episode.id, episode.title) for episode in scraped] == episodes
+
+    def test_scrape_episode_records(self, parser: str) -> None:
+        """Records are memoized and converted to RemoteEpisode"""
+        scraper = WorkPageScraper(render(), parser=parser)
+        records = scraper.scrape_episode_records()
+        assert records == [EpisodeRecord(id=episode_id, title=title) for episode_id, title in episodes]
+        assert scraper.results["scrape_episode_records"] is records
+        assert scraper.scrape_episodes() == [
+            RemoteEpisode(id=episode_id, title=title) for episode_id, title in episodes
+        ]
+
+    def test_scrape_csrf_token(self, parser: str) -> None:
+        """Test scrape csrf token"""
+        scraper = WorkPageScraper(render(), parser=parser)
+        assert scraper.scrape_csrf_token() == csrf_token
@@ -1,26 +1,59 @@
 """Test for Episode type"""
 
+import datetime
+
+from kakuyomu.settings.const import JST
 from kakuyomu.types.path import Path
-from kakuyomu.types.work.episode import LocalEpisode
+from kakuyomu.types.work import Work
+from kakuyomu.types.work.episode import LocalEpisode, PublishReservationStatus
 
 
 class TestEpisode:
     """Episode type test"""
 
     def test_set_path(self) -> None:
-        """Test set path"""
-        episode = LocalEpisode(id="1", title="title")
+        """Test set path through the work"""
+        work = Work(id="work", title="work")
+        work.episodes["1"] = LocalEpisode(id="1", title="title")
         root = Path("tests/testdata/episode_exists")
         file = Path("tests/testdata/episode_exists/publish/001.txt")
 
-        episode.set_path(root, file)
+        episode = work.set_episode_path("1", root, file)
         assert episode.rel_path == "publish/001.txt"
 
     def test_dump(self) -> None:
         """Test dump"""
         episode = LocalEpisode(id="1", title="title", rel_path="path")
         dumped = episode.dump()
-        assert len(dumped) == 3
+        assert len(dumped) == 5
         assert dumped["id"] == "1"
         assert dumped["title"] == "title"
         assert dumped["rel_path"] == "path"
+        assert dumped["content_hash"] is None
+        assert dumped["pushed_at"] is None
+
+    def test_compute_hash(self) -> None:
+        """Test content hash of linked file"""
+        root = Path("tests/testdata/episodes_exists")
+        episode = LocalEpisode(id="1", title="title", rel_path="publish/001.txt")
+        other = LocalEpisode(id="2", title="title", rel_path="publish/002.txt")
+        assert episode.compute_hash(root) == episode.compute_hash(root)
+        assert episode.compute_hash(root) != other.compute_hash(root)
+
+
+class TestPublishReservationStatus:
+    """PublishReservationStatus test"""
+
+    def test_is_scheduled_at(self) -> None:
+        """Reservation is compared in minutes in JST"""
+        status = PublishReservationStatus.from_str("2024-07-04T10:00:37Z")
+        assert status.is_scheduled_at(datetime.datetime(2024, 7, 4, 19, 0))
+        assert status.is_scheduled_at(datetime.datetime(2024, 7, 4, 10, 0, 59, tzinfo=datetime.UTC))
+        assert not status.is_scheduled_at(datetime.datetime(2024, 7, 4, 19, 1, tzinfo=JST))
+        assert not status.is_scheduled_at(None)
+
+    def test_not_reserved(self) -> None:
+        """Not reserved is the same as None"""
+        status = PublishReservationStatus.from_str(None)
+        assert status.is_scheduled_at(None)
+        assert not status.is_scheduled_at(datetime.datetime(2024, 7, 4, 19, 0))
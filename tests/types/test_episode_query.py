@@ -0,0 +1,66 @@
+"""Test for episode query"""
+
+import random
+
+from kakuyomu.types.work import LocalEpisode, Query
+
+
+def episodes(*ids: str) -> dict[str, LocalEpisode]:
+    """Episodes titled by id"""
+    return {episode_id: LocalEpisode(id=episode_id, title=f"title {episode_id}") for episode_id in ids}
+
+
+def ids(episodes: list) -> list[str]:
+    """Ids of the diff category"""
+    return [episode.id for episode in episodes]
+
+
+class TestQuery:
+    """Test for Query.diff"""
+
+    def test_appended_removed(self) -> None:
+        """Appended and removed episodes are in toc order"""
+        diff = Query(episodes("1", "2", "3", "4")).diff(Query(episodes("5", "1", "3", "6")))
+        assert ids(diff.appended) == ["5", "6"]
+        assert ids(diff.removed) == ["2", "4"]
+        assert diff.updated == diff.renamed == diff.reordered == []
+
+    def test_updated_renamed(self) -> None:
+        """Title changes are renamed and path changes are updated"""
+        older = episodes("1", "2", "3")
+        newer = episodes("1", "2", "3")
+        newer["1"].title = "new title"
+        newer["2"].rel_path = "publish/002.txt"
+        diff = Query(older).diff(Query(newer))
+        assert ids(diff.renamed) == ["1"]
+        assert ids(diff.updated) == ["2"]
+        assert diff.reordered == []
+
+    def test_reordered(self) -> None:
+        """Only the fewest moved episodes are reordered"""
+        diff = Query(episodes("1", "2", "3", "4", "5")).diff(Query(episodes("2", "3", "4", "1", "5")))
+        assert ids(diff.reordered) == ["1"]
+
+        diff = Query(episodes("1", "2", "3", "4")).diff(Query(episodes("4", "3", "2", "1")))
+        assert len(diff.reordered) == 3
+
+    def test_insert_is_not_reordered(self) -> None:
+        """Episodes shifted by inserted or removed episodes are not reordered"""
+        diff = Query(episodes("1", "2", "3")).diff(Query(episodes("0", "1", "x", "3")))
+        assert ids(diff.appended) == ["0", "x"]
+        assert ids(diff.removed) == ["2"]
+        assert diff.reordered == []
+
+    def test_random_reorder(self) -> None:
+        """Episodes not reordered keep their relative order"""
+        rng = random.Random(0)
+        older_ids = [str(i) for i in range(200)]
+        newer_ids = older_ids[:]
+        for _ in range(20):
+            i, j = rng.randrange(200), rng.randrange(200)
+            newer_ids[i], newer_ids[j] = newer_ids[j], newer_ids[i]
+        diff = Query(episodes(*older_ids)).diff(Query(episodes(*newer_ids)))
+        moved = set(ids(diff.reordered))
+        kept = [episode_id for episode_id in newer_ids if episode_id not in moved]
+        assert kept == [episode_id for episode_id in older_ids if episode_id not in moved]
+        assert 0 < len(moved) <= 40
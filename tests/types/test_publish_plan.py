@@ -0,0 +1,78 @@
+"""Test for publish plan"""
+
+import datetime
+
+import pytest
+
+from kakuyomu.settings.const import JST
+from kakuyomu.types import LocalEpisode, Work
+from kakuyomu.types.errors import EpisodeNotFoundError
+from kakuyomu.types.path import Path
+from kakuyomu.types.publish_plan import PublishPlan
+
+PLAN = """
+[[episodes]]
+episode = "1"
+publish_at = 2024-07-01T19:00:00
+
+[cadence]
+start = 2024-07-02T10:00:00Z
+interval_days = 2
+episodes = ["publish/002.txt", "3"]
+"""
+
+
+@pytest.fixture
+def work() -> Work:
+    """Work with three episodes"""
+    return Work(
+        id="work",
+        title="作品",
+        episodes=[
+            {"id": "1", "title": "第1話"},
+            {"id": "2", "title": "第2話", "rel_path": "publish/002.txt"},
+            {"id": "3", "title": "第3話"},
+        ],
+    )
+
+
+class TestPublishPlan:
+    """Test for PublishPlan"""
+
+    def test_resolve(self, tmp_path: Path, work: Work) -> None:
+        """Entries and cadence are resolved to episode ids in JST"""
+        root = Path(tmp_path)
+        plan_path = root.joinpath("plan.toml")
+        plan_path.write_text(PLAN)
+        schedule = PublishPlan.load(plan_path).resolve(work, root)
+        assert schedule == {
+            "1": datetime.datetime(2024, 7, 1, 19, 0, tzinfo=JST),
+            "2": datetime.datetime(2024, 7, 2, 19, 0, tzinfo=JST),
+            "3": datetime.datetime(2024, 7, 4, 19, 0, tzinfo=JST),
+        }
+        assert all(publish_at.utcoffset() == datetime.timedelta(hours=9) for publish_at in schedule.values())
+
+    def test_path_relative_to_plan(self, tmp_path: Path, work: Work) -> None:
+        """File paths are relative to the plan file"""
+        root = Path(tmp_path)
+        plan_path = root.joinpath("publish", "plan.toml")
+        plan_path.parent.mkdir()
+        plan_path.write_text('[[episodes]]\nepisode = "002.txt"\npublish_at = 2024-07-01T19:00:00\n')
+        assert list(PublishPlan.load(plan_path).resolve(work, root)) == ["2"]
+
+    def test_not_found(self, tmp_path: Path, work: Work) -> None:
+        """Unknown episode is an error"""
+        plan = PublishPlan(episodes=[{"episode": "4", "publish_at": datetime.datetime(2024, 7, 1)}])
+        with pytest.raises(EpisodeNotFoundError):
+            plan.resolve(work, Path(tmp_path))
+
+    def test_duplicated(self, tmp_path: Path, work: Work) -> None:
+        """Episode scheduled twice is an error"""
+        work.episodes["2"] = LocalEpisode(id="2", title="第2話")
+        publish_at = datetime.datetime(2024, 7, 1)
+        plan = PublishPlan(
+            episodes=[{"episode": "1", "publish_at": publish_at}],
+            cadence={"start": publish_at, "episodes": ["1"]},
+        )
+        with pytest.raises(ValueError):
+            plan.resolve(work, Path(tmp_path))
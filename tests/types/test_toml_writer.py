@@ -0,0 +1,53 @@
+"""Test for TOML writer"""
+
+import datetime
+import tomllib
+
+import pytest
+
+import tests.helper
+from kakuyomu.settings.const import JST
+from kakuyomu.types.path import Path
+from kakuyomu.types.work import Work
+from kakuyomu.types.work.toml_writer import dumps
+
+
+class TestTomlWriter:
+    """Test for dumps"""
+
+    def test_round_trip(self) -> None:
+        """Written document is read back with tomllib"""
+        pushed_at = datetime.datetime(2024, 7, 4, 9, 0, 37, 123456, tzinfo=JST)
+        data = {
+            "id": "1",
+            "title": 'タイトル "引用" \\ \t\n\x01\x7f',
+            "count": 3,
+            "ratio": 0.5,
+            "flag": True,
+            "tags": ["a", "b"],
+            "missing": None,
+            "日本語のキー": "値",
+            "episodes": [
+                {"id": "1", "title": "第1話", "rel_path": None, "pushed_at": pushed_at},
+                {"id": "2", "title": "第2話", "rel_path": "publish/002.txt", "pushed_at": None},
+            ],
+        }
+        loaded = tomllib.loads(dumps(data))
+        expected = {key: value for key, value in data.items() if value is not None}
+        expected["episodes"] = [
+            {"id": "1", "title": "第1話", "pushed_at": pushed_at},
+            {"id": "2", "title": "第2話", "rel_path": "publish/002.txt"},
+        ]
+        assert loaded == expected
+
+    def test_unsupported(self) -> None:
+        """Nested table is not supported"""
+        with pytest.raises(TypeError):
+            dumps({"table": {"key": "value"}})
+
+    def test_work(self) -> None:
+        """Dumped work is loaded as the same work"""
+        work = Work.load(Path(tests.helper.__file__).parent.joinpath("work.toml"))
+        work.episodes["16816927859859822600"].mark_pushed("hash", datetime.datetime.now(JST))
+        params = tomllib.loads(dumps(work.model_dump()))
+        assert Work(**params) == work
@@ -2,7 +2,7 @@
 
 import tests.helper
 from kakuyomu.types.path import Path
-from kakuyomu.types.work import Work
+from kakuyomu.types.work import LocalEpisode, Work
 
 
 class TestWork:
@@ -23,3 +23,65 @@ class TestWork:
 
         episodes = dumped["episodes"]
         assert isinstance(episodes, list)
+
+    def test_get_episode_by_path(self) -> None:
+        """Test path index lookup"""
+        work = Work.load(self.filepath)
+        root = Path("tests/testdata/episodes_exists")
+
+        episode = work.get_episode_by_path(root, root.joinpath("publish/001.txt"))
+        assert episode
+        assert episode.id == "16816927859859822600"
+        assert work.get_episode_by_path(root, root.joinpath("publish/./001.txt").absolute()) == episode
+        assert work.get_episode_by_path(root, root.joinpath("publish/004.txt")) is None
+
+    def test_path_index_set_and_unset(self) -> None:
+        """Test path index is maintained by set/unset"""
+        work = Work.load(self.filepath)
+        root = Path("tests/testdata/episodes_exists")
+        path = root.joinpath("publish/004.txt")
+        episode_id = "16816927859880026113"
+
+        work.set_episode_path(episode_id, root, path)
+        assert work.episodes[episode_id].rel_path == "publish/004.txt"
+        assert work.get_episode_by_path(root, path) == work.episodes[episode_id]
+
+        work.unset_episode_path(episode_id)
+        assert work.episodes[episode_id].rel_path is None
+        assert work.get_episode_by_path(root, path) is None
+
+    def test_path_index_rebuilt_on_assignment(self) -> None:
+        """Test path index is rebuilt when episodes are replaced"""
+        work = Work.load(self.filepath)
+        root = Path("tests/testdata/episodes_exists")
+        work.episodes = {}
+        assert work.get_episode_by_path(root, root.joinpath("publish/001.txt")) is None
+
+    def test_path_index_in_place_changes(self) -> None:
+        """Episodes added, replaced or relinked in place are found by path"""
+        work = Work(id="work", title="work")
+        root = Path("tests/testdata/episodes_exists")
+        path = root.joinpath("publish/001.txt")
+        work.episodes["1"] = LocalEpisode(id="1", title="one", rel_path="publish/001.txt")
+        assert work.get_episode_by_path(root, path) == work.episodes["1"]
+
+        work.episodes["1"] = LocalEpisode(id="1", title="one", rel_path="publish/002.txt")
+        assert work.get_episode_by_path(root, path) is None
+        work.episodes["1"].rel_path = "publish/001.txt"
+        assert work.get_episode_by_path(root, path) == work.episodes["1"]
+
+    def test_path_index_of_copy(self) -> None:
+        """Copied work has its own index"""
+        work = Work(id="work", title="work")
+        work.episodes["1"] = LocalEpisode(id="1", title="one", rel_path="publish/001.txt")
+        copied = work.model_copy(deep=True)
+        assert copied._path_index == {"publish/001.txt": "1"}
+
+    def test_get_episodes_by_paths(self) -> None:
+        """Linked paths are looked up at once"""
+        work = Work.load(self.filepath)
+        root = Path("tests/testdata/episodes_exists")
+        paths = [root.joinpath("publish/001.txt"), root.joinpath("publish/004.txt")]
+        found = work.get_episodes_by_paths(root, paths)
+        assert list(found) == [paths[0]]
+        assert found[paths[0]].id == "16816927859859822600"